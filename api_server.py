@@ -0,0 +1,266 @@
+# Filename: api_server.py
+# Description: This file contains a small local JSON API over the extracted results in data/, for tools that need the event results and timed training data without going through Streamlit. Responses are cached in memory per file version and served with ETags and gzip.
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import pandas as pd
+
+from catalog import catalog
+from columns import event_columns, timed_training_columns
+from tt_analysis import best_runs, hypothetical_best_runs
+from tt_schema import split_count
+from utils import SESSION_FILE_PATTERN
+
+
+class NotFound(Exception):
+    pass
+
+
+class CachedResponse:
+    """A serialized JSON body with its ETag and a lazily built gzip copy."""
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+        self._gzipped = None
+
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+def records(df):
+    """JSON-ready rows; timedeltas become seconds and NaN becomes null."""
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_timedelta64_dtype(df[column]):
+            df[column] = df[column].dt.total_seconds()
+    return json.loads(df.to_json(orient="records"))
+
+
+class ResultsStore:
+    """In-memory cache of session frames and rendered responses.
+
+    Entries are keyed by the CSV modification time, so re-extracting a file
+    invalidates its responses on the next request without a restart.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._frames = {}
+        self._responses = {}
+
+    def session_paths(self):
+        return {
+            os.path.splitext(os.path.basename(path))[0]: path
+            for path in catalog(self.data_dir)["path"]
+        }
+
+    def _session(self, session_id):
+        path = self.session_paths().get(session_id)
+        if path is None:
+            raise NotFound(f"Unknown session: {session_id}")
+        return path, os.stat(path).st_mtime_ns
+
+    def frame(self, session_id):
+        path, version = self._session(session_id)
+        with self._lock:
+            cached = self._frames.get(session_id)
+            if cached is None or cached[0] != version:
+                cached = (version, pd.read_csv(path))
+                self._frames[session_id] = cached
+        return cached[1]
+
+    def response(self, key, version, build):
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+        response = CachedResponse(build())
+        with self._lock:
+            self._responses[key] = (version, response)
+        return response
+
+    def directory_version(self):
+        return tuple(
+            (path, os.stat(path).st_mtime_ns)
+            for path in self.session_paths().values()
+        )
+
+    # ----- views ---------------------------------------------------------------
+
+    def events(self):
+        events = {}
+        for entry in catalog(self.data_dir).itertuples():
+            event = events.setdefault(
+                entry.event,
+                {
+                    "event": entry.event,
+                    "venue": entry.venue,
+                    "venue_name": entry.venue_name,
+                    "year": None if pd.isna(entry.year) else int(entry.year),
+                    "sessions": [],
+                },
+            )
+            event["sessions"].append(
+                {
+                    "session": os.path.splitext(os.path.basename(entry.path))[0],
+                    "type": entry.session,
+                    "label": entry.label,
+                    "category": entry.category,
+                    "rows": int(entry.rows),
+                }
+            )
+        return list(events.values())
+
+    def event(self, event_id):
+        for event in self.events():
+            if event["event"] == event_id:
+                return event
+        raise NotFound(f"Unknown event: {event_id}")
+
+    def is_timed_training(self, session_id):
+        return SESSION_FILE_PATTERN.match(f"{session_id}.csv")["session"] == "tt"
+
+    def leaderboard(self, session_id):
+        df = self.frame(session_id)
+        if self.is_timed_training(session_id):
+            df_best_runs = best_runs(df)
+            return records(
+                df_best_runs[["Rank", "Number", "Name", "Run", "Speed", "Best_Run"]]
+            )
+        return records(df[event_columns])
+
+    def rider_splits(self, session_id, rider_number):
+        df = self.frame(session_id)
+        number_column = "Number" if self.is_timed_training(session_id) else "rider_number"
+        rows = df[df[number_column].astype(str) == rider_number]
+        if rows.empty:
+            raise NotFound(f"Rider {rider_number} not found in {session_id}")
+        return records(rows)
+
+    def best_run_rows(self, session_id):
+        self._require_timed_training(session_id)
+        df = self.frame(session_id)
+        df_best_runs = best_runs(df)
+        return records(
+            df_best_runs[["Rank"] + timed_training_columns(split_count(df))]
+        )
+
+    def perfect_run_rows(self, session_id):
+        self._require_timed_training(session_id)
+        return records(hypothetical_best_runs(self.frame(session_id)))
+
+    def _require_timed_training(self, session_id):
+        self._session(session_id)
+        if not self.is_timed_training(session_id):
+            raise NotFound(f"{session_id} is not a timed training session")
+
+    def resolve(self, path):
+        """Map a request path to a cached response."""
+        parts = [unquote(part) for part in path.strip("/").split("/") if part]
+        match parts:
+            case ["events"]:
+                return self.response(
+                    ("events",), self.directory_version(), self.events
+                )
+            case ["events", event_id, "sessions"]:
+                return self.response(
+                    ("event", event_id),
+                    self.directory_version(),
+                    lambda: self.event(event_id)["sessions"],
+                )
+            case ["sessions", session_id, "leaderboard"]:
+                view = self.leaderboard
+            case ["sessions", session_id, "best-runs"]:
+                view = self.best_run_rows
+            case ["sessions", session_id, "perfect-runs"]:
+                view = self.perfect_run_rows
+            case ["sessions", session_id, "riders", rider_number, "splits"]:
+                _, version = self._session(session_id)
+                return self.response(
+                    ("splits", session_id, rider_number),
+                    version,
+                    lambda: self.rider_splits(session_id, rider_number),
+                )
+            case _:
+                raise NotFound(f"Unknown endpoint: {path}")
+
+        _, version = self._session(session_id)
+        return self.response(
+            (view.__name__, session_id), version, lambda: view(session_id)
+        )
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    store = None
+
+    def do_GET(self):
+        try:
+            response = self.store.resolve(urlsplit(self.path).path)
+        except NotFound as e:
+            self.send_json_error(HTTPStatus.NOT_FOUND, str(e))
+            return
+
+        if response.etag in self.headers.get("If-None-Match", ""):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", response.etag)
+            self.end_headers()
+            return
+
+        body = response.body
+        use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        if use_gzip:
+            body = response.gzipped()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", response.etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json_error(self, status, message):
+        body = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve the extracted results in the data folder as JSON."
+    )
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    ApiHandler.store = ResultsStore(args.data_dir)
+    server = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    print(f"Serving {args.data_dir} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,11 @@
 import streamlit as st
 from timed_training import show_timed_training
 from event_results import show_event_results
+from event_weekend import show_event_weekend
+from season_profile import show_season_profile
+from series_standings import show_series_standings
+from session_replay import show_session_replay
+from year_over_year import show_year_over_year
 
 """
 Downhill Mountain Bike World Cup Results
@@ -11,20 +16,27 @@ This app displays the results from the Downhill Mountain Bike World Cup events.
 This can be viewed at dhworldcup.streamlit.app
 """
 
+PAGES = {
+    "Event Results": show_event_results,
+    "Timed Training": show_timed_training,
+    "Event Weekend": show_event_weekend,
+    "Live Timing Replay": show_session_replay,
+    "Season Profile": show_season_profile,
+    "Year over Year": show_year_over_year,
+    "Series Standings": show_series_standings,
+}
+
 # Initialize session state if not already done
 if 'page' not in st.session_state:
     st.session_state.page = "Event Results"  # Default page
 
 # Page navigation
 st.sidebar.title("Navigation")
-page = st.sidebar.radio("Go to", ["Event Results", "Timed Training"], index=0 if st.session_state.page == "Event Results" else 1, key='navigation')
+page = st.sidebar.radio("Go to", list(PAGES), index=list(PAGES).index(st.session_state.page), key='navigation')
 
 # Update session state
 if 'navigation' in st.session_state:
     st.session_state.page = st.session_state.navigation
 
 # Show the appropriate page based on session state
-if st.session_state.page == "Event Results":
-    show_event_results()
-else:
-    show_timed_training()
\ No newline at end of file
+PAGES[st.session_state.page]()
\ No newline at end of file
@@ -0,0 +1,259 @@
+# Filename: build_reports.py
+# Description: This file contains a command line tool that renders the event results and timed training analysis for every session in data/ into self-contained offline HTML reports, one process per file.
+
+import argparse
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+import columns
+from catalog import catalog
+from figures import (
+    comparison_data,
+    comparison_figure,
+    rider_vs_rider_figure,
+    spread_figure,
+)
+from tt_analysis import (
+    best_runs,
+    comparison_index,
+    hypothetical_best_runs,
+    times_to_timedelta,
+    tt_time_columns,
+)
+from tt_schema import split_count
+from utils import (
+    SESSION_FILE_PATTERN,
+    clean_column_name,
+    event_times_to_timedelta,
+)
+
+COMPARISON_TYPES = ["Sector Times", "Split Times"]
+
+
+def table_html(df):
+    return df.to_html(index=False, na_rep="", border=0, classes="results")
+
+
+def figure_html(fig):
+    return fig.to_html(full_html=False, include_plotlyjs=False)
+
+
+def comparison_sections(
+    df, name_column, time_columns_by_type, n, pairs, heading, index_location
+):
+    """Charts for one dataset: top-N vs Nth spreads plus each rider pair."""
+    sections = []
+    for comparison_type in COMPARISON_TYPES:
+        time_columns = time_columns_by_type[comparison_type]
+        sections.append(f"<h3>{html.escape(heading)}: {comparison_type}</h3>")
+        for selected_rider, second_rider in pairs:
+            data = comparison_data(
+                df,
+                time_columns,
+                name_column,
+                selected_rider,
+                second_rider,
+                n,
+                index_location,
+            )
+            if data["primary"] is not None and data["secondary"] is not None:
+                sections.append(
+                    figure_html(
+                        rider_vs_rider_figure(data, selected_rider, second_rider)
+                    )
+                )
+        # The field comparison charts use the first pair that was found
+        selected_rider, second_rider = pairs[0]
+        data = comparison_data(
+            df,
+            time_columns,
+            name_column,
+            selected_rider,
+            second_rider,
+            n,
+            index_location,
+        )
+        sections.append(
+            figure_html(
+                comparison_figure(
+                    data,
+                    comparison_type,
+                    n,
+                    index_location,
+                    selected_rider,
+                    second_rider,
+                )
+            )
+        )
+        sections.append(
+            figure_html(
+                spread_figure(data, n, index_location, selected_rider, second_rider)
+            )
+        )
+    return sections
+
+
+def default_pairs(names, pairs):
+    """Requested pairs, or the first two riders in the file like the app does."""
+    if pairs:
+        return pairs
+    return [(names[0], names[1 if len(names) > 1 else 0])]
+
+
+def event_sections(df, n, pairs):
+    sections = [
+        "<h2>Results</h2>",
+        table_html(df[columns.event_columns].rename(columns=columns.clean_column_name)),
+        "<h2>Splits and Sector Ranks</h2>",
+        table_html(
+            df[columns.split_sector_display_columns(df)].rename(
+                columns=columns.clean_column_name
+            )
+        ),
+    ]
+    pairs = default_pairs(df["name"].unique(), pairs)
+    split_columns, sector_columns = columns.event_time_columns(df)
+    sections += comparison_sections(
+        event_times_to_timedelta(df),
+        "name",
+        {"Split Times": split_columns, "Sector Times": sector_columns},
+        n,
+        pairs,
+        "Results",
+        min(len(df), 30) - 1,
+    )
+    return sections
+
+
+def timed_training_sections(df, n, pairs):
+    split_columns, sector_columns = tt_time_columns(df)
+    tt_columns = {"Split Times": split_columns, "Sector Times": sector_columns}
+    df_best_runs = best_runs(df)
+    df_hypothetical_best = hypothetical_best_runs(df)
+    pairs = default_pairs(df["Name"].unique(), pairs)
+
+    sections = [
+        "<h2>Best Runs</h2>",
+        table_html(
+            df_best_runs[
+                ["Rank"] + columns.timed_training_columns(split_count(df))
+            ].rename(
+                columns=clean_column_name
+            )
+        ),
+    ]
+    index_location = comparison_index(df_best_runs)
+    sections += comparison_sections(
+        times_to_timedelta(df_best_runs),
+        "Name",
+        tt_columns,
+        n,
+        pairs,
+        "Best Runs",
+        index_location,
+    )
+    sections += [
+        "<h2>Hypothetical Perfect Runs</h2>",
+        table_html(df_hypothetical_best.rename(columns=clean_column_name)),
+    ]
+    sections += comparison_sections(
+        df_hypothetical_best,
+        "Name",
+        tt_columns,
+        n,
+        pairs,
+        "Hypothetical Perfect Runs",
+        index_location,
+    )
+    return sections
+
+
+def render_report(csv_path, output_dir, n, pairs, title):
+    """Write one HTML report for `csv_path` and return its path."""
+    file_prefix = os.path.splitext(os.path.basename(csv_path))[0]
+    session = SESSION_FILE_PATTERN.match(os.path.basename(csv_path))["session"]
+    df = pd.read_csv(csv_path)
+
+    if session == "tt":
+        sections = timed_training_sections(df, n, pairs)
+    else:
+        sections = event_sections(df, n, pairs)
+
+    output_path = os.path.join(output_dir, f"{file_prefix}.html")
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(
+            "<!DOCTYPE html>\n<html><head><meta charset='utf-8'>"
+            f"<title>{html.escape(title)}</title>"
+            f"<script type='text/javascript'>{get_plotlyjs()}</script>"
+            "<style>table.results{border-collapse:collapse;font:12px sans-serif}"
+            "table.results td,table.results th{padding:2px 6px;border-bottom:1px solid #ddd}"
+            "</style></head><body>"
+            f"<h1>{html.escape(title)}</h1>"
+            + "\n".join(sections)
+            + "</body></html>"
+        )
+    return output_path
+
+
+def write_index(report_paths, titles, output_dir):
+    links = "".join(
+        f"<li><a href='{html.escape(os.path.basename(path))}'>"
+        f"{html.escape(title)}</a></li>"
+        for path, title in zip(report_paths, titles)
+    )
+    index_path = os.path.join(output_dir, "index.html")
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write(
+            "<!DOCTYPE html>\n<html><head><meta charset='utf-8'>"
+            f"<title>Reports</title></head><body><ul>{links}</ul></body></html>"
+        )
+    return index_path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build static HTML reports for every session in the data folder."
+    )
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--output-dir", default="reports")
+    parser.add_argument(
+        "--top", type=int, default=10, help="Riders in the top-N average"
+    )
+    parser.add_argument(
+        "--pair",
+        nargs=2,
+        action="append",
+        metavar=("RIDER", "OTHER_RIDER"),
+        help="Rider-vs-rider comparison to include (name substrings, repeatable)",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    sessions = catalog(args.data_dir)
+    csv_paths = list(sessions["path"])
+    titles = list(sessions["label"])
+    pairs = [tuple(pair) for pair in args.pair or []]
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        report_paths = list(
+            pool.map(
+                render_report,
+                csv_paths,
+                [args.output_dir] * len(csv_paths),
+                [args.top] * len(csv_paths),
+                [pairs] * len(csv_paths),
+                titles,
+            )
+        )
+    for path in report_paths:
+        print(f"Wrote {path}")
+    print(f"Wrote {write_index(report_paths, titles, args.output_dir)}")
+
+
+if __name__ == "__main__":
+    main()
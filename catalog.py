@@ -0,0 +1,187 @@
+# Filename: catalog.py
+# Description: This file contains the catalog of result files in data/. File names are parsed with the results naming convention (venue, optional year, discipline, category, session), so a new event only needs its CSV in the folder. Events are ordered by season and then by EVENT_CALENDAR, the race order read from the dates on the timing sheets. The directory listing is cached by the folder's modification time. Each file's light metadata (row count, schema version) is cached by that file's modification time and size.
+
+import hashlib
+import os
+
+import pandas as pd
+
+from tt_schema import SCHEMA_VERSION_COLUMN
+from utils import SESSION_FILE_PATTERN
+
+VENUE_NAMES = {
+    "biel": "Biel",
+    "fwil": "Fort William",
+    "gets": "Les Gets",
+    "leog": "Leogang",
+    "mtsa": "Mont-Sainte-Anne",
+    "vdso": "Val di Sole",
+}
+CATEGORY_NAMES = {
+    "me": "Men Elite",
+    "we": "Women Elite",
+    "mj": "Men Junior",
+    "wj": "Women Junior",
+}
+# In the order they are run over an event weekend
+SESSION_NAMES = {
+    "tt": "Time Training",
+    "q1": "Q1 Qualifications",
+    "q2": "Q2 Qualifications",
+    "qr": "Qualifications",
+    "semi": "Semi-Finals",
+    "f": "Finals",
+}
+# Events in race order, from the dates printed on their timing sheets (the
+# files without a year are the 2024 season). An event missing from the list
+# sorts after the listed events of its season, by venue name
+EVENT_CALENDAR = [
+    "fwil",
+    "biel",
+    "leog",
+    "vdso",
+    "gets",
+    "mtsa",
+    "leog_2025",
+    "vdso_2025",
+]
+CATALOG_COLUMNS = [
+    "label",
+    "path",
+    "event",
+    "venue",
+    "venue_name",
+    "year",
+    "round",
+    "discipline",
+    "category",
+    "category_name",
+    "session",
+    "session_name",
+    "rows",
+    "schema_version",
+]
+
+# Derived season-wide artifacts (rider identities, season index) live here
+SEASON_DIR = os.path.join("data", ".season")
+
+_listings = {}  # data_dir -> (directory mtime, parsed file names)
+_metadata = {}  # path -> ((mtime, size), metadata)
+
+
+def parse_file_name(file_name):
+    """Naming convention fields of a results file, or None if it does not follow it."""
+    match = SESSION_FILE_PATTERN.match(file_name)
+    if match is None or match["extension"] != "csv":
+        return None
+    venue, year = match["venue"], match["year"]
+    category = match["category"]
+    return {
+        "event": "_".join(filter(None, [venue, year])),
+        "venue": venue,
+        "venue_name": VENUE_NAMES.get(venue, venue.upper()),
+        "year": int(year) if year else None,
+        "discipline": match["discipline"],
+        "category": category,
+        "category_name": CATEGORY_NAMES.get(category, category.upper()),
+        "session": match["session"],
+        "session_name": SESSION_NAMES[match["session"]],
+    }
+
+
+def session_label(entry):
+    """Display name, e.g. "Val di Sole 2025 Q1 Qualifications"."""
+    parts = [entry["venue_name"], str(entry["year"]) if entry["year"] else None]
+    if entry["category"] != "me":
+        parts.append(entry["category_name"])
+    parts.append(entry["session_name"])
+    return " ".join(filter(None, parts))
+
+
+def file_metadata(path, stat):
+    """Row count and schema version, read from the header and the line count."""
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _metadata.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with open(path, "rb") as f:
+        rows = max(sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b"")) - 1, 0)
+    header = pd.read_csv(path, nrows=1)
+    metadata = {
+        "rows": rows,
+        "schema_version": (
+            int(header[SCHEMA_VERSION_COLUMN].iloc[0])
+            if SCHEMA_VERSION_COLUMN in header.columns and len(header)
+            else None
+        ),
+    }
+    _metadata[path] = (key, metadata)
+    return metadata
+
+
+def listing(data_dir):
+    """Parsed names of the results files in `data_dir`, rescanned only when it changes."""
+    version = os.stat(data_dir).st_mtime_ns
+    cached = _listings.get(data_dir)
+    if cached is None or cached[0] != version:
+        entries = []
+        for file_name in os.listdir(data_dir):
+            entry = parse_file_name(file_name)
+            if entry is not None:
+                entry["path"] = os.path.join(data_dir, file_name)
+                entries.append(entry)
+        cached = (version, entries)
+        _listings[data_dir] = cached
+    return cached[1]
+
+
+def catalog(data_dir="data"):
+    """One row per results file, newest season first, events in race order, sessions in weekend order.
+
+    `round` is the event's position in EVENT_CALENDAR (missing for an event
+    not listed there), so it orders events within a season.
+    """
+    rows = []
+    for entry in listing(data_dir):
+        try:
+            stat = os.stat(entry["path"])
+        except FileNotFoundError:
+            continue
+        rows.append({**entry, **file_metadata(entry["path"], stat), "label": session_label(entry)})
+    df = pd.DataFrame(rows, columns=CATALOG_COLUMNS)
+    df["year"] = df["year"].astype("Int64")
+    df["schema_version"] = df["schema_version"].astype("Int64")
+    df["round"] = df["event"].map(
+        {event: position for position, event in enumerate(EVENT_CALENDAR)}
+    ).astype("Int64")
+    df["session_order"] = df["session"].map(list(SESSION_NAMES).index)
+    df = df.sort_values(
+        ["year", "round", "venue_name", "category", "session_order"],
+        ascending=[False, True, True, True, True],
+        na_position="last",
+    )
+    return df.drop(columns="session_order").reset_index(drop=True)
+
+
+def source_version(sessions, salt=""):
+    """Digest of the name, modification time and size of every file in `sessions`.
+
+    Artifacts derived from the whole catalog store it and rebuild when it changes.
+    """
+    digest = hashlib.sha256(str(salt).encode())
+    for path in sorted(sessions["path"]):
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+    return digest.hexdigest()
+
+
+def session_options(timed_training, data_dir="data"):
+    """Label -> path for the timed training sessions, or for all race sessions."""
+    df = catalog(data_dir)
+    df = df[(df["session"] == "tt") == timed_training]
+    return dict(zip(df["label"], df["path"]))
+
+
+if __name__ == "__main__":
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(catalog().drop(columns=["path", "event"]).to_string(index=False))
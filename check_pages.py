@@ -1,20 +1,211 @@
-import fitz
+# Filename: check_pages.py
+# Description: This file contains the inspection CLI for timing sheet PDFs. It scans any set of PDFs in parallel and reports for each one the pages, the detected layout (race or timed training, team column, split count, the line where the table starts, i.e. table_start_line) and riders per page, counted the way the parser reads them. It also reports how long text extraction takes. Use it to triage a new sheet format before touching a parser.
+
+import argparse
+import contextlib
+import io
+import json
+import os
 import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from page_cache import decode_pdf, read_source
+from run_fingerprint import normalize_splits
+from split_pdf_extraction_2025 import detect_split_count, parse_rider_pages_2025
+
+RIDER_LINE = re.compile(r"^\d+\s+[A-Z]")
+RANK_LINE = re.compile(r"^\d+\.(\s+[pP])?$")
+TIME_LINE = re.compile(r"^\d+:\d{2}\.\d{3}$")
+UCI_ID_LINE = re.compile(r"^\d{11}$")
+NATION_LINE = re.compile(r"^[A-Z]{3}$")
+RUN_LABEL = re.compile(r"^RUN \d+$")
+
+
+def table_start(lines):
+    """Index of the first table row on a page, or None if there is none."""
+    for index, line in enumerate(lines):
+        if RANK_LINE.match(line) or RIDER_LINE.match(line):
+            return index
+    return None
+
+
+def timing_points(pages):
+    """Most common number of distinct times in a run of consecutive time lines.
+
+    Timed training headers have no intermediate labels, so the count comes
+    from the runs themselves (the repeated final time counts once). A "-" is
+    a timing point that did not record and does not end the run.
+    """
+    lengths = Counter()
+    for lines in pages:
+        run = []
+        for line in lines + [""]:
+            line = line.strip()
+            if TIME_LINE.match(line):
+                run.append(line)
+                continue
+            if line == "-":
+                continue
+            length = len(normalize_splits(run))
+            if length > 1:
+                lengths[length] += 1
+            run = []
+    return lengths.most_common(1)[0][0] if lengths else 0
+
+
+def team_share(pages):
+    """Share of riders with a team line after their name (printed four times)."""
+    riders = with_team = 0
+    for lines in pages:
+        for index, line in enumerate(lines):
+            if not RIDER_LINE.match(line) or index + 4 >= len(lines):
+                continue
+            riders += 1
+            following = lines[index + 4].strip()
+            if not (
+                UCI_ID_LINE.match(following)
+                or NATION_LINE.match(following)
+                or TIME_LINE.match(following)
+                or following in ("", "-")
+                or re.match(r"^[\d.]+", following)
+            ):
+                with_team += 1
+    return round(with_team / riders, 2) if riders else 0.0
+
+
+def sheet_layout(pages):
+    """Kind, header labels and table start line of a sheet's decoded pages."""
+    header = pages[0][: table_start(pages[0]) or len(pages[0])] if pages else []
+    title = next((line for line in header if "DOWNHILL" in line), "")
+    starts = [table_start(lines) for lines in pages]
+    return {
+        "kind": "tt" if "TIMED TRAINING" in title else "race",
+        "title": title,
+        "category": next(
+            (
+                header[index + 1]
+                for index, line in enumerate(header[:-1])
+                if line.lower().startswith("start time")
+            ),
+            "",
+        ),
+        "run_columns": sum(1 for line in header if RUN_LABEL.match(line)),
+        "speed_unit": any(line.endswith("kmh") for lines in pages for line in lines),
+        "table_start_line": min((s for s in starts if s is not None), default=None),
+        "table_start_lines": sorted({s for s in starts if s is not None}),
+    }
+
+
+def race_rows_per_page(pages, table_start_line, split_count):
+    """(rider rows, rows set aside) per page of a race sheet.
+
+    Each page goes through parse_rider_pages_2025, so a row counts only if
+    the row classifier accepts it, exactly as in the extracted CSV.
+    """
+    counts = []
+    for lines in pages:
+        with contextlib.redirect_stdout(io.StringIO()):
+            riders, rejected = parse_rider_pages_2025(
+                [lines], table_start_line or 0, split_count
+            )
+        counts.append((len(riders), len(rejected)))
+    return counts
+
+
+def inspect_pdf(path):
+    """Layout summary of one PDF."""
+    start = time.perf_counter()
+    pages = [page["lines"] for page in decode_pdf(read_source(path))]
+    decode_seconds = time.perf_counter() - start
+
+    layout = sheet_layout(pages)
+    kind = layout["kind"]
+    # Intermediates for races, timing points (finish included) for timed
+    # training, the same way the parsers count them
+    split_count = timing_points(pages) if kind == "tt" else detect_split_count(pages)
+    if kind == "tt":
+        # One name line per rider, whatever the number of runs
+        riders_per_page = [sum(1 for line in lines if RIDER_LINE.match(line)) for lines in pages]
+        rejected_rows = 0
+    else:
+        counts = race_rows_per_page(pages, layout["table_start_line"], split_count)
+        riders_per_page = [riders for riders, _ in counts]
+        rejected_rows = sum(rejected for _, rejected in counts)
+
+    return {
+        "file": path,
+        "pages": len(pages),
+        **layout,
+        "split_count": split_count,
+        "team_share": team_share(pages),
+        "riders": sum(riders_per_page),
+        "riders_per_page": riders_per_page,
+        "rejected_rows": rejected_rows,
+        "lines": sum(len(lines) for lines in pages),
+        "decode_seconds": round(decode_seconds, 3),
+    }
+
+
+def pdf_paths(sources):
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths += sorted(
+                os.path.join(source, name)
+                for name in os.listdir(source)
+                if name.endswith(".pdf")
+            )
+        else:
+            paths.append(source)
+    return paths
+
+
+def print_lines(path, line_count, page_count):
+    """The first lines of the first pages, to eyeball a layout."""
+    pages = [page["lines"] for page in decode_pdf(read_source(path))]
+    for page_num, lines in enumerate(pages[:page_count]):
+        print(f"---- {path} page {page_num + 1} ----")
+        for index, line in enumerate(lines[:line_count]):
+            print(f"{index:4} {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report the layout of timing sheet PDFs (pages, format, split count, table start, riders)."
+    )
+    parser.add_argument("sources", nargs="*", default=["data"], help="PDF files or folders")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--lines", type=int, default=0, help="Also print the first N lines of each file's pages"
+    )
+    parser.add_argument("--pages", type=int, default=1, help="Pages to print with --lines")
+    args = parser.parse_args()
+
+    paths = pdf_paths(args.sources)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        reports = list(executor.map(inspect_pdf, paths))
 
-doc = fitz.open("data/vdso_2025_dhi_me_results_tt.pdf")
-print(f"Total pages: {len(doc)}")
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False))
+    else:
+        table = pd.DataFrame(reports).drop(columns=["title", "table_start_lines"])
+        table["file"] = table["file"].map(os.path.basename)
+        table["riders_per_page"] = table["riders_per_page"].map(
+            lambda counts: "/".join(map(str, counts))
+            if len(counts) <= 10
+            else f"{min(counts)}-{max(counts)} over {len(counts)} pages"
+        )
+        with pd.option_context("display.width", 250, "display.max_columns", None):
+            print(table.to_string(index=False))
 
-for i in range(len(doc)):
-    text = doc[i].get_text("text")
-    lines = text.split("\n")
-    riders = [line for line in lines if re.match(r"^\d+\s+[A-Z]", line)]
-    print(f"Page {i+1}: {len(riders)} riders")
+    for path in paths if args.lines else []:
+        print_lines(path, args.lines, args.pages)
 
-    # Show first few riders on each page
-    for rider in riders[:3]:
-        print(f"  {rider}")
-    if len(riders) > 3:
-        print(f"  ... and {len(riders)-3} more")
-    print()
 
-doc.close()
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,47 @@
-split_sector_columns = [
-    "Number", "Name", "Run", "Speed", "Speed_Rank", "Orig_Split_1_Time", "Orig_Split_2_Time",
-    "Orig_Split_3_Time", "Orig_Split_4_Time", "Orig_Split_5_Time", "Split_1_Rank", "Split_2_Rank",
-    "Split_3_Rank", "Split_4_Rank", "Split_5_Rank", "Sector_1_Time", "Sector_2_Time",
-    "Sector_3_Time", "Sector_4_Time", "Sector_5_Time", "Sector_1_Rank", "Sector_2_Rank",
-    "Sector_3_Rank", "Sector_4_Rank", "Sector_5_Rank", "Cumulative_from_Split_1_Time",
-    "Cumulative_from_Split_2_Time", "Cumulative_from_Split_3_Time", "Cumulative_from_Split_4_Time",
-    "Cumulative_from_Split_1_Rank", "Cumulative_from_Split_2_Rank", "Cumulative_from_Split_3_Rank",
-    "Cumulative_from_Split_4_Rank"
-]
-
-timedelta_columns = [
-    "Orig_Split_1_Time", "Orig_Split_2_Time", "Orig_Split_3_Time", "Orig_Split_4_Time",
-    "Orig_Split_5_Time", "Sector_1_Time", "Sector_2_Time", "Sector_3_Time", "Sector_4_Time",
-    "Sector_5_Time", "Cumulative_from_Split_1_Time", "Cumulative_from_Split_2_Time",
-    "Cumulative_from_Split_3_Time", "Cumulative_from_Split_4_Time"
-]
-
-preferred_columns = split_sector_columns
+import re
 
 event_columns = [
     "rank", "name", "team", "country", "final_time", "points"
 ]
 
-split_sector_display_columns = [
-    "rank", "name", "final_time", "split_1", "split_2", "split_3", "split_4",
-    "split_1_rank", "split_2_rank", "split_3_rank", "split_4_rank", "sector_1",
-    "sector_2", "sector_3", "sector_4", "sector_5", "sector_1_rank", "sector_2_rank",
-    "sector_3_rank", "sector_4_rank", "sector_5_rank"
-]
+def numbered_columns(df, prefix):
+    """`prefix`_1, `prefix`_2, ... columns of `df` in timing order."""
+    pattern = re.compile(rf"^{prefix}_(\d+)$")
+    numbered = {
+        int(match.group(1)): col
+        for col in df.columns
+        if (match := pattern.match(col))
+    }
+    return [numbered[number] for number in sorted(numbered)]
 
-split_columns = ["split_1", "split_2", "split_3", "split_4"]
-sector_columns = ["sector_1", "sector_2", "sector_3", "sector_4", "sector_5"]
+
+def event_time_columns(df):
+    """Split and sector columns of an event results frame (any number of splits)."""
+    return numbered_columns(df, "split"), numbered_columns(df, "sector")
+
+
+def split_sector_display_columns(df):
+    split_columns, sector_columns = event_time_columns(df)
+    return (
+        ["rank", "name", "final_time"]
+        + split_columns
+        + [f"{col}_rank" for col in split_columns]
+        + sector_columns
+        + [f"{col}_rank" for col in sector_columns]
+    )
 
 def clean_column_name(col_name):
     return col_name.replace("_", " ").replace(" Time", "")
+
+def timed_training_columns(split_count):
+    """Display columns of a timed training session with `split_count` timing points."""
+    points = range(1, split_count + 1)
+    return (
+        ["Number", "Name", "Run", "Speed", "Speed_Rank"]
+        + [f"Orig_Split_{i}_Time" for i in points]
+        + [f"Split_{i}_Rank" for i in points]
+        + [f"Sector_{i}_Time" for i in points]
+        + [f"Sector_{i}_Rank" for i in points]
+        + [f"Cumulative_from_Split_{i}_Time" for i in points[:-1]]
+        + [f"Cumulative_from_Split_{i}_Rank" for i in points[:-1]]
+    )
@@ -3,19 +3,33 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.graph_objs as go
+from catalog import session_options
 from columns import (
     event_columns,
+    event_time_columns,
     split_sector_display_columns,
-    split_columns,
-    sector_columns,
     clean_column_name,
 )
+from figures import (
+    comparison_data,
+    comparison_figure,
+    rider_vs_rider_figure,
+    spread_figure,
+)
+from sections import (
+    show_change_log,
+    show_positions,
+    show_head_to_head,
+    show_quarantine,
+    show_rank_sensitivity,
+)
+from table_view import load_csv, show_table
+from utils import event_times_to_timedelta
 
 
 def load_data(file_path):
     try:
-        return pd.read_csv(file_path)
+        return load_csv(file_path)
     except FileNotFoundError:
         st.error("File not found. Please check the file path.")
     except pd.errors.EmptyDataError:
@@ -26,43 +40,45 @@ def load_data(file_path):
 
 
 def show_event_results():
-    file_mapping = {
-        "Val di Sole 2025 Q1 Qualifications": "data/vdso_2025_dhi_me_results_q1.csv",
-        "Val di Sole 2025 Q2 Qualifications": "data/vdso_2025_dhi_me_results_q2.csv",
-        "Fort William Qualifications": "data/fwil_dhi_me_results_qr.csv",
-        "Fort William Semi-Finals": "data/fwil_dhi_me_results_semi.csv",
-        "Fort William Finals": "data/fwil_dhi_me_results_f.csv",
-        "Biel Qualifications": "data/biel_dhi_me_results_qr.csv",
-        "Biel Semi-Finals": "data/biel_dhi_me_results_semi.csv",
-        "Biel Finals": "data/biel_dhi_me_results_f.csv",
-        "Leogang Qualifications": "data/leog_dhi_me_results_qr.csv",
-        "Leogang Semi-Finals": "data/leog_dhi_me_results_semi.csv",
-        "Leogang Finals": "data/leog_dhi_me_results_f.csv",
-        "Val di Sole Qualifications": "data/vdso_dhi_me_results_qr.csv",
-        "Val di Sole Semi-Finals": "data/vdso_dhi_me_results_semi.csv",
-        "Val di Sole Finals": "data/vdso_dhi_me_results_f.csv",
-        "Les Gets Qualifications": "data/gets_dhi_me_results_qr.csv",
-        "Les Gets Semi-Finals": "data/gets_dhi_me_results_semi.csv",
-        "Mont-Sainte-Anne Qualifications": "data/mtsa_dhi_me_results_qr.csv",
-        "Leogang 2025 Q1 Qualifications": "data/leog_2025_dhi_me_results_q1.csv",
-    }
+    file_mapping = session_options(timed_training=False)
 
     st.title("Downhill Mountain Bike World Cup Event Results")
 
     file_choice = st.selectbox(
         "Select event results:", list(file_mapping.keys()), key="event_results_select"
     )
-    df = load_data(file_mapping[file_choice])
+    file_path = file_mapping[file_choice]
+    df = load_data(file_path)
     if df is None:
         return
 
-    simple_df = df[event_columns]
+    changed_riders = show_change_log(file_path)
+    show_quarantine(file_path)
+    simple_df = df[event_columns].copy()
+    if changed_riders:
+        simple_df["changes"] = (
+            df["rider_number"].astype(str).map(changed_riders).fillna("")
+        )
     simple_df.set_index("rank", inplace=True)
-    st.dataframe(simple_df.rename(columns=clean_column_name), hide_index=False)
+    show_table(
+        simple_df.rename(columns=clean_column_name),
+        key="event_results_table",
+        source_key=file_path,
+        hide_index=False,
+        search_column="name",
+    )
 
     st.write("Splits and Sector Ranks")
-    splits_df = df[split_sector_display_columns].set_index("rank")
-    st.dataframe(splits_df.rename(columns=clean_column_name), hide_index=False)
+    splits_df = df[split_sector_display_columns(df)].set_index("rank")
+    show_table(
+        splits_df.rename(columns=clean_column_name),
+        key="event_splits_table",
+        source_key=file_path,
+        hide_index=False,
+        search_column="name",
+    )
+
+    show_positions(file_path, "event")
 
     col1, col2 = st.columns(2)
     with col1:
@@ -91,203 +107,43 @@ def show_event_results():
             key="second_rider_select",
         )
 
-    columns_to_convert = split_columns + sector_columns
-    for column in columns_to_convert:
-        df[column] = pd.to_timedelta("00:" + df[column], errors="coerce")
-
+    df = event_times_to_timedelta(df)
     index_location = min(len(df), 30) - 1
 
+    split_columns, sector_columns = event_time_columns(df)
     if comparison_type == "Split Times":
         st.write("## Split Time Comparison")
-        top_times_avg = df[split_columns].head(n).mean()
-        thirtieth_times = df[split_columns].iloc[index_location]
-        primary_rider_times = df[split_columns].loc[
-            df["name"].str.contains(selected_rider, case=False, na=False)
-        ]
-        secondary_rider_times = df[split_columns].loc[
-            df["name"].str.contains(second_rider, case=False, na=False)
-        ]
+        time_columns = split_columns
     else:
         st.write("## Sector Time Comparison")
-        top_times_avg = df[sector_columns].head(n).mean()
-        thirtieth_times = df[sector_columns].iloc[index_location]
-        primary_rider_times = df[sector_columns].loc[
-            df["name"].str.contains(selected_rider, case=False, na=False)
-        ]
-        secondary_rider_times = df[sector_columns].loc[
-            df["name"].str.contains(second_rider, case=False, na=False)
-        ]
+        time_columns = sector_columns
 
-    spread_top_thirtieth = top_times_avg - thirtieth_times
-    spread_primary_rider_vs_top_rider_avg = (
-        top_times_avg - primary_rider_times.iloc[0]
-        if not primary_rider_times.empty
-        else None
-    )
-    spread_secondary_rider_vs_top_rider_avg = (
-        top_times_avg - secondary_rider_times.iloc[0]
-        if not secondary_rider_times.empty
-        else None
+    data = comparison_data(
+        df, time_columns, "name", selected_rider, second_rider, n, index_location
     )
 
-    if not primary_rider_times.empty and not secondary_rider_times.empty:
+    if data["primary"] is not None and data["secondary"] is not None:
         st.write("## Rider vs Rider Detailed Comparison")
-        fig_rider_vs_rider = go.Figure()
-
-        fig_rider_vs_rider.add_trace(
-            go.Bar(
-                x=primary_rider_times.columns,
-                y=primary_rider_times.iloc[0].dt.total_seconds(),
-                name=selected_rider,
-                marker_color="green",
-            )
-        )
-        fig_rider_vs_rider.add_trace(
-            go.Bar(
-                x=secondary_rider_times.columns,
-                y=secondary_rider_times.iloc[0].dt.total_seconds(),
-                name=second_rider,
-                marker_color="red",
-            )
+        st.plotly_chart(
+            rider_vs_rider_figure(data, selected_rider, second_rider),
+            use_container_width=True,
         )
-
-        spread_rider_vs_rider = (
-            primary_rider_times.iloc[0] - secondary_rider_times.iloc[0]
-        )
-        fig_rider_vs_rider.add_trace(
-            go.Scatter(
-                x=spread_rider_vs_rider.index,
-                y=spread_rider_vs_rider.dt.total_seconds(),
-                name="Incremental Spread",
-                mode="lines+markers",
-                marker=dict(color="orange", size=10),
-                yaxis="y2",
-            )
-        )
-        cumulative_spread = spread_rider_vs_rider.dt.total_seconds().cumsum()
-        fig_rider_vs_rider.add_trace(
-            go.Scatter(
-                x=cumulative_spread.index,
-                y=cumulative_spread,
-                name="Cumulative Spread",
-                mode="lines+markers",
-                marker=dict(color="purple", size=10),
-                yaxis="y2",
-            )
-        )
-
-        fig_rider_vs_rider.update_layout(
-            title=f"{selected_rider} vs {second_rider} Comparison and Spreads",
-            xaxis_title="Time Split",
-            yaxis=dict(
-                title="Time (seconds)",
-                title_font=dict(color="blue"),
-                tickfont=dict(color="blue"),
-            ),
-            yaxis2=dict(
-                title="Spread (seconds)",
-                overlaying="y",
-                side="right",
-                title_font=dict(color="purple"),
-                tickfont=dict(color="purple"),
-            ),
-            shapes=[
-                dict(
-                    type="line",
-                    xref="paper",
-                    x0=0,
-                    x1=1,
-                    yref="y2",
-                    y0=0,
-                    y1=0,
-                    line=dict(color="gray", width=3, dash="dash"),
-                )
-            ],
-        )
-
-        st.plotly_chart(fig_rider_vs_rider, use_container_width=True)
+        show_head_to_head(file_path, selected_rider, second_rider)
 
     st.write(f"## {comparison_type}")
     st.write(
         f"#### Compare Top {n} avg vs {index_location+1}th Place vs Selected Riders"
     )
-    fig = go.Figure()
-    fig.add_trace(
-        go.Bar(
-            x=top_times_avg.index,
-            y=top_times_avg.dt.total_seconds(),
-            name=f"Top {n} Avg",
-            marker_color="blue",
-        )
-    )
-    fig.add_trace(
-        go.Bar(
-            x=thirtieth_times.index,
-            y=thirtieth_times.dt.total_seconds(),
-            name=f"{index_location+1}th Place",
-            marker_color="orange",
-        )
-    )
-    if not primary_rider_times.empty:
-        fig.add_trace(
-            go.Bar(
-                x=primary_rider_times.columns,
-                y=primary_rider_times.iloc[0].dt.total_seconds(),
-                name=selected_rider,
-                marker_color="green",
-            )
-        )
-    if not secondary_rider_times.empty:
-        fig.add_trace(
-            go.Bar(
-                x=secondary_rider_times.columns,
-                y=secondary_rider_times.iloc[0].dt.total_seconds(),
-                name=second_rider,
-                marker_color="red",
-            )
-        )
-    fig.update_layout(
-        title=f"Average {comparison_type} Comparison",
-        xaxis_title="Time Split",
-        yaxis_title="Time (seconds)",
-        barmode="group",
-    )
-
-    st.plotly_chart(fig, use_container_width=True)
-
-    fig_spread = go.Figure()
-    fig_spread.add_trace(
-        go.Bar(
-            x=spread_top_thirtieth.index,
-            y=spread_top_thirtieth.dt.total_seconds(),
-            name=f"{index_location+1}th Place",
-            marker_color="orange",
-        )
+    st.plotly_chart(
+        comparison_figure(
+            data, comparison_type, n, index_location, selected_rider, second_rider
+        ),
+        use_container_width=True,
     )
-    if spread_primary_rider_vs_top_rider_avg is not None:
-        fig_spread.add_trace(
-            go.Bar(
-                x=spread_primary_rider_vs_top_rider_avg.index,
-                y=spread_primary_rider_vs_top_rider_avg.dt.total_seconds(),
-                name=selected_rider,
-                marker_color="green",
-            )
-        )
-    if spread_secondary_rider_vs_top_rider_avg is not None:
-        fig_spread.add_trace(
-            go.Bar(
-                x=spread_secondary_rider_vs_top_rider_avg.index,
-                y=spread_secondary_rider_vs_top_rider_avg.dt.total_seconds(),
-                name=second_rider,
-                marker_color="red",
-            )
-        )
 
-    fig_spread.update_layout(
-        title=f"Spread Comparison (Gap to Top {n} Avg)",
-        xaxis_title="Time Split",
-        yaxis_title="Time (seconds)",
-        barmode="group",
+    st.plotly_chart(
+        spread_figure(data, n, index_location, selected_rider, second_rider),
+        use_container_width=True,
     )
 
-    st.plotly_chart(fig_spread, use_container_width=True)
+    show_rank_sensitivity(file_path, selected_rider, n, "event")
@@ -0,0 +1,60 @@
+# Filename: event_weekend.py
+# Description: This file contains the show_event_weekend function that displays every round of one event (timed training, qualifying, semi-finals, finals) as a single per-rider table, with the change in time and rank from one round to the next. It is imported in app.py.
+
+import streamlit as st
+
+from catalog import catalog
+from figures import weekend_progression_figure
+from weekend_table import QUALIFY_DIRECT, load_weekend, round_prefix
+
+
+def show_event_weekend():
+    st.title("Downhill Mountain Bike World Cup Event Weekend")
+
+    sessions = catalog()
+    events = dict(
+        zip(sessions["event"], sessions["venue_name"] + " " + sessions["year"].astype("string").fillna(""))
+    )
+    event = st.selectbox(
+        "Select an event:",
+        list(events),
+        format_func=lambda event: events[event].strip(),
+        key="event_weekend_select",
+    )
+    table = load_weekend(event)
+    rounds = [
+        round_prefix(session)
+        for session in sessions.loc[sessions["event"] == event, "session"]
+        if f"{round_prefix(session)}_Rank" in table.columns
+    ]
+
+    show_sectors = st.toggle("Show sector times", key="event_weekend_sectors_toggle")
+    columns = ["Name", "Country", "Number", "Last_Round"] + [
+        col
+        for col in table.columns
+        if (col.split("_")[0] in rounds and (show_sectors or "_Sector_" not in col))
+        or col.endswith("_Delta")
+    ]
+    st.write(
+        f"{len(table)} riders. Time deltas are later round minus earlier round "
+        "(negative is faster); rank deltas are places gained. Q2 is the second-chance round: "
+        f"Q1's top {QUALIFY_DIRECT} go straight through and are listed first."
+    )
+    st.dataframe(
+        table[columns].rename(columns=lambda col: col.replace("_", " ")),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    n = st.selectbox(
+        "Riders to chart (furthest round first)",
+        [10, 20, 30],
+        key="event_weekend_num_riders_select",
+    )
+    st.plotly_chart(
+        weekend_progression_figure(table.head(n), rounds), use_container_width=True
+    )
+
+
+if __name__ == "__main__":
+    show_event_weekend()
@@ -0,0 +1,389 @@
+# Filename: figures.py
+# Description: This file contains the Plotly figure builders shared by the Streamlit pages (plot_helper.py, event_results.py) and the static report generator (build_reports.py). Nothing in here depends on Streamlit.
+
+import plotly.graph_objs as go
+
+
+def comparison_data(
+    df, time_columns, name_column, selected_rider, second_rider, n, index_location
+):
+    """Collect the series every comparison chart is built from.
+
+    `df` must be sorted fastest first and hold timedelta values in `time_columns`.
+    Rider times are None when the rider is not found in `df`.
+    """
+    times = df[time_columns]
+    top_times_avg = times.head(n).mean()
+    nth_times = times.iloc[index_location]
+
+    def rider_times(rider):
+        mask = df[name_column].str.contains(rider, case=False, na=False, regex=False)
+        matches = times.loc[mask]
+        return None if matches.empty else matches.iloc[0]
+
+    return {
+        "top_times_avg": top_times_avg,
+        "nth_times": nth_times,
+        "primary": rider_times(selected_rider),
+        "secondary": rider_times(second_rider),
+    }
+
+
+def rider_vs_rider_figure(data, selected_rider, second_rider):
+    """Two riders side by side with incremental and cumulative spread."""
+    primary, secondary = data["primary"], data["secondary"]
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Bar(
+            x=primary.index,
+            y=primary.dt.total_seconds(),
+            name=selected_rider,
+            marker_color="green",
+        )
+    )
+    fig.add_trace(
+        go.Bar(
+            x=secondary.index,
+            y=secondary.dt.total_seconds(),
+            name=second_rider,
+            marker_color="red",
+        )
+    )
+
+    spread_rider_vs_rider = primary - secondary
+    fig.add_trace(
+        go.Scatter(
+            x=spread_rider_vs_rider.index,
+            y=spread_rider_vs_rider.dt.total_seconds(),
+            name="Incremental Spread",
+            mode="lines+markers",
+            marker=dict(color="orange", size=10),
+            yaxis="y2",
+        )
+    )
+    cumulative_spread = spread_rider_vs_rider.dt.total_seconds().cumsum()
+    fig.add_trace(
+        go.Scatter(
+            x=cumulative_spread.index,
+            y=cumulative_spread,
+            name="Cumulative Spread",
+            mode="lines+markers",
+            marker=dict(color="purple", size=10),
+            yaxis="y2",
+        )
+    )
+
+    fig.update_layout(
+        title=f"{selected_rider} vs {second_rider} Comparison and Spreads",
+        xaxis_title="Time Split",
+        yaxis=dict(
+            title="Time (seconds)",
+            title_font=dict(color="blue"),
+            tickfont=dict(color="blue"),
+        ),
+        yaxis2=dict(
+            title="Spread (seconds)",
+            overlaying="y",
+            side="right",
+            title_font=dict(color="purple"),
+            tickfont=dict(color="purple"),
+        ),
+        shapes=[
+            dict(
+                type="line",
+                xref="paper",
+                x0=0,
+                x1=1,
+                yref="y2",
+                y0=0,
+                y1=0,
+                line=dict(color="gray", width=3, dash="dash"),
+            )
+        ],
+    )
+    return fig
+
+
+def comparison_figure(
+    data, comparison_type, n, index_location, selected_rider, second_rider
+):
+    """Top-N average vs the Nth place rider vs the two selected riders."""
+    fig = go.Figure()
+    fig.add_trace(
+        go.Bar(
+            x=data["top_times_avg"].index,
+            y=data["top_times_avg"].dt.total_seconds(),
+            name=f"Top {n} Avg",
+            marker_color="blue",
+        )
+    )
+    fig.add_trace(
+        go.Bar(
+            x=data["nth_times"].index,
+            y=data["nth_times"].dt.total_seconds(),
+            name=f"{index_location+1}th Place",
+            marker_color="orange",
+        )
+    )
+    for rider_times, rider, color in (
+        (data["primary"], selected_rider, "green"),
+        (data["secondary"], second_rider, "red"),
+    ):
+        if rider_times is not None:
+            fig.add_trace(
+                go.Bar(
+                    x=rider_times.index,
+                    y=rider_times.dt.total_seconds(),
+                    name=rider,
+                    marker_color=color,
+                )
+            )
+    fig.update_layout(
+        title=f"Average {comparison_type} Comparison",
+        xaxis_title="Time Split",
+        yaxis_title="Time (seconds)",
+        barmode="group",
+    )
+    return fig
+
+
+def spread_figure(data, n, index_location, selected_rider, second_rider):
+    """Gap of the Nth place rider and the selected riders to the top-N average."""
+    top_times_avg = data["top_times_avg"]
+    fig = go.Figure()
+    spread_top_nth = top_times_avg - data["nth_times"]
+    fig.add_trace(
+        go.Bar(
+            x=spread_top_nth.index,
+            y=spread_top_nth.dt.total_seconds(),
+            name=f"{index_location+1}th Place",
+            marker_color="orange",
+        )
+    )
+    for rider_times, rider, color in (
+        (data["primary"], selected_rider, "green"),
+        (data["secondary"], second_rider, "red"),
+    ):
+        if rider_times is not None:
+            spread = top_times_avg - rider_times
+            fig.add_trace(
+                go.Bar(
+                    x=spread.index,
+                    y=spread.dt.total_seconds(),
+                    name=rider,
+                    marker_color=color,
+                )
+            )
+
+    fig.update_layout(
+        title=f"Spread Comparison (Gap to Top {n} Avg)",
+        xaxis_title="Time Split",
+        yaxis_title="Time (seconds)",
+        barmode="group",
+    )
+    return fig
+
+
+def season_rank_figure(profile):
+    """Rank and gap to the leader at each session of a rider's season."""
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=profile["Session_Label"],
+            y=profile["Rank"],
+            name="Rank",
+            mode="lines+markers",
+            marker_color="green",
+            customdata=profile["Field_Size"],
+            hovertemplate="%{x}<br>Rank %{y} of %{customdata}<extra></extra>",
+        )
+    )
+    fig.add_trace(
+        go.Bar(
+            x=profile["Session_Label"],
+            y=profile["Gap_Seconds"],
+            name="Gap to Leader",
+            marker_color="orange",
+            opacity=0.5,
+            yaxis="y2",
+        )
+    )
+    fig.update_layout(
+        title="Season Progression",
+        xaxis_title="Session",
+        yaxis=dict(title="Rank", autorange="reversed"),
+        yaxis2=dict(title="Gap to leader (seconds)", overlaying="y", side="right"),
+    )
+    return fig
+
+
+def sector_percentile_figure(profile):
+    """Heatmap of the share of the field beaten in each sector at each session."""
+    pct_columns = sorted(
+        (col for col in profile.columns if col.endswith("_Pct")),
+        key=lambda col: int(col.split("_")[1]),
+    )
+    fig = go.Figure(
+        go.Heatmap(
+            z=profile[pct_columns].to_numpy(dtype=float),
+            x=[col.replace("_Pct", "").replace("_", " ") for col in pct_columns],
+            y=profile["Session_Label"],
+            zmin=0,
+            zmax=100,
+            colorscale="RdYlGn",
+            colorbar=dict(title="% beaten"),
+            hovertemplate="%{y}<br>%{x}: beat %{z:.0f}% of the field<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title="Sector Rank Percentiles",
+        yaxis=dict(autorange="reversed"),
+        height=max(300, 28 * len(profile) + 150),
+    )
+    return fig
+
+
+def sector_distribution_figure(before, after, label_before, label_after):
+    """Box plot of every sector's times in two sessions side by side.
+
+    `before` and `after` hold one column of seconds per sector, named for display.
+    """
+    fig = go.Figure()
+    for times, label, color in ((before, label_before, "blue"), (after, label_after, "orange")):
+        long = times.melt(var_name="Sector", value_name="Seconds").dropna()
+        fig.add_trace(
+            go.Box(
+                x=long["Sector"],
+                y=long["Seconds"],
+                name=label,
+                marker_color=color,
+                boxpoints=False,
+            )
+        )
+    fig.update_layout(
+        title="Field Sector Times",
+        xaxis_title="Sector",
+        yaxis_title="Time (seconds)",
+        boxmode="group",
+    )
+    return fig
+
+
+def rider_delta_figure(riders, column, title):
+    """Horizontal bars of each rider's change in `column`; negative is faster."""
+    riders = riders.dropna(subset=[column]).sort_values(column, ascending=False)
+    fig = go.Figure(
+        go.Bar(
+            x=riders[column],
+            y=riders["Name"],
+            orientation="h",
+            marker_color=["green" if delta < 0 else "red" for delta in riders[column]],
+        )
+    )
+    fig.update_layout(
+        title=title,
+        xaxis_title="Change (seconds, negative is faster)",
+        height=max(400, 18 * len(riders) + 150),
+    )
+    return fig
+
+
+def weekend_progression_figure(table, rounds):
+    """Each rider's rank in every round of an event weekend, one line per rider."""
+    fig = go.Figure()
+    for _, rider in table.iterrows():
+        fig.add_trace(
+            go.Scatter(
+                x=rounds,
+                y=[rider[f"{round_}_Rank"] for round_ in rounds],
+                name=rider["Name"],
+                mode="lines+markers",
+                connectgaps=False,
+            )
+        )
+    fig.update_layout(
+        title="Rank Through the Weekend",
+        xaxis_title="Round",
+        yaxis=dict(title="Rank", autorange="reversed"),
+        height=600,
+    )
+    return fig
+
+
+def standings_history_figure(points_history, names):
+    """Cumulative series points after each event, one line per rider."""
+    fig = go.Figure()
+    for rider_id in points_history.columns:
+        fig.add_trace(
+            go.Scatter(
+                x=points_history.index,
+                y=points_history[rider_id],
+                name=names.get(rider_id, rider_id),
+                mode="lines+markers",
+            )
+        )
+    fig.update_layout(
+        title="Standings Over Time",
+        xaxis_title="Event",
+        yaxis_title="Points",
+    )
+    return fig
+
+
+def bump_chart_figure(positions, position_columns):
+    """Each rider's position at every timing point, one line per rider."""
+    labels = [col.replace("Position_", "").replace("_", " ") for col in position_columns]
+    fig = go.Figure()
+    for _, rider in positions.iterrows():
+        fig.add_trace(
+            go.Scatter(
+                x=labels,
+                y=rider[position_columns],
+                name=rider["Name"],
+                mode="lines+markers",
+            )
+        )
+    fig.update_layout(
+        title="Position Through the Track",
+        xaxis_title="Timing Point",
+        yaxis=dict(title="Position", autorange="reversed"),
+        height=600,
+    )
+    return fig
+
+
+def gain_ladder_figure(ladder, current_rank):
+    """Finishing position for each amount of time found, as a step line."""
+    fig = go.Figure(
+        go.Scatter(
+            x=[0] + list(ladder["Gain"]),
+            y=[current_rank] + list(ladder["Rank"]),
+            mode="lines+markers",
+            line_shape="hv",
+        )
+    )
+    fig.update_layout(
+        title="What Time Buys Positions",
+        xaxis_title="Time Found (seconds)",
+        yaxis=dict(title="Position", autorange="reversed"),
+    )
+    return fig
+
+
+def forecast_figure(forecast):
+    """Chances of qualifying, reaching the podium and winning, grouped per rider."""
+    fig = go.Figure()
+    for column, label in [
+        ("P_Qualify", "Qualify"),
+        ("P_Podium", "Podium"),
+        ("P_Win", "Win"),
+    ]:
+        fig.add_trace(go.Bar(x=forecast["Name"], y=forecast[column] * 100, name=label))
+    fig.update_layout(
+        title="Qualifying Forecast",
+        barmode="group",
+        xaxis_title="Rider",
+        yaxis=dict(title="Chance (%)", range=[0, 100]),
+    )
+    return fig
@@ -0,0 +1,168 @@
+# Filename: head_to_head.py
+# Description: This file contains the head-to-head index: for every pair of resolved riders who were in the same session, their wins and losses, median gap and sector-by-sector record over a season. Each session of the season index is turned into its pairs in one vectorized pass (only riders who met are stored), the pairs are aggregated per season and written to the season store. A rider-vs-rider lookup is then a filtered read of one small Parquet file instead of a scan of every session.
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from catalog import SEASON_DIR, catalog, source_version
+from rider_identity import find_rider, load_identities
+from season_index import ROW_GROUP_SIZE, ensure_index
+from standings import season_of
+
+HEAD_TO_HEAD_FILE = "head_to_head.parquet"
+# Bump when the stored columns change so the index is rebuilt
+HEAD_TO_HEAD_VERSION = 1
+
+
+def session_pairs(rows):
+    """One row per pair of riders in a session, Rider_A sorting before Rider_B.
+
+    A rider with a rank beats one without (a DNF). Gaps are A minus B, so a
+    negative gap means A was faster.
+    """
+    rows = rows.drop_duplicates("Rider_Key").sort_values("Rider_Key")
+    sector_columns = [
+        col for col in rows.columns if col.startswith("Sector_") and col.endswith("_Seconds")
+    ]
+    keys = rows["Rider_Key"].to_numpy()
+    rank = rows["Rank"].to_numpy(dtype=float)
+    rank = np.where(np.isnan(rank), np.inf, rank)
+    time = rows["Time_Seconds"].to_numpy(dtype=float)
+    sectors = rows[sector_columns].to_numpy(dtype=float)
+
+    a, b = np.triu_indices(len(rows), 1)
+    return pd.DataFrame(
+        {
+            "Rider_A": keys[a],
+            "Rider_B": keys[b],
+            "A_Wins": rank[a] < rank[b],
+            "B_Wins": rank[b] < rank[a],
+            "Gap": time[a] - time[b],
+            # NaN sectors compare False on both sides, so they count for no one
+            "A_Sectors": (sectors[a] < sectors[b]).sum(axis=1),
+            "B_Sectors": (sectors[b] < sectors[a]).sum(axis=1),
+        }
+    )
+
+
+def build_head_to_head(data_dir="data"):
+    """Per-season record of every pair of riders who met, from the season index."""
+    index = pd.read_parquet(ensure_index(data_dir))
+    index["Season"] = index["Year"].map(season_of)
+    frames = []
+    for (season, _, _), rows in index.groupby(["Season", "Event", "Session"], sort=False):
+        frames.append(session_pairs(rows).assign(Season=season))
+    pairs = pd.concat(frames, ignore_index=True)
+    grouped = pairs.groupby(["Season", "Rider_A", "Rider_B"], sort=True)
+    return (
+        grouped.agg(
+            Meetings=("Gap", "size"),
+            A_Wins=("A_Wins", "sum"),
+            B_Wins=("B_Wins", "sum"),
+            Median_Gap=("Gap", "median"),
+            A_Sectors=("A_Sectors", "sum"),
+            B_Sectors=("B_Sectors", "sum"),
+        )
+        .reset_index()
+        .assign(Median_Gap=lambda df: df["Median_Gap"].round(3))
+    )
+
+
+def head_to_head_path(store_dir=SEASON_DIR):
+    return os.path.join(store_dir, HEAD_TO_HEAD_FILE)
+
+
+def ensure_head_to_head(data_dir="data", store_dir=SEASON_DIR):
+    """Path of an up-to-date head-to-head index, rebuilt only if a session file changed."""
+    path = head_to_head_path(store_dir)
+    version = source_version(catalog(data_dir), HEAD_TO_HEAD_VERSION)
+    if os.path.exists(path):
+        metadata = pq.read_schema(path).metadata or {}
+        if metadata.get(b"source_version", b"").decode() == version:
+            return path
+
+    table = pa.Table.from_pandas(build_head_to_head(data_dir), preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**table.schema.metadata, b"source_version": version.encode()}
+    )
+    os.makedirs(store_dir, exist_ok=True)
+    # Write then rename so a reader never opens a half-written file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, temp_path, row_group_size=ROW_GROUP_SIZE)
+    os.replace(temp_path, path)
+    return path
+
+
+def from_perspective(records, rider_key):
+    """Records of `rider_key` against each opponent, with the rider as the first side."""
+    first = records["Rider_A"] == rider_key
+    return pd.DataFrame(
+        {
+            "Season": records["Season"],
+            "Opponent": records["Rider_B"].where(first, records["Rider_A"]),
+            "Meetings": records["Meetings"],
+            "Wins": records["A_Wins"].where(first, records["B_Wins"]),
+            "Losses": records["B_Wins"].where(first, records["A_Wins"]),
+            "Median_Gap": records["Median_Gap"].where(first, -records["Median_Gap"]),
+            "Sectors_Won": records["A_Sectors"].where(first, records["B_Sectors"]),
+            "Sectors_Lost": records["B_Sectors"].where(first, records["A_Sectors"]),
+        }
+    ).reset_index(drop=True)
+
+
+def rider_records(rider_key, data_dir="data", store_dir=SEASON_DIR):
+    """Every opponent `rider_key` has met, in every season."""
+    records = pd.read_parquet(
+        ensure_head_to_head(data_dir, store_dir),
+        filters=[[("Rider_A", "==", rider_key)], [("Rider_B", "==", rider_key)]],
+    )
+    return from_perspective(records, rider_key)
+
+
+def pair_record(rider_key, opponent_key, data_dir="data", store_dir=SEASON_DIR):
+    """Season-by-season record of `rider_key` against `opponent_key` (empty if they never met)."""
+    first, second = sorted([rider_key, opponent_key])
+    records = pd.read_parquet(
+        ensure_head_to_head(data_dir, store_dir),
+        filters=[("Rider_A", "==", first), ("Rider_B", "==", second)],
+    )
+    return from_perspective(records, rider_key).drop(columns="Opponent")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the head-to-head index and print a rider's record."
+    )
+    parser.add_argument("rider", nargs="?", help="Rider name (any case or spelling)")
+    parser.add_argument("opponent", nargs="?", help="Second rider for a single pairing")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--top", type=int, default=10, help="Most frequent opponents to print")
+    args = parser.parse_args()
+
+    path = ensure_head_to_head(args.data_dir)
+    print(f"{path}: {pq.read_metadata(path).num_rows} pairings")
+    if not args.rider:
+        return
+    rider_key = find_rider(args.rider, args.data_dir)
+    if rider_key is None:
+        parser.error(f"No rider matches {args.rider!r}")
+    if args.opponent:
+        opponent_key = find_rider(args.opponent, args.data_dir)
+        if opponent_key is None:
+            parser.error(f"No rider matches {args.opponent!r}")
+        print(pair_record(rider_key, opponent_key, args.data_dir).to_string(index=False))
+        return
+    names = load_identities(args.data_dir)[0].set_index("Rider_Id")["Name"]
+    records = rider_records(rider_key, args.data_dir)
+    records["Opponent"] = records["Opponent"].map(names).fillna(records["Opponent"])
+    records = records.sort_values(["Meetings", "Wins"], ascending=False)
+    print(records.head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+# Filename: ingest_pipeline.py
+# Description: This file contains an asyncio ingest pipeline that extracts a batch of timing PDFs into CSVs. Each stage (discover, load, extract, parse, rank, validate, write) runs as its own task connected by bounded queues, so reading the next file overlaps with parsing the current one and only a few files are held in memory at once. Each sheet's layout and table start line are detected from its own pages, sheets the 2025 parsers cannot read are skipped, and existing CSVs are left alone unless --overwrite is given.
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from check_pages import sheet_layout
+from page_cache import load_pages
+from split_pdf_extraction_2025 import (
+    build_rejected_2025,
+    build_results_2025,
+    parse_rider_pages_2025,
+)
+from tt_split_pdf_extraction import (
+    build_timed_training_frame,
+    parse_timed_training_data_final,
+)
+from session_validation import format_report, validate_session, write_outputs
+from standings import update_standings
+from utils import find_sessions
+
+STAGES = ["discover", "load", "extract", "parse", "rank", "validate", "write"]
+DONE = object()
+# Run columns on the 2025 timed training sheets, the only timed training
+# layout parse_timed_training_data_final reads (earlier seasons print three)
+TT_RUN_COLUMNS = 5
+
+
+def quietly(function, *args):
+    """Run one of the chatty extraction functions without its progress prints."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+
+def extract_pages(pdf_bytes):
+    return quietly(load_pages, pdf_bytes)
+
+
+def parse_session(pages, table_start_line=None):
+    """(kind, parsed rows) of a sheet, or ValueError if the 2025 parsers cannot read it.
+
+    The kind and table start line come from the sheet itself; a given
+    `table_start_line` overrides the detected one.
+    """
+    layout = sheet_layout(pages)
+    if layout["kind"] == "tt":
+        if layout["run_columns"] != TT_RUN_COLUMNS or not layout["speed_unit"]:
+            raise ValueError(
+                f"timed training sheet with {layout['run_columns']} run columns "
+                "is not the 2025 layout"
+            )
+        all_lines = [line for lines in pages for line in lines]
+        return "tt", quietly(parse_timed_training_data_final, all_lines)
+    start = table_start_line if table_start_line is not None else layout["table_start_line"]
+    if start is None:
+        raise ValueError("no results table found")
+    return "race", quietly(parse_rider_pages_2025, pages, start)
+
+
+def rank_session(kind, parsed):
+    """(session frame, frame of rows the row classifier rejected or None)."""
+    if kind == "tt":
+        return quietly(build_timed_training_frame, parsed), None
+    riders_info, rejected_info = parsed
+    return quietly(build_results_2025, riders_info), quietly(build_rejected_2025, rejected_info)
+
+
+class StageStats:
+    """Counters for one stage; throughput counts only time spent working."""
+
+    def __init__(self, name):
+        self.name = name
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def as_dict(self, queue_depth):
+        throughput = self.processed / self.busy_seconds if self.busy_seconds else 0.0
+        return {
+            "stage": self.name,
+            "queue_depth": queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "processed": self.processed,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "files_per_second": round(throughput, 2),
+        }
+
+
+class IngestPipeline:
+    """Extract every session PDF under `sources` to CSV in `output_dir`.
+
+    `queue_size` bounds how many files may wait between two stages, which caps
+    memory at roughly (stages x queue_size) PDFs regardless of batch size.
+    A file whose CSV already exists is skipped unless `overwrite` is set.
+    """
+
+    def __init__(
+        self,
+        sources,
+        output_dir="extracted",
+        queue_size=2,
+        executor="process",
+        workers=None,
+        table_start_line=None,
+        overwrite=False,
+    ):
+        self.sources = sources
+        self.output_dir = output_dir
+        self.queue_size = queue_size
+        self.workers = workers or os.cpu_count() or 1
+        self.executor_kind = executor
+        self.table_start_line = table_start_line
+        self.overwrite = overwrite
+        self.stats = {name: StageStats(name) for name in STAGES}
+        # Queue feeding each stage; discover has no inbox
+        self.queues = {
+            name: asyncio.Queue(maxsize=queue_size) for name in STAGES[1:]
+        }
+        self.outputs = []
+        self.reports = []
+        # (path, reason) of every file not written
+        self.skipped = []
+
+    def snapshot(self):
+        """Current per-stage queue depth and throughput."""
+        return [
+            self.stats[name].as_dict(
+                self.queues[name].qsize() if name in self.queues else 0
+            )
+            for name in STAGES
+        ]
+
+    def discover(self):
+        paths = []
+        for source in self.sources:
+            if os.path.isdir(source):
+                paths.extend(find_sessions(source, extension="pdf"))
+            else:
+                paths.append(source)
+        return paths
+
+    async def _put(self, stage, item):
+        queue = self.queues[stage]
+        await queue.put(item)
+        stats = self.stats[stage]
+        stats.max_queue_depth = max(stats.max_queue_depth, queue.qsize())
+
+    async def _run_discover(self):
+        stats = self.stats["discover"]
+        started = time.perf_counter()
+        paths = self.discover()
+        stats.busy_seconds = time.perf_counter() - started
+        for path in paths:
+            file_prefix = os.path.splitext(os.path.basename(path))[0]
+            csv_path = os.path.join(self.output_dir, f"{file_prefix}.csv")
+            if os.path.exists(csv_path) and not self.overwrite:
+                self.skipped.append((path, f"{csv_path} exists, pass --overwrite to replace it"))
+                continue
+            item = {"path": path, "csv_path": csv_path}
+            stats.processed += 1
+            await self._put("load", item)
+        await self._put("load", DONE)
+
+    async def _run_stage(self, name, next_stage, work, concurrency=1):
+        """Pull items from this stage's queue, apply `work`, push downstream."""
+        inbox = self.queues[name]
+        stats = self.stats[name]
+
+        async def worker():
+            while True:
+                item = await inbox.get()
+                if item is DONE:
+                    # Let sibling workers see the sentinel too
+                    await inbox.put(DONE)
+                    return
+                started = time.perf_counter()
+                try:
+                    await work(item)
+                except Exception as e:
+                    print(f"[{name}] {item['path']}: {e}")
+                    self.skipped.append((item["path"], f"{name}: {e}"))
+                    continue
+                finally:
+                    stats.busy_seconds += time.perf_counter() - started
+                stats.processed += 1
+                if next_stage is not None:
+                    await self._put(next_stage, item)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        inbox.get_nowait()  # the sentinel the last worker put back
+        if next_stage is not None:
+            await self._put(next_stage, DONE)
+
+    async def run(self, report_every=None):
+        loop = asyncio.get_running_loop()
+        executor_class = (
+            ProcessPoolExecutor if self.executor_kind == "process" else ThreadPoolExecutor
+        )
+
+        async def load(item):
+            item["pdf_bytes"] = await asyncio.to_thread(_read_bytes, item["path"])
+
+        async def extract(item):
+            item["pages"] = await loop.run_in_executor(
+                executor, extract_pages, item.pop("pdf_bytes")
+            )
+
+        async def parse(item):
+            item["kind"], item["parsed"] = await loop.run_in_executor(
+                executor, parse_session, item.pop("pages"), self.table_start_line
+            )
+
+        async def rank(item):
+            item["df"], item["rejected"] = await loop.run_in_executor(
+                executor, rank_session, item["kind"], item.pop("parsed")
+            )
+
+        async def validate(item):
+            df = item.pop("df")
+            if df is None or df.empty:
+                raise ValueError("no rider data found")
+            item["validated"] = await loop.run_in_executor(
+                executor, validate_session, df, item.pop("rejected")
+            )
+
+        async def write(item):
+            csv_path = item["csv_path"]
+            report = await asyncio.to_thread(
+                write_outputs, csv_path, *item.pop("validated")
+            )
+            self.outputs.append(csv_path)
+            self.reports.append(report)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        with executor_class(max_workers=self.workers) as executor:
+            tasks = [
+                asyncio.create_task(self._run_discover()),
+                asyncio.create_task(self._run_stage("load", "extract", load)),
+                asyncio.create_task(
+                    self._run_stage("extract", "parse", extract, self.workers)
+                ),
+                asyncio.create_task(
+                    self._run_stage("parse", "rank", parse, self.workers)
+                ),
+                asyncio.create_task(self._run_stage("rank", "validate", rank)),
+                asyncio.create_task(self._run_stage("validate", "write", validate)),
+                asyncio.create_task(self._run_stage("write", None, write)),
+            ]
+            reporter = None
+            if report_every:
+                reporter = asyncio.create_task(self._report(report_every))
+            await asyncio.gather(*tasks)
+            if reporter is not None:
+                reporter.cancel()
+        return self.outputs
+
+    async def _report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            print(format_stats(self.snapshot()))
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def format_stats(snapshot):
+    lines = [
+        f"{'stage':<9} {'queue':>5} {'max':>4} {'done':>5} {'busy s':>8} {'files/s':>8}"
+    ]
+    for row in snapshot:
+        lines.append(
+            f"{row['stage']:<9} {row['queue_depth']:>5} {row['max_queue_depth']:>4} "
+            f"{row['processed']:>5} {row['busy_seconds']:>8} {row['files_per_second']:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extract timing PDFs to CSV with an asyncio stage pipeline."
+    )
+    parser.add_argument("sources", nargs="+", help="PDF files or folders")
+    parser.add_argument("--output-dir", default="extracted")
+    parser.add_argument("--queue-size", type=int, default=2)
+    parser.add_argument("--executor", choices=["process", "thread"], default="process")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--table-start-line",
+        type=int,
+        default=None,
+        help="Line where race tables start (default: detected per file)",
+    )
+    parser.add_argument(
+        "--overwrite", action="store_true", help="Replace CSVs that already exist"
+    )
+    parser.add_argument(
+        "--report-every", type=float, default=None, help="Print stage stats every N seconds"
+    )
+    args = parser.parse_args()
+
+    pipeline = IngestPipeline(
+        args.sources,
+        output_dir=args.output_dir,
+        queue_size=args.queue_size,
+        executor=args.executor,
+        workers=args.workers,
+        table_start_line=args.table_start_line,
+        overwrite=args.overwrite,
+    )
+    started = time.perf_counter()
+    outputs = asyncio.run(pipeline.run(report_every=args.report_every))
+    for path in outputs:
+        print(f"Wrote {path}")
+    for path, reason in pipeline.skipped:
+        print(f"Skipped {path}: {reason}")
+    for report in pipeline.reports:
+        print(format_report(report))
+    if outputs:
+        # Standings live next to the CSVs they were built from
+        _, changed = update_standings(
+            args.output_dir, os.path.join(args.output_dir, ".season")
+        )
+        print(f"Standings updated from {len(changed)} sessions")
+    print(format_stats(pipeline.snapshot()))
+    print(f"{len(outputs)} files in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Filename: live_timing.py
+# Description: This file contains the live timing replay of a race session. Riders are sent down the track one at a time in start order. At every timing point each rider gets the virtual rank and the gap to the fastest time through that point so far, the way the live timing screen showed them. Every rider's virtual rank and gap at every point are computed once up front with NumPy (an earlier-and-faster count per point, a running minimum for the leader), so stepping or seeking to any rider, backwards included, is a lookup and a session can be scrubbed back and forth interactively. Nothing in here depends on Streamlit.
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from columns import numbered_columns
+from utils import time_column_to_ms
+
+# Qualifying starts in reverse order of the series ranking, which the bib
+# numbers follow; "reverse result" sends the slowest finisher first instead
+START_ORDERS = ["bib descending", "reverse result"]
+
+
+def session_times(df):
+    """(riders x timing points) milliseconds, intermediates then the finish, and the point labels."""
+    split_columns = numbered_columns(df, "split")
+    columns = split_columns + ["final_time"]
+    times = np.column_stack([time_column_to_ms(df[col]).to_numpy() for col in columns])
+    labels = [f"Split {i}" for i in range(1, len(split_columns) + 1)] + ["Finish"]
+    return times, labels
+
+
+def start_order(df, rule=START_ORDERS[0]):
+    """Row positions of `df` in the order riders would have started."""
+    if rule == "bib descending":
+        bib = pd.to_numeric(df["rider_number"], errors="coerce").fillna(0)
+        return np.argsort(-bib.to_numpy(), kind="stable")
+    rank = pd.to_numeric(df["rank"], errors="coerce").fillna(len(df) + 1)
+    return np.argsort(-rank.to_numpy(), kind="stable")
+
+
+def virtual_ranks(times, riders):
+    """Virtual rank and gap to the leader of each rider when they crossed each point.
+
+    `times` is (starters x points) in start order and `riders` their row ids,
+    which break ties the way a time-then-rider sort would. A rank counts the
+    earlier starters who were faster, so each point costs one (starters x
+    starters) comparison; a full field of a few hundred riders takes a few
+    milliseconds. Missing times get a NaN rank and gap.
+    """
+    count = len(times)
+    earlier = np.tri(count, k=-1, dtype=bool)  # [k, j] is True when j started before k
+    riders = np.asarray(riders)
+    ranks = np.empty(times.shape)
+    for point in range(times.shape[1]):
+        time = times[:, point]
+        ahead = (time[None, :] < time[:, None]) | (
+            (time[None, :] == time[:, None]) & (riders[None, :] < riders[:, None])
+        )
+        ranks[:, point] = (ahead & earlier).sum(axis=1) + 1
+
+    # Fastest time through each point before each rider (NaN until someone has one)
+    best = np.fmin.accumulate(times, axis=0)
+    leader = np.vstack([np.full((1, times.shape[1]), np.nan), best[:-1]])
+    gaps = np.where(np.isnan(leader), 0.0, times - leader)
+
+    missing = np.isnan(times)
+    ranks[missing] = np.nan
+    gaps[missing] = np.nan
+    return ranks, gaps
+
+
+class LiveTiming:
+    """Replay of a session that can be stepped forward or moved to any rider.
+
+    Ranks and gaps are precomputed (virtual_ranks), so step and seek in
+    either direction only move `position`.
+    """
+
+    def __init__(self, names, times, labels, order):
+        self.names = list(names)
+        self.times = times
+        self.labels = labels
+        self.order = list(order)
+        # Rows in start order
+        self.start_times = times[self.order] if len(self.order) else times[:0]
+        self.ranks, self.gaps = virtual_ranks(self.start_times, self.order)
+        self.position = 0
+
+    def reset(self):
+        self.position = 0
+
+    def crossings(self, start):
+        """(time, virtual rank, gap) at every timing point of the `start`-th rider down."""
+        return [
+            (None, None, None)
+            if np.isnan(time)
+            else (time, int(self.ranks[start, point]), self.gaps[start, point])
+            for point, time in enumerate(self.start_times[start])
+        ]
+
+    def step(self):
+        """Send the next rider down and return their pass through every timing point."""
+        start = self.position
+        self.position += 1
+        return self.order[start], self.crossings(start)
+
+    def seek(self, position):
+        """Move the replay to just after `position` riders have run."""
+        self.position = max(0, min(position, len(self.order)))
+
+    def rider_pass(self, index=-1):
+        """Times, virtual ranks and gaps to the leader of one rider that has run (default: latest)."""
+        start = range(self.position)[index]
+        crossings = self.crossings(start)
+        return self.order[start], pd.DataFrame(
+            {
+                "Point": self.labels,
+                "Time": [c[0] / 1000 if c[0] is not None else None for c in crossings],
+                "Virtual_Rank": [c[1] for c in crossings],
+                "Gap_to_Leader": [c[2] / 1000 if c[2] is not None else None for c in crossings],
+            }
+        )
+
+    def leaderboard(self, n=10):
+        """Provisional results at the finish after the riders so far."""
+        finish = self.start_times[: self.position, -1]
+        riders = np.asarray(self.order[: self.position], dtype=int)
+        finished = ~np.isnan(finish)
+        finish, riders = finish[finished], riders[finished]
+        top = np.lexsort((riders, finish))[:n]
+        if not len(top):
+            return pd.DataFrame(columns=["Rank", "Name", "Time", "Gap"])
+        return pd.DataFrame(
+            {
+                "Rank": range(1, len(top) + 1),
+                "Name": [self.names[rider] for rider in riders[top]],
+                "Time": finish[top] / 1000,
+                "Gap": (finish[top] - finish[top[0]]) / 1000,
+            }
+        )
+
+    def did_not_finish(self):
+        """Riders that have run without reaching the finish (crashed or stopped)."""
+        return [
+            self.names[rider]
+            for rider, time in zip(self.order, self.start_times[: self.position, -1])
+            if np.isnan(time)
+        ]
+
+
+def session_replay(df, rule=START_ORDERS[0]):
+    times, labels = session_times(df)
+    return LiveTiming(df["name"], times, labels, start_order(df, rule))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a race session rider by rider as the live timing showed it."
+    )
+    parser.add_argument("csv_path")
+    parser.add_argument("--order", choices=START_ORDERS, default=START_ORDERS[0])
+    parser.add_argument("--every", type=int, default=10, help="Print the leaderboard every N riders")
+    args = parser.parse_args()
+
+    replay = session_replay(pd.read_csv(args.csv_path), args.order)
+    while replay.position < len(replay.order):
+        rider, crossings = replay.step()
+        finish = crossings[-1]
+        status = f"P{finish[1]} {finish[2] / 1000:+.3f}" if finish[0] is not None else "DNF"
+        print(f"{replay.position:4} {replay.names[rider]:<35} {status}")
+        if replay.position % args.every == 0:
+            print(replay.leaderboard(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
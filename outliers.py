@@ -0,0 +1,105 @@
+# Filename: outliers.py
+# Description: This file contains the outlier detection for timed training sectors. A sector is flagged when it is far from the field's typical time for that part of the track (median and MAD over each rider's fastest time), which catches stops, crashes and missed timing beams. clean_field rebuilds a session without the flagged sectors so averages, ranks and perfect runs are not skewed by them.
+
+import numpy as np
+import pandas as pd
+
+from tt_analysis import tt_time_columns
+from tt_schema import timed_training_frame
+
+# 0.6745 * (x - median) / MAD is comparable to a z-score for normal data;
+# 3.5 is the usual cut-off for calling a value an outlier
+MAD_TO_SIGMA = 0.6745
+OUTLIER_THRESHOLD = 3.5
+
+
+def sector_reference(df):
+    """Median and MAD of each sector over the field.
+
+    Each rider contributes their fastest time per sector. In timed training
+    most runs include a stop somewhere, so a median over all runs would be
+    pulled towards stopped times on some sections.
+    """
+    _, sector_columns = tt_time_columns(df)
+    field = df.groupby("Number")[sector_columns].min().to_numpy(dtype=float)
+    median = np.nanmedian(field, axis=0)
+    mad = np.nanmedian(np.abs(field - median), axis=0)
+    return median, mad
+
+
+def sector_scores(df):
+    """(runs x sectors) robust z-scores against the field reference."""
+    _, sector_columns = tt_time_columns(df)
+    sectors = df[sector_columns].to_numpy(dtype=float)
+    median, mad = sector_reference(df)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return MAD_TO_SIGMA * (sectors - median) / mad
+
+
+def sector_outliers(df, threshold=OUTLIER_THRESHOLD):
+    """(runs x sectors) boolean frame, True where a sector is anomalous."""
+    _, sector_columns = tt_time_columns(df)
+    sectors = df[sector_columns].to_numpy(dtype=float)
+    flagged = (np.abs(sector_scores(df)) > threshold) | (sectors <= 0)
+    return pd.DataFrame(flagged, index=df.index, columns=sector_columns)
+
+
+def field_outliers(sectors, threshold=OUTLIER_THRESHOLD):
+    """(riders x sectors) boolean array, True where a sector is far from the field median.
+
+    For sessions with one run per rider (race rounds, best runs), where the
+    field itself is the reference. Catches crashes and rows whose splits were
+    extracted out of order.
+    """
+    median = np.nanmedian(sectors, axis=0)
+    mad = np.nanmedian(np.abs(sectors - median), axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = MAD_TO_SIGMA * (sectors - median) / mad
+    return (np.abs(scores) > threshold) | (sectors <= 0)
+
+
+def outlier_table(df, threshold=OUTLIER_THRESHOLD):
+    """One row per flagged sector with the field median it was compared to."""
+    _, sector_columns = tt_time_columns(df)
+    flagged = sector_outliers(df, threshold).to_numpy()
+    rows, sectors = np.nonzero(flagged)
+    median, _ = sector_reference(df)
+    return pd.DataFrame(
+        {
+            "Number": df["Number"].to_numpy()[rows],
+            "Name": df["Name"].to_numpy()[rows],
+            "Run": df["Run"].to_numpy()[rows],
+            "Sector": sectors + 1,
+            "Sector_Time": df[sector_columns].to_numpy(dtype=float)[rows, sectors],
+            "Field_Median": median[sectors],
+            "Score": np.round(sector_scores(df)[rows, sectors], 1),
+        }
+    )
+
+
+def clean_field(df, threshold=OUTLIER_THRESHOLD):
+    """The session with flagged sectors removed and every time and rank rebuilt.
+
+    A flagged sector is blanked, and so is every split after it because
+    those include the lost time; the run then has no final time and drops out
+    of best runs and top-N averages. Its other sectors still count towards
+    sector ranks and the rider's perfect run.
+    """
+    split_columns, sector_columns = tt_time_columns(df)
+    flagged = sector_outliers(df, threshold).to_numpy()
+
+    seconds = [col.replace("Orig_", "Clean_") for col in split_columns]
+    milliseconds = df[seconds].to_numpy(dtype=float) * 1000
+    milliseconds[np.logical_or.accumulate(flagged, axis=1)] = np.nan
+    clean = timed_training_frame(df[["Number", "Name", "Run", "Speed"]], milliseconds)
+    clean.index = df.index
+    clean["Run_Fingerprint"] = df["Run_Fingerprint"]
+
+    sectors = df[sector_columns].to_numpy(dtype=float)
+    sectors[flagged] = np.nan
+    for i, col in enumerate(sector_columns):
+        clean[col] = sectors[:, i]
+        clean[f"Sector_{i + 1}_Rank"] = (
+            pd.Series(sectors[:, i], index=df.index).rank(method="min").astype("Int64")
+        )
+    return clean
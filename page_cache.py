@@ -0,0 +1,101 @@
+# Filename: page_cache.py
+# Description: This file contains the page text cache shared by every parser and debug script. The first time a PDF is read, each page's text lines and word boxes are decoded once with PyMuPDF and stored as gzip-compressed JSON keyed by the PDF's SHA-256 hash, so re-running a parser over the whole corpus only costs parsing time. Use load_pages(path) instead of opening PDFs directly.
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+
+import fitz
+
+CACHE_DIR = os.path.join("data", ".page_cache")
+# Bump when the stored layout changes so older cache files are decoded again
+CACHE_VERSION = 1
+
+
+def pdf_hash(pdf_bytes):
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def cache_path(digest, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{digest}.json.gz")
+
+
+def read_source(source):
+    """PDF bytes for a filename or bytes."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def decode_pdf(pdf_bytes):
+    """Text lines and word boxes of every page, straight from PyMuPDF.
+
+    Word boxes are [x0, y0, x1, y1, word, block, line, word_no] with the
+    coordinates rounded to 0.01 pt.
+    """
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    pages = []
+    for page in doc:
+        words = [
+            [round(x0, 2), round(y0, 2), round(x1, 2), round(y1, 2), word, block, line, number]
+            for x0, y0, x1, y1, word, block, line, number in page.get_text("words")
+        ]
+        pages.append({"lines": page.get_text("text").split("\n"), "words": words})
+    doc.close()
+    return pages
+
+
+def load_cached(source, cache_dir=CACHE_DIR):
+    """Decoded pages of a PDF, read from the cache or decoded and stored."""
+    pdf_bytes = read_source(source)
+    path = cache_path(pdf_hash(pdf_bytes), cache_dir)
+    if os.path.exists(path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("version") == CACHE_VERSION:
+            return cached["pages"]
+
+    pages = decode_pdf(pdf_bytes)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write then rename so parallel extractions never read a half-written file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "pages": pages}, f, separators=(",", ":"))
+    os.replace(temp_path, path)
+    return pages
+
+
+def load_pages(source, cache_dir=CACHE_DIR):
+    """Text lines of every page of a PDF, given a filename or the PDF bytes."""
+    return [page["lines"] for page in load_cached(source, cache_dir)]
+
+
+def load_words(source, cache_dir=CACHE_DIR):
+    """Word boxes of every page of a PDF, given a filename or the PDF bytes."""
+    return [page["words"] for page in load_cached(source, cache_dir)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Decode PDFs into the page text cache ahead of parsing."
+    )
+    parser.add_argument("paths", nargs="*", help="PDF files (default: every PDF in --data-dir)")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(
+        os.path.join(args.data_dir, name)
+        for name in os.listdir(args.data_dir)
+        if name.endswith(".pdf")
+    )
+    for path in paths:
+        pages = load_cached(path, args.cache_dir)
+        print(f"{path}: {len(pages)} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+# Filename: qualifying_forecast.py
+# Description: This file contains the qualifying predictor. Each rider's time in each sector is modelled as a normal distribution fitted to their timed training runs, with stopped and crashed sectors left out (outliers.py), as are sectors most of the field stopped in. Riders with few runs are shrunk towards the field. Qualifying sessions are then simulated in chunks of NumPy arrays spread over a process pool, giving each rider's chance of qualifying, reaching the podium and winning. Forecasts are stored per timed training file in the season store and can be checked against the event's qualifying results. Nothing in here depends on Streamlit.
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from catalog import SEASON_DIR, catalog, parse_file_name, source_version
+from outliers import clean_field
+from rider_identity import resolve
+from tt_analysis import tt_time_columns
+
+# Bump when the model changes so stored forecasts are recomputed
+FORECAST_VERSION = 1
+SIMULATIONS = 100_000
+# Simulations per task; a chunk holds chunk x riders x sectors floats
+CHUNK_SIZE = 5_000
+# Riders through to the next round
+QUALIFIERS = 60
+PODIUM = 3
+# Weight of the field's run-to-run spread, in runs, when estimating a rider's own
+PRIOR_RUNS = 2
+SEED = 2025
+QUALIFYING_SESSIONS = ["q1", "qr"]
+# 1.4826 * MAD estimates the standard deviation of normal data
+MAD_TO_SD = 1.4826
+# A sector whose spread between riders is this share of its median time is
+# one most riders stopped in (a planned stop or a hold), so it says nothing
+# about pace and is left out of the model
+STOPPED_SECTOR_SPREAD = 0.15
+# Run-to-run spread as a share of sector time when no rider has two clean
+# runs of a sector; about 1% in every session in data/
+FALLBACK_SPREAD = 0.01
+
+
+def rider_sectors(df):
+    """Runs grouped by rider: (riders,) details and sector count, mean and variance (seconds)."""
+    _, sector_columns = tt_time_columns(df)
+    clean = clean_field(df)
+    grouped = clean.groupby("Number", sort=False)
+    riders = grouped.agg(Name=("Name", "first"), Runs=("Run", "size")).reset_index()
+    return (
+        riders,
+        grouped[sector_columns].count().to_numpy(dtype=float),
+        grouped[sector_columns].mean().to_numpy(dtype=float),
+        grouped[sector_columns].var(ddof=1).to_numpy(dtype=float),
+    )
+
+
+def sector_model(count, mean, variance, prior_runs=PRIOR_RUNS):
+    """(riders x sectors) predictive mean and standard deviation of each sector time.
+
+    Normal-normal shrinkage: a rider's mean is pulled towards the field's
+    median by the spread between riders, more so the fewer clean runs they
+    have (a rider with none gets the field's). Their run-to-run spread is
+    pulled towards the field's typical spread the same way.
+    """
+    field_mean = np.nanmedian(mean, axis=0)
+    between = (MAD_TO_SD * np.nanmedian(np.abs(mean - field_mean), axis=0)) ** 2
+    repeated = (count >= 2).any(axis=0)
+    within = (FALLBACK_SPREAD * field_mean) ** 2
+    within[repeated] = np.nanmedian(
+        np.where(count >= 2, variance, np.nan)[:, repeated], axis=0
+    )
+
+    precision = count / within + 1 / between
+    shrunk_mean = (np.nan_to_num(mean) * count / within + field_mean / between) / precision
+    spread_runs = np.clip(count - 1, 0, None)
+    shrunk_variance = (np.nan_to_num(variance) * spread_runs + within * prior_runs) / (
+        spread_runs + prior_runs
+    )
+    return shrunk_mean, np.sqrt(shrunk_variance + 1 / precision)
+
+
+def paced_sectors(mean):
+    """Sectors that are ridden at pace, as a boolean per sector."""
+    field_mean = np.nanmedian(mean, axis=0)
+    spread = MAD_TO_SD * np.nanmedian(np.abs(mean - field_mean), axis=0)
+    return spread / field_mean <= STOPPED_SECTOR_SPREAD
+
+
+def simulate_chunk(mean, sd, qualifiers, seed, size):
+    """Qualify, podium and win counts and summed rank of each rider over `size` sessions."""
+    rng = np.random.default_rng(seed)
+    totals = (mean + sd * rng.standard_normal((size,) + mean.shape)).sum(axis=2)
+    riders = totals.shape[1]
+
+    def made_top(n):
+        cutoff = np.partition(totals, min(n, riders) - 1, axis=1)[:, min(n, riders) - 1]
+        return (totals <= cutoff[:, None]).sum(axis=0)
+
+    ranks = np.empty(totals.shape)
+    np.put_along_axis(ranks, np.argsort(totals, axis=1), np.arange(1, riders + 1), axis=1)
+    return (
+        np.column_stack([made_top(qualifiers), made_top(PODIUM), made_top(1)]),
+        ranks.sum(axis=0),
+    )
+
+
+def simulate(mean, sd, simulations=SIMULATIONS, qualifiers=QUALIFIERS, seed=SEED, workers=None):
+    """Probabilities of qualifying, podium and win and the expected rank of each rider."""
+    sizes = [CHUNK_SIZE] * (simulations // CHUNK_SIZE)
+    if simulations % CHUNK_SIZE:
+        sizes.append(simulations % CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(
+            pool.map(
+                simulate_chunk,
+                [mean] * len(sizes),
+                [sd] * len(sizes),
+                [qualifiers] * len(sizes),
+                seeds,
+                sizes,
+            )
+        )
+    counts = sum(result[0] for result in results)
+    rank_sums = sum(result[1] for result in results)
+    return counts / simulations, rank_sums / simulations
+
+
+def forecast(df, simulations=SIMULATIONS, qualifiers=QUALIFIERS, seed=SEED, workers=None):
+    """One row per rider with their predicted time and chances, best expected rank first."""
+    riders, count, mean, variance = rider_sectors(df)
+    paced = paced_sectors(mean)
+    count, mean, variance = count[:, paced], mean[:, paced], variance[:, paced]
+    sector_mean, sector_sd = sector_model(count, mean, variance)
+    chances, expected_rank = simulate(
+        sector_mean, sector_sd, simulations, qualifiers, seed, workers
+    )
+    table = riders.assign(
+        Clean_Runs=count.min(axis=1).astype(int),
+        # Over the paced sectors only, so comparable within the session
+        Modelled_Time=sector_mean.sum(axis=1).round(3),
+        Time_SD=np.sqrt((sector_sd**2).sum(axis=1)).round(3),
+        P_Qualify=chances[:, 0],
+        P_Podium=chances[:, 1],
+        P_Win=chances[:, 2],
+        Expected_Rank=expected_rank.round(1),
+    )
+    return table.sort_values(["Expected_Rank", "P_Win"], ascending=[True, False]).reset_index(
+        drop=True
+    )
+
+
+def forecast_path(csv_path, store_dir=SEASON_DIR):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(store_dir, f"forecast_{name}.parquet")
+
+
+def load_forecast(
+    csv_path,
+    simulations=SIMULATIONS,
+    qualifiers=QUALIFIERS,
+    seed=SEED,
+    workers=None,
+    store_dir=SEASON_DIR,
+):
+    """Stored forecast of a timed training file, recomputed if the file or settings changed."""
+    path = forecast_path(csv_path, store_dir)
+    version = source_version(
+        pd.DataFrame({"path": [csv_path]}),
+        f"{FORECAST_VERSION}:{simulations}:{qualifiers}:{seed}",
+    )
+    if os.path.exists(path):
+        metadata = pq.read_schema(path).metadata or {}
+        if metadata.get(b"source_version", b"").decode() == version:
+            return pd.read_parquet(path)
+
+    table = forecast(pd.read_csv(csv_path), simulations, qualifiers, seed, workers)
+    arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+    arrow_table = arrow_table.replace_schema_metadata(
+        {**arrow_table.schema.metadata, b"source_version": version.encode()}
+    )
+    os.makedirs(store_dir, exist_ok=True)
+    # Write then rename so a reader never opens a half-written file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(arrow_table, temp_path)
+    os.replace(temp_path, path)
+    return table
+
+
+def qualifying_path(csv_path, data_dir="data"):
+    """Qualifying results of the same event as a timed training file, or None."""
+    entry = parse_file_name(os.path.basename(csv_path))
+    if entry is None:
+        return None
+    sessions = catalog(data_dir)
+    sessions = sessions[
+        (sessions["event"] == entry["event"]) & sessions["session"].isin(QUALIFYING_SESSIONS)
+    ]
+    return sessions["path"].iloc[0] if len(sessions) else None
+
+
+def validate(table, csv_path, race_path, qualifiers=QUALIFIERS):
+    """Forecast against the actual qualifying result: per-rider outcomes and summary scores.
+
+    Riders are matched through rider_identity, so the timed training and race
+    spellings of a name line up. Brier scores are the mean squared error of
+    each probability (0 is perfect); riders who were forecast but did not
+    start qualifying are left out.
+    """
+    event = parse_file_name(os.path.basename(csv_path))["event"]
+    race = pd.read_csv(race_path)
+    actual = pd.DataFrame(
+        {
+            "Rider_Key": resolve(race["name"], event),
+            "Actual_Rank": pd.to_numeric(race["rank"], errors="coerce"),
+        }
+    ).dropna(subset=["Actual_Rank"]).drop_duplicates("Rider_Key")
+    rows = table.assign(Rider_Key=resolve(table["Name"], event).to_numpy()).merge(
+        actual, on="Rider_Key"
+    )
+    rows["Qualified"] = rows["Actual_Rank"] <= qualifiers
+    rows["Podium"] = rows["Actual_Rank"] <= PODIUM
+    rows["Won"] = rows["Actual_Rank"] == 1
+
+    picked = rows.nlargest(min(qualifiers, len(rows)), "P_Qualify")
+    summary = {
+        "Riders": len(rows),
+        "Qualifiers_Picked": int(picked["Qualified"].sum()),
+        "Qualifiers": int(rows["Qualified"].sum()),
+        # Spearman: the correlation of the two rankings
+        "Rank_Correlation": round(
+            float(rows["Expected_Rank"].rank().corr(rows["Actual_Rank"].rank())), 3
+        ),
+        "Brier_Qualify": round(float(((rows["P_Qualify"] - rows["Qualified"]) ** 2).mean()), 4),
+        "Brier_Podium": round(float(((rows["P_Podium"] - rows["Podium"]) ** 2).mean()), 4),
+        "Brier_Win": round(float(((rows["P_Win"] - rows["Won"]) ** 2).mean()), 4),
+    }
+    return summary, rows.drop(columns="Rider_Key").sort_values("Actual_Rank").reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Forecast qualifying from timed training runs and check it against the result."
+    )
+    parser.add_argument("csv_paths", nargs="*", help="Timed training CSVs (default: all in --data-dir)")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--simulations", type=int, default=SIMULATIONS)
+    parser.add_argument("--qualifiers", type=int, default=QUALIFIERS)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    sessions = catalog(args.data_dir)
+    csv_paths = args.csv_paths or list(sessions.loc[sessions["session"] == "tt", "path"])
+    for csv_path in csv_paths:
+        table = load_forecast(
+            csv_path, args.simulations, args.qualifiers, workers=args.workers
+        )
+        print(f"---- {csv_path} ----")
+        print(table.head(args.top).to_string(index=False))
+        race_path = qualifying_path(csv_path, args.data_dir)
+        if race_path is not None:
+            summary, _ = validate(table, csv_path, race_path, args.qualifiers)
+            print(f"vs {race_path}: {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# Filename: rank_sensitivity.py
+# Description: This file contains the time-to-rank sensitivity calculations: for one rider, the finishing position a given time gain would buy, the gain needed to draw level with each position ahead, and the gain from matching the top-N average in each sector. Every question is one np.searchsorted or broadcast over the sorted final times, so all sectors and targets are answered at once. Sectors far from the field median (crashes, misread splits) are left out. Race sessions use every finisher; timed training uses each rider's best run. Nothing in here depends on Streamlit.
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from outliers import field_outliers
+from running_rank import session_matrix
+
+# Gains (ms) in the "what tenths buy" ladder
+LADDER_STEP = 100
+LADDER_STEPS = 20
+
+
+def session_field(df):
+    """Finishers of a session, fastest first: names, final times and sector times in ms."""
+    names, _, times, labels = session_matrix(df)
+    finished = ~np.isnan(times[:, -1])
+    order = np.argsort(times[finished, -1], kind="stable")
+    times = times[finished][order]
+    # Cumulative times at each timing point differenced into sector times
+    sectors = np.diff(times, axis=1, prepend=0)
+    # Crashes and misread splits would skew the top-N averages
+    sectors[field_outliers(sectors)] = np.nan
+    return {
+        "names": names.to_numpy()[finished][order],
+        "finals": times[:, -1],
+        "sectors": sectors,
+        "labels": [f"Sector {i}" for i in range(1, len(labels) + 1)],
+    }
+
+
+def rider_index(field, name):
+    """Row of `name` in the field, or None if they did not finish."""
+    matches = np.flatnonzero(field["names"] == name)
+    return int(matches[0]) if len(matches) else None
+
+
+def rank_after_gain(field, rider, gains):
+    """Finishing position of `rider` after taking each of `gains` (ms) off their time.
+
+    A time equal to another rider's shares their position.
+    """
+    rest = np.delete(field["finals"], rider)
+    final = field["finals"][rider]
+    return np.searchsorted(rest, final - np.asarray(gains, dtype=float), side="left") + 1
+
+
+def gain_for_positions(field, rider, targets):
+    """Milliseconds `rider` must find to draw level with each target position."""
+    rest = np.delete(field["finals"], rider)
+    targets = np.clip(np.asarray(targets), 1, len(rest))
+    return np.maximum(field["finals"][rider] - rest[targets - 1], 0)
+
+
+def top_average(field, n):
+    """Average time of the `n` fastest finishers in each sector."""
+    return np.nanmean(field["sectors"][:n], axis=0)
+
+
+def sector_table(field, rider, n):
+    """Gain and new position if `rider` matched the top-`n` average in each sector.
+
+    A negative gain means the rider was faster than the average there. The
+    last row matches the average in every sector where the rider was slower.
+    """
+    rider_sectors = field["sectors"][rider]
+    average = top_average(field, n)
+    gains = rider_sectors - average
+    gains = np.append(gains, np.nansum(np.clip(gains, 0, None)))
+    ranks = rank_after_gain(field, rider, np.nan_to_num(gains))
+    return pd.DataFrame(
+        {
+            "Sector": field["labels"] + ["Every sector (where slower)"],
+            "Rider_Time": np.append(rider_sectors, field["finals"][rider]) / 1000,
+            f"Top_{n}_Avg": np.append(average, average.sum()) / 1000,
+            "Gain": gains / 1000,
+            "New_Time": (field["finals"][rider] - np.nan_to_num(gains)) / 1000,
+            "New_Rank": ranks,
+            "Places_Gained": rider + 1 - ranks,
+        }
+    )
+
+
+def target_table(field, rider):
+    """Gain needed for every position ahead of `rider`, and what share of each sector it is.
+
+    A sector's share is left empty when finding the whole gain there would
+    take a sector faster than anyone in the field rode it.
+    """
+    targets = np.arange(1, rider + 1)
+    needed = gain_for_positions(field, rider, targets)
+    rider_sectors = field["sectors"][rider]
+    # Time the rider could still find in each sector before beating the fastest
+    headroom = rider_sectors - np.nanmin(field["sectors"], axis=0)
+    share = needed[:, None] / rider_sectors[None, :] * 100
+    share = np.where(needed[:, None] <= headroom[None, :], share, np.nan)
+    table = pd.DataFrame(
+        {
+            "Position": targets,
+            "Draw_Level_With": np.delete(field["names"], rider)[targets - 1],
+            "Gain_Needed": needed / 1000,
+        }
+    )
+    for i, label in enumerate(field["labels"]):
+        table[f"{label} %"] = share[:, i].round(2)
+    return table
+
+
+def gain_ladder(field, rider, step=LADDER_STEP, steps=LADDER_STEPS):
+    """Position for every gain from `step` to `step * steps` ms."""
+    gains = np.arange(1, steps + 1) * step
+    return pd.DataFrame(
+        {"Gain": gains / 1000, "Rank": rank_after_gain(field, rider, gains)}
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="How much time a rider would have to find to move up the order."
+    )
+    parser.add_argument("csv_path")
+    parser.add_argument("rider", help="Rider name as printed in the session")
+    parser.add_argument("--top", type=int, default=5, help="Riders in the sector average")
+    args = parser.parse_args()
+
+    field = session_field(pd.read_csv(args.csv_path))
+    rider = rider_index(field, args.rider)
+    if rider is None:
+        parser.error(f"{args.rider} has no final time in {args.csv_path}")
+    print(f"{args.rider}: P{rider + 1} in {field['finals'][rider] / 1000:.3f}")
+    print(sector_table(field, rider, args.top).round(3).to_string(index=False))
+    print(target_table(field, rider).round(3).to_string(index=False))
+    print(gain_ladder(field, rider).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# Filename: result_diff.py
+# Description: This file contains the diff engine that compares two extracted versions of the same session (for example ChronoRace's provisional and official sheets) and writes a machine-readable change log that the Streamlit pages highlight.
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils import time_column_to_ms
+
+CHANGE_LOG_SUFFIX = ".changes.json"
+
+
+def session_layout(df):
+    """Key, name, rank and time columns for an event or timed training frame."""
+    if "rider_number" in df.columns:
+        time_columns = [
+            col
+            for col in df.columns
+            if col.startswith("split_") and not col.endswith("_rank")
+        ] + ["final_time"]
+        return ["rider_number"], "name", "rank", time_columns
+    time_columns = sorted(
+        (col for col in df.columns if col.startswith("Orig_Split_")),
+        key=lambda col: int(col.split("_")[2]),
+    )
+    return ["Number", "Run"], "Name", "Overall_Rank", time_columns
+
+
+def ms_matrix(df, columns):
+    """(rows x columns) float matrix of milliseconds, NaN where not a time."""
+    matrix = np.empty((len(df), len(columns)))
+    for index, col in enumerate(columns):
+        matrix[:, index] = time_column_to_ms(df[col]).to_numpy(dtype=float)
+    return matrix
+
+
+def key_strings(series):
+    """Rider key values as strings, so 7, 7.0 and "7" all match."""
+    return series.astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+
+
+def diff_sessions(before, after):
+    """Change records between two versions of a session.
+
+    Rows are matched with a hash join on the rider key (rider number, plus
+    run for timed training), so the cost is linear in the field size. Every
+    comparison is done column-wise over the joined frame.
+    """
+    key, name_column, rank_column, time_columns = session_layout(after)
+    time_columns = [col for col in time_columns if col in before.columns]
+    final_column = time_columns[-1]
+
+    # One CSV can read rider numbers as int64 and the other as str (a row
+    # such as "NORTON" turns the whole column into text)
+    before = before.assign(**{col: key_strings(before[col]) for col in key})
+    after = after.assign(**{col: key_strings(after[col]) for col in key})
+    joined = before.merge(
+        after, on=key, how="outer", suffixes=("_before", "_after"), indicator=True
+    )
+    changes = []
+
+    def record(rows, change, field=None, before_values=None, after_values=None):
+        if rows.empty:
+            return
+        names = rows[f"{name_column}_after"].fillna(rows[f"{name_column}_before"])
+        frame = pd.DataFrame(
+            {
+                "rider": rows[key[0]].astype(str),
+                "name": names,
+                "change": change,
+                "field": field,
+                "before": before_values,
+                "after": after_values,
+            }
+        )
+        if len(key) > 1:
+            frame["run"] = rows[key[1]]
+        changes.append(frame)
+
+    record(joined[joined["_merge"] == "right_only"], "added")
+    record(joined[joined["_merge"] == "left_only"], "removed")
+
+    both = joined[joined["_merge"] == "both"]
+    before_ms = ms_matrix(both, [f"{col}_before" for col in time_columns])
+    after_ms = ms_matrix(both, [f"{col}_after" for col in time_columns])
+    changed = ~((before_ms == after_ms) | (np.isnan(before_ms) & np.isnan(after_ms)))
+
+    # A later final time with untouched splits is a time penalty
+    penalty = changed[:, -1] & ~changed[:, :-1].any(axis=1)
+    penalty &= after_ms[:, -1] > before_ms[:, -1]
+    for column_index, col in enumerate(time_columns):
+        mask = changed[:, column_index]
+        if col == final_column:
+            rows = both[penalty]
+            record(
+                rows,
+                "penalty",
+                col,
+                rows[f"{col}_before"],
+                rows[f"{col}_after"],
+            )
+            mask = mask & ~penalty
+        rows = both[mask]
+        record(
+            rows,
+            "time_changed",
+            col,
+            rows[f"{col}_before"],
+            rows[f"{col}_after"],
+        )
+
+    if f"{rank_column}_before" in both.columns:
+        rank_before = pd.to_numeric(both[f"{rank_column}_before"], errors="coerce")
+        rank_after = pd.to_numeric(both[f"{rank_column}_after"], errors="coerce")
+        rows = both[rank_before.ne(rank_after) & rank_after.notna()]
+        record(
+            rows,
+            "rank_shift",
+            rank_column,
+            rank_before[rows.index],
+            rank_after[rows.index],
+        )
+
+    if not changes:
+        return pd.DataFrame(
+            columns=["rider", "name", "change", "field", "before", "after"]
+        )
+    return pd.concat(changes, ignore_index=True)
+
+
+def change_log(before_path, after_path):
+    before = pd.read_csv(before_path)
+    after = pd.read_csv(after_path)
+    changes = diff_sessions(before, after)
+    return {
+        "before": before_path,
+        "after": after_path,
+        "summary": changes["change"].value_counts().to_dict(),
+        "changes": json.loads(changes.to_json(orient="records")),
+    }
+
+
+def change_log_path(csv_path):
+    return os.path.splitext(csv_path)[0] + CHANGE_LOG_SUFFIX
+
+
+def load_change_log(csv_path):
+    """The change log written for `csv_path`, or None if there is none."""
+    path = change_log_path(csv_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare two extracted versions of a session (e.g. provisional vs official)."
+    )
+    parser.add_argument("before", help="CSV of the earlier (provisional) version")
+    parser.add_argument("after", help="CSV of the later (official) version")
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Where to write the change log (default: next to the after CSV)",
+    )
+    args = parser.parse_args()
+
+    log = change_log(args.before, args.after)
+    output = args.output or change_log_path(args.after)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(log, f, indent=2)
+
+    print(f"{len(log['changes'])} changes: {log['summary']}")
+    print(f"Saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
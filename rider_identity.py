@@ -0,0 +1,311 @@
+# Filename: rider_identity.py
+# Description: This file contains the rider identity index. Names differ between sources ("GOLDSTONE Jackson * (CAN)" in 2025 timed training, "O CALLAGHAN Oisin *" in qualifying, bare names in older files), and rider numbers change between seasons. Every rider seen in the catalog is given one Rider_Id: the UCI ID where a results sheet prints one, otherwise the rider number in a race session of the same event, an exact normalized name, or a close name within the same surname block. The mapping is stored next to the season index so joins across sessions are exact lookups on (event, name as printed).
+
+import argparse
+import os
+from difflib import SequenceMatcher
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from catalog import SEASON_DIR, catalog, source_version
+
+RIDERS_FILE = "riders.parquet"
+ALIASES_FILE = "aliases.parquet"
+# Bump when the matching rules change so stored identities are rebuilt
+IDENTITY_VERSION = 1
+# Lowest name similarity (0-1) accepted as the same rider within a block
+FUZZY_THRESHOLD = 0.88
+# Characters of the normalized surname two names must share to be compared
+BLOCK_LENGTH = 3
+COUNTRY_SUFFIX = r"\s*\(([A-Z]{3})\)\s*$"
+
+_loaded = {}  # store_dir -> (source version, riders, aliases)
+
+
+def normalize_name(names):
+    """Upper-case ASCII name without the "*" marker, country suffix or punctuation."""
+    return (
+        names.astype("string")
+        .str.replace(COUNTRY_SUFFIX, "", regex=True)
+        .str.normalize("NFKD")
+        .str.encode("ascii", errors="ignore")
+        .str.decode("ascii")
+        .str.upper()
+        .str.replace(r"[^A-Z0-9]+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def display_name(names):
+    """Name as printed, without the "*" marker or country suffix."""
+    return (
+        names.astype("string")
+        .str.replace(COUNTRY_SUFFIX, "", regex=True)
+        .str.replace("*", "", regex=False)
+        .str.split()
+        .str.join(" ")
+    )
+
+
+def session_observations(entry):
+    """One row per distinct (name, number) printed in a session."""
+    df = pd.read_csv(entry["path"])
+    if entry["session"] == "tt":
+        observed = pd.DataFrame(
+            {
+                "Name": df["Name"],
+                "Number": df["Number"],
+                "UCI_ID": pd.NA,
+                "Country": df["Name"].str.extract(COUNTRY_SUFFIX, expand=False),
+                "Birth_Year": pd.NA,
+            }
+        )
+    else:
+        observed = pd.DataFrame(
+            {
+                "Name": df["name"],
+                "Number": pd.to_numeric(df["rider_number"], errors="coerce"),
+                "UCI_ID": df["uci_id"],
+                "Country": df["country"],
+                "Birth_Year": pd.to_numeric(df["birth_year"], errors="coerce"),
+            }
+        )
+    observed = observed.dropna(subset=["Name"]).drop_duplicates(["Name", "Number"])
+    observed.insert(0, "Event", entry["event"])
+    observed.insert(1, "Session", entry["session"])
+    return observed
+
+
+def observations(sessions):
+    df = pd.concat(
+        [session_observations(entry) for entry in sessions.to_dict("records")],
+        ignore_index=True,
+    )
+    df["Number"] = df["Number"].astype("Int64")
+    df["Birth_Year"] = df["Birth_Year"].astype("Int64")
+    df["UCI_ID"] = pd.to_numeric(df["UCI_ID"], errors="coerce").astype("Int64").astype("string")
+    df["Alias_Key"] = normalize_name(df["Name"])
+    return df
+
+
+def unique_map(keys, values):
+    """Hash map of keys that point at exactly one value."""
+    pairs = pd.DataFrame({"key": keys, "value": values}).dropna().drop_duplicates()
+    pairs = pairs[~pairs["key"].duplicated(keep=False)]
+    return dict(zip(pairs["key"], pairs["value"]))
+
+
+def similarity(a, b):
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def fuzzy_matches(keys, known):
+    """Closest known key for each key, compared only within its surname block."""
+    blocks = {}
+    for candidate in known:
+        blocks.setdefault(candidate[:BLOCK_LENGTH], []).append(candidate)
+    matches = {}
+    for key in keys:
+        scored = [
+            (similarity(key, candidate), candidate)
+            for candidate in blocks.get(key[:BLOCK_LENGTH], [])
+        ]
+        if scored:
+            score, candidate = max(scored)
+            if score >= FUZZY_THRESHOLD:
+                matches[key] = candidate
+    return matches
+
+
+def resolve_observations(df):
+    """Rider_Id and the rule that produced it for every observation."""
+    df = df.copy()
+    df["Rider_Id"] = df["UCI_ID"]
+    df["Match"] = df["UCI_ID"].notna().map({True: "uci", False: pd.NA})
+
+    # Rider numbers are unique within an event, and the race sheets print the
+    # UCI ID next to them; the surname has to agree as well
+    by_number = unique_map(
+        zip(df["Event"], df["Number"]), df["UCI_ID"].where(df["UCI_ID"].notna())
+    )
+    surname_by_id = unique_map(df["UCI_ID"], df["Alias_Key"].str.split().str[0])
+    todo = df["Rider_Id"].isna()
+    linked = pd.Series(
+        [by_number.get(key) for key in zip(df["Event"], df["Number"])], index=df.index
+    )
+    same_surname = linked.map(surname_by_id) == df["Alias_Key"].str.split().str[0]
+    use = todo & linked.notna() & same_surname.fillna(False)
+    df.loc[use, "Rider_Id"] = linked[use]
+    df.loc[use, "Match"] = "number"
+
+    # A lone first name (a row read out of step with the table) is too weak to match on
+    full_names = df["Alias_Key"].str.contains(" ")
+    by_name = unique_map(df.loc[full_names, "Alias_Key"], df.loc[full_names, "Rider_Id"])
+    todo = df["Rider_Id"].isna()
+    named = df.loc[todo, "Alias_Key"].map(by_name)
+    df.loc[named.dropna().index, "Rider_Id"] = named.dropna()
+    df.loc[named.dropna().index, "Match"] = "name"
+
+    todo = df["Rider_Id"].isna()
+    close = fuzzy_matches(df.loc[todo, "Alias_Key"].unique(), list(by_name))
+    fuzzy = df.loc[todo, "Alias_Key"].map(close).map(by_name)
+    df.loc[fuzzy.dropna().index, "Rider_Id"] = fuzzy.dropna()
+    df.loc[fuzzy.dropna().index, "Match"] = "fuzzy"
+
+    todo = df["Rider_Id"].isna()
+    df.loc[todo, "Rider_Id"] = "name:" + df.loc[todo, "Alias_Key"]
+    df.loc[todo, "Match"] = "new"
+    return df
+
+
+def most_common(values):
+    values = values.dropna()
+    return values.mode().iloc[0] if len(values) else pd.NA
+
+
+def canonical_riders(resolved):
+    """One row per Rider_Id with the most common name, country and year of birth.
+
+    Names from race sheets are preferred over timed training, which prints
+    them less consistently.
+    """
+    named = resolved.assign(
+        Display_Name=display_name(resolved["Name"]),
+        From_Race=resolved["Session"] != "tt",
+    )
+    names = (
+        named.groupby("Rider_Id")
+        .apply(
+            lambda group: most_common(
+                group.loc[group["From_Race"], "Display_Name"]
+                if group["From_Race"].any()
+                else group["Display_Name"]
+            ),
+            include_groups=False,
+        )
+    )
+    riders = named.groupby("Rider_Id").agg(
+        UCI_ID=("UCI_ID", "first"),
+        Country=("Country", most_common),
+        Birth_Year=("Birth_Year", most_common),
+        Sessions=("Session", "size"),
+        Events=("Event", "nunique"),
+    )
+    riders.insert(0, "Name", names)
+    riders["Birth_Year"] = riders["Birth_Year"].astype("Int64")
+    return riders.reset_index().sort_values("Name").reset_index(drop=True)
+
+
+def identity_path(file_name, store_dir=SEASON_DIR):
+    return os.path.join(store_dir, file_name)
+
+
+def write_table(df, path, version):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**table.schema.metadata, b"source_version": version.encode()}
+    )
+    # Write then rename so a reader never opens a half-written file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, temp_path)
+    os.replace(temp_path, path)
+
+
+def build_identities(data_dir="data", store_dir=SEASON_DIR):
+    """Resolve every rider in the catalog and store the riders and alias tables."""
+    sessions = catalog(data_dir)
+    resolved = resolve_observations(observations(sessions))
+    riders = canonical_riders(resolved)
+    aliases = resolved[
+        ["Event", "Session", "Name", "Number", "Alias_Key", "Rider_Id", "Match"]
+    ]
+    version = source_version(sessions, IDENTITY_VERSION)
+    os.makedirs(store_dir, exist_ok=True)
+    write_table(aliases, identity_path(ALIASES_FILE, store_dir), version)
+    write_table(riders, identity_path(RIDERS_FILE, store_dir), version)
+    _loaded[store_dir] = (version, riders, aliases)
+    return riders, aliases
+
+
+def stored_version(path):
+    if not os.path.exists(path):
+        return None
+    metadata = pq.read_schema(path).metadata or {}
+    return metadata.get(b"source_version", b"").decode()
+
+
+def load_identities(data_dir="data", store_dir=SEASON_DIR):
+    """(riders, aliases) tables, rebuilt only when a session file changed."""
+    version = source_version(catalog(data_dir), IDENTITY_VERSION)
+    cached = _loaded.get(store_dir)
+    if cached is not None and cached[0] == version:
+        return cached[1], cached[2]
+    riders_path = identity_path(RIDERS_FILE, store_dir)
+    aliases_path = identity_path(ALIASES_FILE, store_dir)
+    if stored_version(riders_path) == version and stored_version(aliases_path) == version:
+        riders, aliases = pd.read_parquet(riders_path), pd.read_parquet(aliases_path)
+        _loaded[store_dir] = (version, riders, aliases)
+        return riders, aliases
+    return build_identities(data_dir, store_dir)
+
+
+def name_map(aliases):
+    """Normalized full name -> Rider_Id, for names that belong to one rider only."""
+    full_names = aliases[aliases["Alias_Key"].str.contains(" ")]
+    return unique_map(full_names["Alias_Key"], full_names["Rider_Id"])
+
+
+def resolve(names, event, data_dir="data", store_dir=SEASON_DIR):
+    """Rider_Id for each name as printed in a session of `event`.
+
+    Names that were indexed for the event are exact lookups. Anything else
+    falls back to the normalized name, or a new "name:" id.
+    """
+    _, aliases = load_identities(data_dir, store_dir)
+    names = pd.Series(names)
+    event_aliases = aliases[aliases["Event"] == event]
+    exact = dict(zip(event_aliases["Name"], event_aliases["Rider_Id"]))
+    keys = normalize_name(names)
+    fallback = name_map(aliases)
+    return (
+        names.map(exact)
+        .fillna(keys.map(fallback))
+        .fillna("name:" + keys)
+        .astype("string")
+    )
+
+
+def find_rider(name, data_dir="data", store_dir=SEASON_DIR):
+    """Rider_Id for a name typed in any case or spelling, or None."""
+    _, aliases = load_identities(data_dir, store_dir)
+    key = normalize_name(pd.Series([name])).iloc[0]
+    by_name = name_map(aliases)
+    if key in by_name:
+        return by_name[key]
+    close = fuzzy_matches([key], list(by_name))
+    return by_name[close[key]] if key in close else None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Resolve every rider in data/ to one identity and store the mapping."
+    )
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--store-dir", default=SEASON_DIR)
+    parser.add_argument("--rider", help="Print the aliases of one rider")
+    args = parser.parse_args()
+
+    riders, aliases = build_identities(args.data_dir, args.store_dir)
+    print(f"{len(aliases)} names resolved to {len(riders)} riders")
+    print(aliases["Match"].value_counts().to_string())
+    if args.rider:
+        rider_id = find_rider(args.rider, args.data_dir, args.store_dir)
+        with pd.option_context("display.width", 250, "display.max_columns", None):
+            print(riders[riders["Rider_Id"] == rider_id].to_string(index=False))
+            print(aliases[aliases["Rider_Id"] == rider_id].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
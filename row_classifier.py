@@ -0,0 +1,43 @@
+# Filename: row_classifier.py
+# Description: This file contains the classifier that decides whether a parsed results record is a real rider row. It looks only at the structure of the typed fields (a race time, a numeric UCI ID, a three-letter country code, a plausible year of birth), so header lines, DNF/DNS rows and chunks read out of step with the table are rejected without a per-event list of names.
+
+import re
+from datetime import date
+
+import pandas as pd
+
+FIELD_PATTERNS = {
+    "rank": re.compile(r"\d+"),
+    "rider_number": re.compile(r"\d+"),
+    "uci_id": re.compile(r"\d{11}"),
+    "country": re.compile(r"[A-Z]{3}"),
+    "birth_year": re.compile(r"\d{4}"),
+    "final_time": re.compile(r"\d{1,2}:\d{2}\.\d{3}"),
+}
+BIRTH_YEAR_RANGE = (1940, date.today().year - 10)
+
+
+def field_checks(records):
+    """(records x fields) boolean frame, True where a field has the expected shape.
+
+    `records` is a list of parsed record dicts or a DataFrame of them. Every
+    check runs column-wise over all records at once.
+    """
+    df = pd.DataFrame(records)
+    checks = pd.DataFrame(index=df.index)
+    for field, pattern in FIELD_PATTERNS.items():
+        if field not in df.columns:
+            checks[field] = False
+            continue
+        values = df[field].astype("string").str.strip()
+        checks[field] = values.str.fullmatch(pattern).fillna(False).astype(bool)
+    if "birth_year" in df.columns:
+        low, high = BIRTH_YEAR_RANGE
+        year = pd.to_numeric(df["birth_year"], errors="coerce")
+        checks["birth_year"] &= year.between(low, high)
+    return checks
+
+
+def is_rider_row(records):
+    """Boolean Series, True for records that pass every field check."""
+    return field_checks(records).all(axis=1)
@@ -0,0 +1,144 @@
+# Filename: run_fingerprint.py
+# Description: This file contains the run fingerprinting used by tt_split_pdf_extraction.py to drop "Best" column artifacts and duplicate runs, and a command line tool that merges reissued timed training sheets of one session. Each run's splits are normalized to a millisecond vector and hashed, so every check is a set lookup instead of a comparison against all earlier runs.
+
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def split_to_milliseconds(split):
+    """Milliseconds for a "M:SS.fff" split, or None if it is not a time."""
+    try:
+        minutes, seconds = split.split(":")
+        return int(minutes) * 60000 + round(float(seconds) * 1000)
+    except (AttributeError, ValueError):
+        return None
+
+
+def normalize_splits(splits):
+    """Splits as a tuple of milliseconds with the repeated final time removed.
+
+    The timing sheets print the final time several times (the Time column is
+    rendered in layers), so a run with four splits arrives as
+    [s1, s2, s3, s4, final, final, final, final].
+    """
+    milliseconds = [split_to_milliseconds(split) for split in splits]
+    milliseconds = [value for value in milliseconds if value is not None]
+    while len(milliseconds) > 1 and milliseconds[-1] == milliseconds[-2]:
+        milliseconds.pop()
+    return tuple(milliseconds)
+
+
+def fingerprint(milliseconds):
+    """Stable hash of a normalized split vector (same across processes and files)."""
+    vector = np.asarray(milliseconds, dtype="<i8")
+    return hashlib.blake2b(vector.tobytes(), digest_size=8).hexdigest()
+
+
+def format_milliseconds(milliseconds):
+    minutes, remainder = divmod(milliseconds, 60000)
+    return f"{minutes}:{remainder / 1000:06.3f}"
+
+
+def format_gap(milliseconds):
+    if milliseconds < 60000:
+        return f"+{milliseconds / 1000:.3f}"
+    return f"+{format_milliseconds(int(milliseconds))}"
+
+
+class RunFingerprinter:
+    """Tracks the runs accepted for one session and records every rejected one.
+
+    A run is rejected when it is a "Best" column artifact (a single repeated
+    time equal to one of the rider's earlier final times) or when the rider
+    already has a run with the same fingerprint. Riders are keyed by number,
+    so duplicates across pages and across reissued sheets fed to the same
+    instance are caught as well.
+    """
+
+    def __init__(self):
+        self.accepted = {}  # (rider, fingerprint) -> source of the first copy
+        self.finals = {}  # rider -> set of accepted final times in ms
+        self.dropped = []
+
+    def accept(self, rider, splits, source="", run=None):
+        """Return the cleaned split strings, or None if the run is dropped."""
+        milliseconds = normalize_splits(splits)
+        if not milliseconds:
+            return None
+        run_fingerprint = fingerprint(milliseconds)
+        rider_finals = self.finals.setdefault(rider, set())
+
+        reason = None
+        if len(milliseconds) == 1 and milliseconds[0] in rider_finals:
+            reason = "best_column"
+        elif (rider, run_fingerprint) in self.accepted:
+            first_source = self.accepted[(rider, run_fingerprint)]
+            reason = "duplicate_run" if first_source == source else "duplicate_source"
+
+        if reason is not None:
+            self.dropped.append(
+                {
+                    "rider": rider,
+                    "run": run,
+                    "source": source,
+                    "reason": reason,
+                    "fingerprint": run_fingerprint,
+                    "splits": list(splits),
+                }
+            )
+            return None
+
+        self.accepted[(rider, run_fingerprint)] = source
+        rider_finals.add(milliseconds[-1])
+        return [format_milliseconds(value) for value in milliseconds]
+
+    def dropped_report(self):
+        return pd.DataFrame(
+            self.dropped,
+            columns=["rider", "run", "source", "reason", "fingerprint", "splits"],
+        )
+
+
+def dedup_runs(frames):
+    """Concatenate timed training frames (e.g. a provisional and a reissued
+    sheet of the same session) keeping the first copy of every run.
+
+    Frames need `Number` and `Run_Fingerprint` columns, which
+    build_timed_training_frame adds. Returns the combined frame and the
+    dropped rows.
+    """
+    combined = pd.concat(frames, ignore_index=True)
+    duplicated = combined.duplicated(subset=["Number", "Run_Fingerprint"])
+    return combined[~duplicated].reset_index(drop=True), combined[duplicated]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge extracted timed training CSVs of one session (e.g. a provisional and a reissued sheet), keeping the first copy of every run."
+    )
+    parser.add_argument("csvs", nargs="+", help="Timed training CSVs, earliest sheet first")
+    parser.add_argument("--output", required=True, help="Where to write the merged CSV")
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Replace the output CSV if it already exists",
+    )
+    args = parser.parse_args()
+
+    if os.path.exists(args.output) and not args.overwrite:
+        parser.error(f"{args.output} already exists (pass --overwrite to replace it)")
+
+    frames = [pd.read_csv(path, dtype={"Number": str}) for path in args.csvs]
+    merged, dropped = dedup_runs(frames)
+    merged.to_csv(args.output, index=False)
+
+    print(f"Kept {len(merged)} runs, dropped {len(dropped)} duplicates")
+    print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
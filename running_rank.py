@@ -0,0 +1,99 @@
+# Filename: running_rank.py
+# Description: This file contains the running-rank matrix: every rider's position at each timing point, computed by sorting the cumulative time matrix column by column. It also gives the positions gained or lost in each sector. Race sessions use every finisher; timed training uses each rider's best run. The matrix is written next to the session CSV as a .positions.csv sidecar when the session is written (session_validation.write_outputs), so pages read it instead of recomputing.
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from live_timing import session_times
+from tt_analysis import best_runs
+from tt_schema import is_canonical, split_count
+from utils import find_sessions
+
+POSITIONS_SUFFIX = ".positions.csv"
+
+
+def timed_training_times(df):
+    """(riders x timing points) milliseconds of each rider's best run, and the point labels."""
+    df_best_runs = best_runs(df.dropna(subset=["Final_Time_Seconds"]))
+    count = split_count(df)
+    times = df_best_runs[[f"Clean_Split_{i}_Time" for i in range(1, count + 1)]]
+    labels = [f"Split {i}" for i in range(1, count)] + ["Finish"]
+    return df_best_runs, times.to_numpy(dtype=float) * 1000, labels
+
+
+def session_matrix(df):
+    """Names, numbers, (riders x timing points) milliseconds and point labels of a session."""
+    if is_canonical(df):
+        riders, times, labels = timed_training_times(df)
+        return riders["Name"], riders["Number"], times, labels
+    times, labels = session_times(df)
+    return df["name"], df["rider_number"], times, labels
+
+
+def running_ranks(times):
+    """Position (1 = fastest) of every rider at every timing point; NaN where there is no time.
+
+    One argsort over the whole matrix: NaNs sort last in each column, so the
+    first `count` positions of each column are the riders with a time.
+    """
+    order = np.argsort(times, axis=0, kind="stable")
+    ranks = np.empty(times.shape)
+    positions = np.broadcast_to(np.arange(1, times.shape[0] + 1)[:, None], times.shape)
+    np.put_along_axis(ranks, order, positions, axis=0)
+    ranks[np.isnan(times)] = np.nan
+    return ranks
+
+
+def positions_frame(df):
+    """Running ranks and per-sector places gained of a race or timed training session."""
+    names, numbers, times, labels = session_matrix(df)
+    ranks = running_ranks(times)
+    # Places gained in sector k: position at point k-1 minus position at point k
+    gained = np.column_stack([ranks[:, 0] * np.nan, ranks[:, :-1] - ranks[:, 1:]])
+
+    frame = pd.DataFrame({"Name": names.to_numpy(), "Number": numbers.to_numpy()})
+    for i, label in enumerate(labels):
+        frame[f"Position_{label.replace(' ', '_')}"] = ranks[:, i]
+    for i in range(1, len(labels)):
+        frame[f"Sector_{i + 1}_Gained"] = gained[:, i]
+    frame["Total_Gained"] = ranks[:, 0] - ranks[:, -1]
+    return frame.sort_values(frame.columns[len(labels) + 1], na_position="last").reset_index(
+        drop=True
+    )
+
+
+def position_columns(frame):
+    return [col for col in frame.columns if col.startswith("Position_")]
+
+
+def write_positions(csv_path, df):
+    path = os.path.splitext(csv_path)[0] + POSITIONS_SUFFIX
+    positions_frame(df).to_csv(path, index=False)
+    return path
+
+
+def load_positions(csv_path):
+    """The positions sidecar of `csv_path`, recomputed if it is missing or older than the CSV."""
+    path = os.path.splitext(csv_path)[0] + POSITIONS_SUFFIX
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(csv_path):
+        write_positions(csv_path, pd.read_csv(csv_path))
+    return pd.read_csv(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write the running-rank sidecar of every session CSV."
+    )
+    parser.add_argument("paths", nargs="*", help="Session CSVs (default: every session in --data-dir)")
+    parser.add_argument("--data-dir", default="data")
+    args = parser.parse_args()
+
+    for csv_path in args.paths or find_sessions(args.data_dir):
+        print(f"Wrote {write_positions(csv_path, pd.read_csv(csv_path))}")
+
+
+if __name__ == "__main__":
+    main()
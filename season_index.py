@@ -0,0 +1,203 @@
+# Filename: season_index.py
+# Description: This file contains the rider-keyed season index. Every session in the catalog (timed training best runs, qualifying, semi-finals, finals) is flattened into one row per resolved rider (rider_identity.py) per session: rank, final time, gap to the session leader and per-sector rank percentiles. The rows are sorted by rider and written to a Parquet file with small row groups, so one rider's profile is a single filtered read instead of loading every CSV. The index is rebuilt when any session file changes.
+
+import argparse
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from catalog import SEASON_DIR, catalog, source_version
+from columns import numbered_columns
+from rider_identity import find_rider, load_identities, resolve
+from tt_analysis import best_runs
+from tt_schema import is_canonical, split_count
+from utils import time_column_to_ms
+
+INDEX_DIR = SEASON_DIR
+INDEX_FILE = "profiles.parquet"
+# Bump when the index columns change so existing files are rebuilt
+INDEX_VERSION = 3
+# Small row groups let a rider filter skip almost all of the file
+ROW_GROUP_SIZE = 256
+PROFILE_COLUMNS = [
+    "Rider_Key",
+    "Name",
+    "Number",
+    "Round",
+    "Event",
+    "Venue",
+    "Year",
+    "Session",
+    "Session_Label",
+    "Rank",
+    "Field_Size",
+    "Time_Seconds",
+    "Gap_Seconds",
+]
+
+
+def sector_percentiles(sectors):
+    """Share of the field (0-100) each rider beat in each sector; 100 is fastest."""
+    ranks = sectors.rank(method="min")
+    field = sectors.notna().sum()
+    return (field - ranks).div((field - 1).where(field > 1)).mul(100).round(1)
+
+
+def timed_training_rows(df):
+    """Rank, time and sectors of each rider's best timed training run."""
+    df_best_runs = best_runs(df.dropna(subset=["Final_Time_Seconds"]))
+    sectors = df_best_runs[
+        [f"Sector_{i}_Time" for i in range(1, split_count(df) + 1)]
+    ].astype(float)
+    sectors.columns = range(1, len(sectors.columns) + 1)
+    return pd.DataFrame(
+        {
+            "Name": df_best_runs["Name"],
+            "Number": df_best_runs["Number"],
+            "Rank": df_best_runs["Rank"],
+            "Time_Seconds": df_best_runs["Final_Time_Seconds"],
+        }
+    ), sectors
+
+
+def race_rows(df):
+    """Rank, time and sectors of each finisher in a race session."""
+    sector_columns = numbered_columns(df, "sector")
+    sectors = pd.DataFrame(
+        {i: time_column_to_ms(df[col]) / 1000 for i, col in enumerate(sector_columns, 1)}
+    )
+    return pd.DataFrame(
+        {
+            "Name": df["name"],
+            "Number": pd.to_numeric(df["rider_number"], errors="coerce"),
+            "Rank": pd.to_numeric(df["rank"], errors="coerce"),
+            "Time_Seconds": time_column_to_ms(df["final_time"]) / 1000,
+        }
+    ), sectors
+
+
+def session_rows(entry, round_number):
+    """Index rows for one catalog entry, or None if the file can't be indexed."""
+    df = pd.read_csv(entry["path"])
+    if entry["session"] == "tt":
+        if not is_canonical(df):
+            return None
+        rows, sectors = timed_training_rows(df)
+    else:
+        rows, sectors = race_rows(df)
+    finished = rows["Time_Seconds"].notna()
+    rows = rows[finished].reset_index(drop=True)
+    sectors = sectors[finished].reset_index(drop=True)
+
+    rows.insert(0, "Rider_Key", resolve(rows["Name"], entry["event"]))
+    rows["Round"] = round_number
+    rows["Event"] = entry["event"]
+    rows["Venue"] = entry["venue_name"]
+    rows["Year"] = entry["year"]
+    rows["Session"] = entry["session"]
+    rows["Session_Label"] = entry["label"]
+    rows["Field_Size"] = len(rows)
+    rows["Gap_Seconds"] = (rows["Time_Seconds"] - rows["Time_Seconds"].min()).round(3)
+    percentiles = sector_percentiles(sectors)
+    for i in sectors.columns:
+        rows[f"Sector_{i}_Seconds"] = sectors[i].round(3)
+        rows[f"Sector_{i}_Pct"] = percentiles[i]
+    return rows
+
+
+def season_order(sessions):
+    """Catalog rows in season order: oldest season first, then race order and weekend order."""
+    return sessions.sort_values("year", na_position="first", kind="stable").reset_index(
+        drop=True
+    )
+
+
+def index_path(index_dir=INDEX_DIR):
+    return os.path.join(index_dir, INDEX_FILE)
+
+
+def build_index(data_dir="data", index_dir=INDEX_DIR):
+    """Flatten every session into the rider-keyed Parquet index and return its path."""
+    sessions = season_order(catalog(data_dir))
+    frames = [
+        rows
+        for round_number, entry in enumerate(sessions.to_dict("records"), 1)
+        if (rows := session_rows(entry, round_number)) is not None
+    ]
+    df = pd.concat(frames, ignore_index=True)
+    sector_columns = sorted(
+        (col for col in df.columns if col.startswith("Sector_")),
+        key=lambda col: (int(col.split("_")[1]), col.endswith("_Pct")),
+    )
+    df = df[PROFILE_COLUMNS + sector_columns].sort_values(
+        ["Rider_Key", "Round"], kind="stable"
+    )
+    df["Year"] = df["Year"].astype("Int64")
+    df["Number"] = df["Number"].astype("Int64")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**table.schema.metadata, b"source_version": source_version(sessions, INDEX_VERSION).encode()}
+    )
+    os.makedirs(index_dir, exist_ok=True)
+    path = index_path(index_dir)
+    # Write then rename so a reader never opens a half-written index
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, temp_path, row_group_size=ROW_GROUP_SIZE)
+    os.replace(temp_path, path)
+    return path
+
+
+def ensure_index(data_dir="data", index_dir=INDEX_DIR):
+    """Path of an up-to-date index, rebuilt only if a session file changed."""
+    path = index_path(index_dir)
+    if os.path.exists(path):
+        metadata = pq.read_schema(path).metadata or {}
+        stored = metadata.get(b"source_version", b"").decode()
+        if stored == source_version(catalog(data_dir), INDEX_VERSION):
+            return path
+    return build_index(data_dir, index_dir)
+
+
+def riders(data_dir="data", index_dir=INDEX_DIR):
+    """Every indexed rider with their canonical name and number of sessions."""
+    df = pd.read_parquet(ensure_index(data_dir, index_dir), columns=["Rider_Key"])
+    identities, _ = load_identities(data_dir)
+    counts = df["Rider_Key"].value_counts().rename("Sessions")
+    return (
+        identities[["Rider_Id", "Name"]]
+        .rename(columns={"Rider_Id": "Rider_Key"})
+        .join(counts, on="Rider_Key", how="inner")
+        .sort_values("Name")
+        .reset_index(drop=True)
+    )
+
+
+def rider_profile(key, data_dir="data", index_dir=INDEX_DIR):
+    """All of one rider's sessions in season order, read from the index."""
+    df = pd.read_parquet(
+        ensure_index(data_dir, index_dir), filters=[("Rider_Key", "==", key)]
+    )
+    return df.dropna(axis=1, how="all").sort_values("Round").reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the rider-keyed season index.")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--rider", help="Print one rider's profile (name, any case)")
+    args = parser.parse_args()
+
+    path = build_index(args.data_dir, args.index_dir)
+    metadata = pq.read_metadata(path)
+    print(f"{path}: {metadata.num_rows} rows in {metadata.num_row_groups} row groups")
+    if args.rider:
+        key = find_rider(args.rider, args.data_dir)
+        with pd.option_context("display.width", 250, "display.max_columns", None):
+            print(rider_profile(key, args.data_dir, args.index_dir).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
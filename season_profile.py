@@ -0,0 +1,55 @@
+# Filename: season_profile.py
+# Description: This file contains the show_season_profile function that displays one rider's season across every event and session (timed training best run, qualifying, semi-final, final). The data comes from the rider-keyed season index (season_index.py), so opening a profile reads one rider's rows instead of every CSV. It is imported in app.py.
+
+import streamlit as st
+
+from figures import season_rank_figure, sector_percentile_figure
+from season_index import rider_profile, riders
+from utils import seconds_to_human_readable
+
+
+def show_season_profile():
+    st.title("Downhill Mountain Bike World Cup Rider Season Profile")
+
+    rider_list = riders()
+    rider_list = rider_list[rider_list["Sessions"] > 1]
+    names = dict(zip(rider_list["Rider_Key"], rider_list["Name"]))
+    key = st.selectbox(
+        "Select a rider:",
+        list(names),
+        format_func=names.get,
+        key="season_profile_rider_select",
+    )
+    if key is None:
+        st.warning("No sessions found in data/.")
+        return
+    profile = rider_profile(key)
+
+    best = profile.loc[profile["Rank"].idxmin()]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Sessions", len(profile))
+    col2.metric("Best Rank", int(best["Rank"]), best["Session_Label"], delta_color="off")
+    col3.metric("Median Gap to Leader", seconds_to_human_readable(profile["Gap_Seconds"].median()))
+
+    st.plotly_chart(season_rank_figure(profile), use_container_width=True)
+    st.plotly_chart(sector_percentile_figure(profile), use_container_width=True)
+
+    table = profile[
+        ["Session_Label", "Number", "Rank", "Field_Size", "Time_Seconds", "Gap_Seconds"]
+        + [col for col in profile.columns if col.endswith("_Pct")]
+    ].copy()
+    table["Time_Seconds"] = table["Time_Seconds"].map(seconds_to_human_readable)
+    table["Gap_Seconds"] = table["Gap_Seconds"].map(lambda gap: f"+{gap:.3f}")
+    table.columns = [
+        col.replace("_Seconds", "").replace("_Pct", " %").replace("_", " ")
+        for col in table.columns
+    ]
+    st.write(
+        "Sector percentiles are the share of the session's field the rider beat in that sector "
+        "(100 = fastest). Timed training uses each rider's best run."
+    )
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+
+if __name__ == "__main__":
+    show_season_profile()
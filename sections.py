@@ -0,0 +1,173 @@
+# Filename: sections.py
+# Description: This file contains the page sections shared by timed_training.py and event_results.py that read a session's sidecars or season stores: the change log, the quarantine note, running positions, the head-to-head record and the time-to-rank sensitivity section.
+
+import os
+
+import pandas as pd
+import streamlit as st
+from catalog import parse_file_name
+from figures import bump_chart_figure, gain_ladder_figure
+from head_to_head import pair_record
+from outliers import clean_field
+from rank_sensitivity import (
+    gain_ladder,
+    rank_after_gain,
+    rider_index,
+    sector_table,
+    session_field,
+    target_table,
+)
+from result_diff import load_change_log
+from rider_identity import resolve
+from running_rank import load_positions, position_columns, positions_frame
+from session_validation import QUARANTINE_SUFFIX, load_validation_report, sidecar_path
+from table_view import load_csv, show_table
+
+
+def show_change_log(file_path):
+    """Flag a session that changed since an earlier version and list the changes.
+
+    Returns a mapping of rider key to the kinds of change recorded for it, or
+    an empty dict when no change log exists for `file_path`.
+    """
+    log = load_change_log(file_path)
+    if log is None or not log["changes"]:
+        return {}
+
+    summary = ", ".join(f"{count} {change}" for change, count in log["summary"].items())
+    st.warning(
+        f"These results changed since {os.path.basename(log['before'])}: {summary}."
+    )
+    changes = pd.DataFrame(log["changes"])
+    with st.expander("Change log", expanded=False):
+        st.dataframe(changes, hide_index=True)
+    return (
+        changes.groupby("rider")["change"]
+        .agg(lambda kinds: ", ".join(dict.fromkeys(kinds)))
+        .to_dict()
+    )
+
+
+def show_quarantine(file_path):
+    """Note rows that failed validation at extraction and list them."""
+    report = load_validation_report(file_path)
+    quarantine_path = sidecar_path(file_path, QUARANTINE_SUFFIX)
+    if report is None or not report["quarantined"] or not os.path.exists(quarantine_path):
+        return
+
+    checks = ", ".join(
+        f"{count} {check}" for check, count in report["checks"].items() if count
+    )
+    st.info(
+        f"{report['quarantined']} rows failed validation and are not included ({checks})."
+    )
+    with st.expander("Quarantined rows", expanded=False):
+        st.dataframe(load_csv(quarantine_path), hide_index=True)
+
+
+@st.cache_data(show_spinner=False)
+def load_session_positions(file_path, clean=False):
+    """Running positions of a session; `clean` recomputes them on the timed training clean field."""
+    if clean:
+        return positions_frame(clean_field(load_csv(file_path)))
+    return load_positions(file_path)
+
+
+def show_positions(file_path, key_prefix, clean=False):
+    """Bump chart of the top riders' positions at each timing point and places gained per sector."""
+    positions = load_session_positions(file_path, clean)
+    columns = position_columns(positions)
+    st.write("## Position Through the Track")
+    n = st.selectbox(
+        "Riders in the chart (by finishing position)",
+        [10, 20, 30],
+        key=f"{key_prefix}_bump_riders_select",
+    )
+    st.plotly_chart(
+        bump_chart_figure(positions.head(n), columns), use_container_width=True
+    )
+    with st.expander("Positions gained and lost per sector", expanded=False):
+        show_table(
+            positions.rename(columns=lambda col: col.replace("_", " ")),
+            key=f"{key_prefix}_positions_table",
+            source_key=f"{file_path}:{'clean' if clean else 'raw'}:positions",
+            search_column="Name",
+        )
+
+
+def show_head_to_head(file_path, rider_name, other_name):
+    """Season-by-season record of two riders of a session against each other."""
+    event = parse_file_name(os.path.basename(file_path))["event"]
+    rider_key, other_key = resolve([rider_name, other_name], event)
+    if rider_key == other_key:
+        return
+    record = pair_record(rider_key, other_key)
+    st.write(f"#### Head to Head: {rider_name} vs {other_name}")
+    if record.empty:
+        st.info("These riders have not been in the same session.")
+        return
+    st.caption(
+        "Every session both riders were in. A negative median gap means "
+        f"{rider_name} was faster; sectors count each timed sector of those sessions."
+    )
+    st.dataframe(
+        record.rename(columns=lambda col: col.replace("_", " ")), hide_index=True
+    )
+
+
+@st.cache_data(show_spinner=False)
+def load_field(file_path, clean=False):
+    """Sorted finishers of a session, computed once per file and mode."""
+    df = load_csv(file_path)
+    return session_field(clean_field(df) if clean else df)
+
+
+def show_rank_sensitivity(file_path, rider_name, n, key_prefix, clean=False):
+    """How much time `rider_name` would have to find to move up the order."""
+    st.write("## What Time Buys Positions")
+    field = load_field(file_path, clean)
+    rider = rider_index(field, rider_name)
+    if rider is None:
+        st.info(f"{rider_name} has no final time in this session.")
+        return
+    current_rank = rider + 1
+    st.write(f"{rider_name} finished P{current_rank} in {field['finals'][rider] / 1000:.3f}s")
+
+    gain = st.number_input(
+        "Time found (seconds)",
+        min_value=0.0,
+        value=0.5,
+        step=0.1,
+        format="%.3f",
+        key=f"{key_prefix}_sensitivity_gain_input",
+    )
+    new_rank = int(rank_after_gain(field, rider, [gain * 1000])[0])
+    st.metric(
+        "Position with that time",
+        f"P{new_rank}",
+        delta=f"{current_rank - new_rank} places",
+    )
+    st.plotly_chart(
+        gain_ladder_figure(gain_ladder(field, rider), current_rank),
+        use_container_width=True,
+        # Two pages can draw the same ladder in one run
+        key=f"{key_prefix}_gain_ladder_chart",
+    )
+
+    st.write(f"Matching the top {n} average in each sector")
+    st.dataframe(
+        sector_table(field, rider, n).round(3).rename(columns=lambda col: col.replace("_", " ")),
+        hide_index=True,
+    )
+
+    if current_rank > 1:
+        st.write(
+            "Time needed to draw level with each position ahead, and the share of each "
+            "sector's time it would be (empty where no one in the field rode the sector that fast)"
+        )
+        show_table(
+            target_table(field, rider).round(3).rename(columns=lambda col: col.replace("_", " ")),
+            key=f"{key_prefix}_sensitivity_targets_table",
+            source_key=f"{file_path}:{'clean' if clean else 'raw'}:{rider_name}:targets",
+            search_column="Draw Level With",
+        )
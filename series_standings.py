@@ -0,0 +1,101 @@
+# Filename: series_standings.py
+# Description: This file contains the show_series_standings function that displays the series standings built from the points columns (standings.py): the table with each event's points, the standings after each event and what a rider needs from the remaining events. It is imported in app.py.
+
+import streamlit as st
+
+from figures import standings_history_figure
+from standings import (
+    UNDATED_SEASON,
+    projection,
+    score_matrix,
+    season_events,
+    standings_history,
+    standings_table,
+    update_standings,
+)
+
+
+def show_series_standings():
+    st.title("Downhill Mountain Bike World Cup Series Standings")
+
+    state, changed = update_standings()
+    if changed:
+        st.caption(f"Standings updated from {len(changed)} new or changed sessions.")
+    # Newest season first, files without a year last
+    seasons = sorted(state["scores"], key=lambda season: (season == UNDATED_SEASON, -int(season) if season.isdigit() else 0))
+    if not seasons:
+        st.warning("No race sessions with points found in data/.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        season = st.selectbox(
+            "Select a season:",
+            seasons,
+            format_func=lambda season: "Files without a year" if season == UNDATED_SEASON else season,
+            key="series_standings_season_select",
+        )
+    events = season_events(state, season)
+    with col2:
+        drop_worst = st.number_input(
+            "Worst event results dropped",
+            min_value=0,
+            max_value=max(len(events) - 1, 0),
+            value=0,
+            key="series_standings_drop_worst_input",
+        )
+
+    table = standings_table(state, season, drop_worst)
+    st.write(
+        "Points are qualifying, semi-final and final points added up per event. Riders level on "
+        "points are split by the better score at the latest event, then the one before. "
+        "Events are in race order."
+    )
+    st.dataframe(table.drop(columns="Rider_Id"), use_container_width=True, hide_index=True)
+
+    n = st.selectbox(
+        "Riders to chart", [5, 10, 20], key="series_standings_num_riders_select"
+    )
+    points_history, _ = standings_history(state, season, drop_worst)
+    st.plotly_chart(
+        standings_history_figure(points_history[table["Rider_Id"].head(n)], state["names"]),
+        use_container_width=True,
+    )
+
+    st.subheader("What do they need?")
+    names = dict(zip(table["Rider_Id"], table["Name"]))
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        rider_id = st.selectbox(
+            "Rider",
+            list(names),
+            index=min(1, len(names) - 1),
+            format_func=names.get,
+            key="series_standings_rider_select",
+        )
+    with col2:
+        remaining = st.number_input(
+            "Events remaining", min_value=0, value=2, key="series_standings_remaining_input"
+        )
+    with col3:
+        best_event = float(score_matrix(state, season, events).to_numpy().max(initial=0))
+        max_points = st.number_input(
+            "Most points one rider can score at an event",
+            min_value=0.0,
+            value=best_event,
+            key="series_standings_max_points_input",
+        )
+    needs = projection(table, rider_id, remaining, max_points)
+    if needs.empty:
+        st.success(f"{names[rider_id]} leads the standings.")
+    else:
+        st.write(
+            f"{names[rider_id]} can score at most {remaining * max_points:.0f} more points. "
+            "A rider ahead is reachable if they score nothing more; the margin is how many "
+            "points per event the rider has to outscore them by."
+        )
+        st.dataframe(needs, use_container_width=True, hide_index=True)
+
+
+if __name__ == "__main__":
+    show_series_standings()
@@ -0,0 +1,70 @@
+# Filename: session_replay.py
+# Description: This file contains the show_session_replay function that replays a race session rider by rider (live_timing.py). For the selected point in the session it shows the latest rider's virtual rank and green/red gap at every split and the provisional leaderboard. It is imported in app.py.
+
+import streamlit as st
+
+from catalog import session_options
+from live_timing import START_ORDERS, session_replay
+from table_view import load_csv
+
+
+def gap_color(gap):
+    if gap is None or gap != gap:
+        return ""
+    return "color: green" if gap <= 0 else "color: red"
+
+
+def show_session_replay():
+    st.title("Downhill Mountain Bike World Cup Live Timing Replay")
+
+    file_mapping = session_options(timed_training=False)
+    col1, col2 = st.columns(2)
+    with col1:
+        file_choice = st.selectbox(
+            "Select event results:", list(file_mapping), key="session_replay_select"
+        )
+    with col2:
+        rule = st.selectbox("Start order", START_ORDERS, key="session_replay_order_select")
+    file_path = file_mapping[file_choice]
+    df = load_csv(file_path)
+
+    # Keep the replay between reruns so its ranks are computed once per file and order
+    replay_key = ("session_replay", file_path, rule)
+    if st.session_state.get("session_replay_key") != replay_key:
+        st.session_state.session_replay_key = replay_key
+        st.session_state.session_replay = session_replay(df, rule)
+    replay = st.session_state.session_replay
+
+    position = st.slider(
+        "Riders down", 1, len(replay.order), 1, key="session_replay_position_slider"
+    )
+    replay.seek(position)
+
+    rider, crossings = replay.rider_pass()
+    finish = crossings.iloc[-1]
+    st.subheader(f"{position}. {replay.names[rider]}")
+    if finish["Time"] != finish["Time"]:
+        st.write("Did not reach the finish.")
+    else:
+        st.write(
+            f"Crosses the line in P{int(finish['Virtual_Rank'])}, "
+            f"{finish['Gap_to_Leader']:+.3f}s to the leader."
+        )
+    st.dataframe(
+        crossings.style.map(gap_color, subset=["Gap_to_Leader"]).format(
+            {"Time": "{:.3f}", "Gap_to_Leader": "{:+.3f}", "Virtual_Rank": "{:.0f}"},
+            na_rep="-",
+        ),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    st.write("Provisional results")
+    st.dataframe(replay.leaderboard(10), use_container_width=True, hide_index=True)
+    stopped = replay.did_not_finish()
+    if stopped:
+        st.caption(f"Did not finish so far: {', '.join(stopped)}")
+
+
+if __name__ == "__main__":
+    show_session_replay()
@@ -0,0 +1,254 @@
+# Filename: session_validation.py
+# Description: This file contains the integrity checks run on an extracted session before it is written: increasing splits, sectors adding up to the final time, gaps matching the leader's time, ranks ordered like the times and speed trap readings in range. Every check runs column-wise over the whole session, and rows that fail are moved to a quarantine sidecar next to the CSV instead of being dropped. An out-of-range speed reading is blanked rather than quarantining its run. Ranks and gaps are kept as parsed from the sheet.
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from columns import event_time_columns
+from result_diff import ms_matrix
+from running_rank import write_positions
+from tt_schema import split_count
+from utils import find_sessions, time_column_to_ms
+
+REPORT_SUFFIX = ".validation.json"
+QUARANTINE_SUFFIX = ".quarantine.csv"
+SPEED_RANGE_KMH = (20.0, 100.0)
+# Sector times are stored rounded, so sums may be off by a millisecond or two
+TOLERANCE_MS = 2.0
+
+CHECKS = [
+    "missing_time",
+    "non_increasing_splits",
+    "sector_sum",
+    "gap",
+    "rank_order",
+    "speed_range",
+]
+# Checks that move a row to quarantine. A speed reading out of range is only
+# blanked: the timed training parser can attach it to the wrong run
+QUARANTINE_CHECKS = [check for check in CHECKS if check != "speed_range"]
+
+
+def timing_layout(df):
+    """Columns each check reads, for an event results or timed training frame."""
+    if "rider_number" in df.columns:
+        split_columns, sector_columns = event_time_columns(df)
+        return {
+            "rider": "rider_number",
+            "name": "name",
+            "splits": split_columns + ["final_time"],
+            "sectors": sector_columns,
+            "ranks": [("rank", "final_time")]
+            + [(f"{col}_rank", col) for col in split_columns + sector_columns],
+            "speed": "speed_trap",
+            "gap": "gap",
+            # Race results only list finishers, timed training keeps unfinished runs
+            "require_complete": True,
+        }
+    count = split_count(df)
+    return {
+        "rider": "Number",
+        "name": "Name",
+        "splits": [f"Clean_Split_{i}_Time" for i in range(1, count + 1)],
+        "sectors": [f"Sector_{i}_Time" for i in range(1, count + 1)],
+        "ranks": [("Overall_Rank", "Final_Time_Seconds")]
+        + [(f"Split_{i}_Rank", f"Clean_Split_{i}_Time") for i in range(1, count + 1)]
+        + [(f"Sector_{i}_Rank", f"Sector_{i}_Time") for i in range(1, count + 1)],
+        "speed": "Speed",
+        "gap": None,
+        "require_complete": False,
+    }
+
+
+def rank_order_failures(times, ranks):
+    """Rows whose rank is out of order with their time.
+
+    Sorting by time, a slower row may not have a better rank and equal times
+    must share a rank. The later row of each out-of-order pair is flagged.
+    """
+    failed = np.zeros(len(times), dtype=bool)
+    present = ~np.isnan(times) & ~np.isnan(ranks)
+    rows = np.flatnonzero(present)
+    if len(rows) < 2:
+        return failed
+    order = rows[np.argsort(times[rows], kind="stable")]
+    time_step = np.diff(times[order])
+    rank_step = np.diff(ranks[order])
+    out_of_order = ((time_step > 0) & (rank_step < 0)) | (
+        (time_step == 0) & (rank_step != 0)
+    )
+    failed[order[1:][out_of_order]] = True
+    return failed
+
+
+def check_session(df):
+    """(rows x CHECKS) boolean frame, True where a row fails a check."""
+    layout = timing_layout(df)
+    results = pd.DataFrame(False, index=df.index, columns=CHECKS)
+    splits = ms_matrix(df, layout["splits"])
+    present = ~np.isnan(splits)
+
+    if layout["require_complete"]:
+        results["missing_time"] = ~present.all(axis=1)
+
+    # Compare each present split with the last present split before it
+    previous = pd.DataFrame(splits).ffill(axis=1).shift(1, axis=1).to_numpy()
+    results["non_increasing_splits"] = (present & (splits <= previous)).any(axis=1)
+
+    final = splits[:, -1]
+    sectors = ms_matrix(df, layout["sectors"])
+    complete = ~np.isnan(sectors).any(axis=1) & ~np.isnan(final)
+    results["sector_sum"] = complete & (
+        np.abs(np.nansum(sectors, axis=1) - final) > TOLERANCE_MS
+    )
+
+    if layout["gap"] in df.columns:
+        gap = time_column_to_ms(
+            df[layout["gap"]].astype(str).str.lstrip("+")
+        ).to_numpy(dtype=float)
+        leader = np.nanmin(final) if (~np.isnan(final)).any() else np.nan
+        results["gap"] = ~np.isnan(gap) & (
+            np.abs(final - leader - gap) > TOLERANCE_MS
+        )
+
+    rank_failures = np.zeros(len(df), dtype=bool)
+    for rank_column, time_column in layout["ranks"]:
+        if rank_column not in df.columns or time_column not in df.columns:
+            continue
+        ranks = pd.to_numeric(df[rank_column], errors="coerce").to_numpy(dtype=float)
+        times = time_column_to_ms(df[time_column]).to_numpy(dtype=float)
+        rank_failures |= rank_order_failures(times, ranks)
+    results["rank_order"] = rank_failures
+
+    speed = pd.to_numeric(df[layout["speed"]], errors="coerce")
+    low, high = SPEED_RANGE_KMH
+    results["speed_range"] = (speed.notna() & ~speed.between(low, high)).to_numpy()
+    return results
+
+
+def validate_session(df, rejected=None):
+    """Split a session into passing rows and quarantined rows, plus a report.
+
+    Out-of-range speed readings are blanked in the passing rows. Ranks and
+    gaps are left as parsed, so the official order is kept. `rejected`
+    holds rows the parser already set aside (the row classifier); they are
+    added to the quarantine under the "row_classifier" check.
+    """
+    results = check_session(df)
+    failed = results[QUARANTINE_CHECKS].any(axis=1)
+    layout = timing_layout(df)
+
+    quarantine = df[failed].copy()
+    names = np.array(QUARANTINE_CHECKS)
+    quarantine["failed_checks"] = [
+        ";".join(names[row]) for row in results.loc[failed, QUARANTINE_CHECKS].to_numpy()
+    ]
+    valid = df.copy()
+    valid.loc[results["speed_range"], layout["speed"]] = np.nan
+    valid = valid[~failed]
+    checks = {check: int(results[check].sum()) for check in QUARANTINE_CHECKS}
+    if rejected is not None and not rejected.empty:
+        quarantine = pd.concat(
+            [quarantine, rejected.assign(failed_checks="row_classifier")], ignore_index=True
+        )
+        checks["row_classifier"] = len(rejected)
+    report = {
+        "rows": len(valid) + len(quarantine),
+        "passed": len(valid),
+        "quarantined": len(quarantine),
+        "checks": checks,
+        "speeds_blanked": int((results["speed_range"] & ~failed).sum()),
+        "failures": [
+            {
+                "rider": str(row[layout["rider"]]),
+                "name": row[layout["name"]],
+                "failed_checks": row["failed_checks"].split(";"),
+            }
+            for _, row in quarantine.iterrows()
+        ],
+    }
+    return valid, quarantine, report
+
+
+def sidecar_path(csv_path, suffix):
+    return os.path.splitext(csv_path)[0] + suffix
+
+
+def write_outputs(csv_path, valid, quarantine, report):
+    """Write the passing rows to `csv_path` with their running-rank sidecar,
+    failures to the quarantine sidecar and the report next to it. A stale
+    quarantine file is removed."""
+    report["file"] = csv_path
+    valid.to_csv(csv_path, index=False)
+    write_positions(csv_path, valid)
+
+    quarantine_path = sidecar_path(csv_path, QUARANTINE_SUFFIX)
+    if quarantine.empty:
+        if os.path.exists(quarantine_path):
+            os.remove(quarantine_path)
+    else:
+        quarantine.to_csv(quarantine_path, index=False)
+        report["quarantine"] = quarantine_path
+
+    with open(sidecar_path(csv_path, REPORT_SUFFIX), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+
+def write_validated(df, csv_path, rejected=None):
+    """Validate a session and write it with its sidecars. Returns the report."""
+    return write_outputs(csv_path, *validate_session(df, rejected))
+
+
+def load_validation_report(csv_path):
+    """The validation report written for `csv_path`, or None if there is none."""
+    path = sidecar_path(csv_path, REPORT_SUFFIX)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def format_report(report):
+    checks = ", ".join(f"{name} {count}" for name, count in report["checks"].items() if count)
+    blanked = report.get("speeds_blanked", 0)
+    return (
+        f"{report['file']}: {report['passed']}/{report['rows']} rows pass"
+        + (f", quarantined {report['quarantined']} ({checks})" if report["quarantined"] else "")
+        + (f", blanked {blanked} speed readings" if blanked else "")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check extracted sessions and quarantine rows that fail."
+    )
+    parser.add_argument(
+        "paths", nargs="*", help="CSV files (default: every session CSV in --data-dir)"
+    )
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Move failing rows out of the CSVs into the quarantine sidecars",
+    )
+    args = parser.parse_args()
+
+    for path in args.paths or find_sessions(args.data_dir):
+        df = pd.read_csv(path)
+        if args.apply:
+            report = write_validated(df, path)
+        else:
+            report = validate_session(df)[2]
+            report["file"] = path
+        print(format_report(report))
+        for failure in report["failures"]:
+            print(f"  {failure['rider']:>4} {failure['name']}: {', '.join(failure['failed_checks'])}")
+
+
+if __name__ == "__main__":
+    main()
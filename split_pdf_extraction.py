@@ -1,8 +1,9 @@
-import fitz
 from typing import List, Dict, Union
 import pandas as pd
 from datetime import datetime, timedelta
 
+from page_cache import load_pages
+
 
 def extract_time_and_rank(data_string: str) -> (str, str):
     if "(" in data_string:
@@ -34,15 +35,12 @@ def calculate_sector_times(split_times: List[str]) -> List[str]:
 def extract_rider_info_all_pages(
     filename: str, table_start_line: int = 25
 ) -> List[Dict[str, Union[str, List[str]]]]:
-    doc = fitz.open(filename)
+    pages = load_pages(filename)
     riders_info = []
     print(f"Processing file: {filename}")
-    print(f"Total pages: {len(doc)}")
+    print(f"Total pages: {len(pages)}")
 
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        text = page.get_text("text")
-        lines = text.split("\n")
+    for page_num, lines in enumerate(pages):
         print(f"\nPage {page_num + 1}:")
         print(f"Total lines on page: {len(lines)}")
         print(f"Starting at line {table_start_line}")
@@ -1,10 +1,20 @@
-import fitz
-from typing import List, Dict, Union
+from typing import List
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
+import os
 import re
 import sys
 
+from page_cache import load_pages
+from row_classifier import is_rider_row
+from session_validation import format_report, write_validated
+from utils import time_column_to_ms
+
+# "I1 / I2" style intermediate labels in the table header
+INTERMEDIATE_LABEL = re.compile(r"\bI(\d+)\b")
+DEFAULT_SPLIT_COUNT = 4
+
 
 def extract_time_and_rank(data_string: str) -> (str, str):
     """Extract time and rank from a data string that may contain both."""
@@ -17,24 +27,6 @@ def extract_time_and_rank(data_string: str) -> (str, str):
     return data_string, "N/A"
 
 
-def calculate_sector_times(split_times: List[str]) -> List[str]:
-    """Calculate sector times from split times."""
-    sector_times = []
-    previous_time = "0:00.000"
-
-    for split_time in split_times:
-        try:
-            delta = datetime.strptime(split_time, "%M:%S.%f") - datetime.strptime(
-                previous_time, "%M:%S.%f"
-            )
-            sector_times.append(str(delta)[2:])  # Skip "0:" part in "0:XX.XXX" string
-            previous_time = split_time
-        except ValueError as e:
-            sector_times.append("N/A")
-
-    return sector_times
-
-
 def is_valid_time_format(time_str):
     """Check if a time string is in valid format."""
     try:
@@ -44,54 +36,57 @@ def is_valid_time_format(time_str):
         return False
 
 
-def is_invalid_entry(entry):
-    """Check if an entry contains invalid terms."""
-    invalid_terms = [
-        "DNF",
-        "DNS",
-        "DSQ",
-        "-",
-        "N/A",
-        "Average",
-        "YOB",
-        "In",
-        "Year",
-        "MACDERMID",
-        "GUIONNET",
-        "TRUMMER",
-        "RIESCO",
-        "SCHLEBES",
-        "DORVAL AM COMMENCAL",
-        "Time",
-        "Points",
-    ]
-    return any(term in str(entry) for term in invalid_terms)
+def detect_split_count(pages: List[List[str]]) -> int:
+    """Number of intermediate splits, read from the header of the first page."""
+    for lines in pages:
+        labels = set()
+        for line in lines:
+            if re.match(r"^\d+\.", line):
+                break  # first rider row, the header is over
+            labels.update(int(number) for number in INTERMEDIATE_LABEL.findall(line))
+        if labels:
+            return max(labels)
+    return DEFAULT_SPLIT_COUNT
 
 
-def extract_rider_info_all_pages_2025(
-    filename: str, table_start_line: int = 24
-) -> List[Dict[str, Union[str, List[str]]]]:
-    """Extract rider information from all pages with improved 2025 parsing."""
-    doc = fitz.open(filename)
-    riders_info = []
+def extract_rider_info_all_pages_2025(filename: str, table_start_line: int = 24):
+    """Extract rider information from all pages with improved 2025 parsing.
+
+    Returns the rider records and the records the row classifier rejected.
+    """
     print(f"Processing file: {filename}")
-    print(f"Total pages: {len(doc)}")
+    return parse_rider_pages_2025(load_pages(filename), table_start_line)
+
+
+def parse_rider_pages_2025(
+    pages: List[List[str]], table_start_line: int = 24, split_count: int = None
+):
+    """Parse rider records from the text lines of each page.
 
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        text = page.get_text("text")
-        lines = text.split("\n")
+    `split_count` is the number of intermediate splits; by default it is
+    detected from the table header. Each row holds the rider lines, speed,
+    the splits, the final time printed four times, then gap and points.
+    Returns (rider records, records rejected by the row classifier).
+    """
+    if split_count is None:
+        split_count = detect_split_count(pages)
+    riders_info = []
+    rejected_info = []
+    print(f"Total pages: {len(pages)}")
+    print(f"Intermediate splits: {split_count}")
+
+    for page_num, lines in enumerate(pages):
         print(f"\nPage {page_num + 1}:")
         print(f"Total lines on page: {len(lines)}")
         print(f"Starting at line {table_start_line}")
 
         line_start = table_start_line
-        riders_on_page = 0
+        candidates = []
 
         while line_start < len(lines):
             # Get a larger chunk to handle variable line counts
-            rider_info = lines[line_start : line_start + 25]
-            if len(rider_info) < 15:
+            rider_info = lines[line_start : line_start + 21 + split_count]
+            if len(rider_info) < 11 + split_count:
                 print(f"Breaking at line {line_start} - insufficient data")
                 break
 
@@ -108,13 +103,14 @@ def extract_rider_info_all_pages_2025(
             try:
                 if has_team:
                     # With team case
-                    if len(rider_info) < 20:
+                    final_line = 10 + split_count
+                    if len(rider_info) < final_line + 6:
                         line_start += 1
                         continue
 
                     speed_trap, speed_trap_rank = extract_time_and_rank(rider_info[9])
                     split_times, split_time_ranks = zip(
-                        *(extract_time_and_rank(s) for s in rider_info[10:14])
+                        *(extract_time_and_rank(s) for s in rider_info[10:final_line])
                     )
                     rider_data = {
                         "rank": rider_info[0].split()[0].replace(".", ""),
@@ -133,20 +129,21 @@ def extract_rider_info_all_pages_2025(
                         "speed_trap_rank": speed_trap_rank,
                         "split_times": list(split_times),
                         "split_time_ranks": list(split_time_ranks),
-                        "final_time": rider_info[14],
-                        "gap": rider_info[18] if len(rider_info) > 18 else "N/A",
-                        "points": rider_info[19] if len(rider_info) > 19 else "N/A",
+                        "final_time": rider_info[final_line],
+                        "gap": rider_info[final_line + 4],
+                        "points": rider_info[final_line + 5],
                     }
-                    next_offset = 20
+                    next_offset = final_line + 6
                 else:
                     # No team case
-                    if len(rider_info) < 19:
+                    final_line = 9 + split_count
+                    if len(rider_info) < final_line + 6:
                         line_start += 1
                         continue
 
                     speed_trap, speed_trap_rank = extract_time_and_rank(rider_info[8])
                     split_times, split_time_ranks = zip(
-                        *(extract_time_and_rank(s) for s in rider_info[9:13])
+                        *(extract_time_and_rank(s) for s in rider_info[9:final_line])
                     )
                     rider_data = {
                         "rank": rider_info[0].split()[0].replace(".", ""),
@@ -165,26 +162,13 @@ def extract_rider_info_all_pages_2025(
                         "speed_trap_rank": speed_trap_rank,
                         "split_times": list(split_times),
                         "split_time_ranks": list(split_time_ranks),
-                        "final_time": rider_info[13],
-                        "gap": rider_info[17] if len(rider_info) > 17 else "N/A",
-                        "points": rider_info[18] if len(rider_info) > 18 else "N/A",
+                        "final_time": rider_info[final_line],
+                        "gap": rider_info[final_line + 4],
+                        "points": rider_info[final_line + 5],
                     }
-                    next_offset = 19
-
-                # Skip invalid entries
-                if rider_data["final_time"] in [
-                    "DNF",
-                    "DNS",
-                    "DSQ",
-                ] or is_invalid_entry(rider_data["final_time"]):
-                    line_start += next_offset
-                    continue
-
-                # Calculate sector times
-                sector_times = calculate_sector_times(rider_data["split_times"])
-                rider_data["sector_times"] = sector_times
-                riders_info.append(rider_data)
-                riders_on_page += 1
+                    next_offset = final_line + 6
+
+                candidates.append(rider_data)
                 line_start += next_offset
 
             except (IndexError, ValueError) as e:
@@ -192,158 +176,133 @@ def extract_rider_info_all_pages_2025(
                 line_start += 1
                 continue
 
-        print(f"Found {riders_on_page} riders on page {page_num + 1}")
+        # DNF/DNS rows, header lines and misaligned chunks fail the field checks
+        if candidates:
+            keep = is_rider_row(candidates).to_numpy()
+            riders_info += [rider for rider, ok in zip(candidates, keep) if ok]
+            rejected_info += [rider for rider, ok in zip(candidates, keep) if not ok]
+            rejected = len(candidates) - int(keep.sum())
+        else:
+            rejected = 0
+        print(
+            f"Found {len(candidates) - rejected} riders on page {page_num + 1}"
+            + (f" ({rejected} non-rider rows set aside)" if rejected else "")
+        )
 
     print(f"\nTotal riders found: {len(riders_info)}")
-    return riders_info
-
-
-def validate_and_clean_data_2025(df):
-    """Validate and clean data with improved 2025 logic."""
-    valid_rows = []
-    for _, row in df.iterrows():
-        # Check if final time and split_4 are valid
-        if (
-            is_valid_time_format(row["final_time"])
-            and is_valid_time_format(row["split_4"])
-            and not is_invalid_entry(row["final_time"])
-            and not is_invalid_entry(row["split_4"])
-        ):
-            valid_rows.append(row)
-    return pd.DataFrame(valid_rows)
-
-
-def process_results_2025(filename: str, table_start_line: int):
-    """Process results with improved 2025 logic."""
-    print(f"=== Processing {filename} with 2025 logic ===")
+    return riders_info, rejected_info
 
-    # Generate DataFrame
-    riders_info = extract_rider_info_all_pages_2025(filename, table_start_line)
-    df = pd.DataFrame(riders_info)
 
-    if df.empty:
-        print("No valid rider data found!")
+def process_results_2025(filename: str, table_start_line: int, overwrite: bool = False):
+    """Process results with improved 2025 logic.
+
+    An existing CSV is left alone unless `overwrite` is set.
+    """
+    csv_path = results_csv_path(filename)
+    if os.path.exists(csv_path) and not overwrite:
+        print(f"{csv_path} exists, pass --overwrite to replace it")
+        return None
+
+    print(f"=== Processing {filename} with 2025 logic ===")
+
+    riders_info, rejected_info = extract_rider_info_all_pages_2025(filename, table_start_line)
+    df = build_results_2025(riders_info)
+    if df is None:
         return
 
-    # Create individual split columns
-    for i in range(4):
-        df[f"split_{i+1}"] = df["split_times"].apply(
-            lambda x: x[i] if len(x) > i else "N/A"
-        )
-        df[f"split_{i+1}_rank"] = df["split_time_ranks"].apply(
-            lambda x: x[i] if len(x) > i else "N/A"
-        )
-        df[f"sector_{i+1}"] = df["sector_times"].apply(
-            lambda x: x[i] if len(x) > i else "N/A"
-        )
+    report = write_validated(df, csv_path, build_rejected_2025(rejected_info))
 
-    # Debugging: Print problematic sector times
-    print("Sector times with issues:")
-    print(
-        df[
-            ["sector_1", "sector_2", "sector_3", "sector_4", "final_time", "split_4"]
-        ].head(20)
-    )
+    print(f"Processed {filename} and saved to {csv_path}")
+    print(format_report(report))
 
-    # Additional Debugging for final sector times
-    for i, row in df.iterrows():
-        final_time = row["final_time"]
-        split_4 = row["split_4"]
-        if not is_valid_time_format(final_time) or is_invalid_entry(final_time):
-            print(f"Invalid final time format at index {i}: {final_time}")
-        if not is_valid_time_format(split_4) or is_invalid_entry(split_4):
-            print(f"Invalid split_4 time format at index {i}: {split_4}")
-
-    # Validate and clean the data
-    df = validate_and_clean_data_2025(df)
-
-    # Drop rows with invalid final_time or split_4 before ranking
-    df = df[
-        df.apply(
-            lambda row: is_valid_time_format(row["final_time"])
-            and is_valid_time_format(row["split_4"]),
-            axis=1,
-        )
-    ]
+    return df
 
-    # Further remove rows with any invalid sector times
-    for i in range(4):
-        df = df[
-            df.apply(lambda row: is_valid_time_format(row[f"sector_{i+1}"]), axis=1)
-        ]
 
-    # Rank the sector times correctly
-    for i in range(4):
-        df[f"sector_{i+1}_rank"] = (
-            df[f"sector_{i+1}"]
-            .apply(
-                lambda x: (
-                    timedelta(
-                        minutes=int(x.split(":")[0]), seconds=float(x.split(":")[1])
-                    )
-                    if is_valid_time_format(x)
-                    else timedelta.max
-                )
-            )
-            .rank(method="min")
-            .astype(int)
-        )
+def results_csv_path(filename: str) -> str:
+    """CSV written next to the other results in data/ for a source PDF."""
+    file_prefix = filename.split("/")[-1].split(".")[0]
+    return f"data/{file_prefix}.csv"
 
-    # Handle the final sector (sector_5)
-    def calculate_final_sector(row):
-        try:
-            final_time = datetime.strptime(row["final_time"], "%M:%S.%f")
-            split_4 = datetime.strptime(row["split_4"], "%M:%S.%f")
-            return str(final_time - split_4)[2:]
-        except Exception as e:
-            return "N/A"
-
-    df[f"sector_5"] = df.apply(calculate_final_sector, axis=1)
-
-    df[f"sector_5_rank"] = (
-        df[f"sector_5"]
-        .apply(
-            lambda x: (
-                timedelta(minutes=int(x.split(":")[0]), seconds=float(x.split(":")[1]))
-                if is_valid_time_format(x)
-                else timedelta.max
-            )
-        )
-        .rank(method="min")
-        .astype(int)
-    )
 
-    # Ensure there are no infinity values in the ranking columns
-    for i in range(1, 6):
-        sector_col = f"sector_{i}_rank"
-        if sector_col in df.columns:
-            df[sector_col] = df[sector_col].replace([float("inf"), -float("inf")], 0)
+def format_sector(milliseconds: float) -> str:
+    """Sector time as "MM:SS.ffffff", the format of the existing results CSVs."""
+    minutes, remainder = divmod(int(milliseconds), 60000)
+    return f"{minutes:02d}:{remainder / 1000:09.6f}"
+
+
+def build_results_2025(riders_info):
+    """Turn parsed rider records into the ranked results DataFrame.
+
+    Sectors are the differences between consecutive timing points of an
+    (riders x splits + finish) millisecond matrix, so any split count works.
+    """
+    df = pd.DataFrame(riders_info)
 
-    # Drop columns only if they exist
-    columns_to_drop = ["split_times", "split_time_ranks", "sector_times"]
-    df.drop(columns=[col for col in columns_to_drop if col in df.columns], inplace=True)
+    if df.empty:
+        print("No valid rider data found!")
+        return
+
+    split_count = df["split_times"].map(len).max()
+    for i in range(split_count):
+        df[f"split_{i+1}"] = df["split_times"].str[i].fillna("N/A")
+        df[f"split_{i+1}_rank"] = df["split_time_ranks"].str[i].fillna("N/A")
+
+    timing_columns = [f"split_{i+1}" for i in range(split_count)] + ["final_time"]
+    milliseconds = np.column_stack(
+        [time_column_to_ms(df[col]).to_numpy(dtype=float) for col in timing_columns]
+    )
+    sectors = np.diff(milliseconds, axis=1, prepend=0.0)
+
+    # Riders without a valid time at every split are kept unranked; the
+    # validation step moves them to the quarantine file
+    valid = ~np.isnan(sectors).any(axis=1) & (sectors > 0).all(axis=1)
+    sector_columns = [f"sector_{i+1}" for i in range(split_count + 1)]
+    for i, col in enumerate(sector_columns):
+        df[col] = [
+            format_sector(value) if ok else "N/A"
+            for value, ok in zip(sectors[:, i], valid)
+        ]
+    for i, col in enumerate(sector_columns):
+        ranks = pd.Series(np.where(valid, sectors[:, i], np.nan)).rank(method="min")
+        df[f"{col}_rank"] = ranks.astype("Int64").array
+
+    # Keep the column order of the existing results files
+    columns = [
+        col
+        for col in df.columns
+        if col not in ["split_times", "split_time_ranks"]
+        and not col.startswith(("split_", "sector_"))
+    ]
+    for i in range(split_count):
+        columns += [f"split_{i+1}", f"split_{i+1}_rank", f"sector_{i+1}"]
+    columns += [f"{col}_rank" for col in sector_columns[:-1]]
+    columns += [sector_columns[-1], f"{sector_columns[-1]}_rank"]
+    df = df[columns]
 
     # Sort by rank to ensure correct order
     df["rank"] = pd.to_numeric(df["rank"], errors="coerce")
     df = df.sort_values("rank").reset_index(drop=True)
+    return df
 
-    # Generate output filename
-    file_prefix = filename.split("/")[-1].split(".")[0]
-    csv_path = f"data/{file_prefix}.csv"
-    df.to_csv(csv_path, index=False)
 
-    print(f"Processed {filename} and saved to {csv_path}")
-    print(f"Total valid riders: {len(df)}")
+def build_rejected_2025(rejected_info):
+    """Records the row classifier rejected, in the results layout, or None if there are none.
 
-    return df
+    They are written to the quarantine file rather than dropped, so a DNF
+    row or a chunk read out of step with the table can still be looked at.
+    """
+    if not rejected_info:
+        return None
+    return build_results_2025(rejected_info)
 
 
 # Process 2025 files
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
+    overwrite = "--overwrite" in sys.argv
+    paths = [arg for arg in sys.argv[1:] if arg != "--overwrite"]
+    if paths:
         # Use the filename provided as command line argument
-        filename = sys.argv[1]
-        process_results_2025(filename, 24)
+        process_results_2025(paths[0], 24, overwrite)
     else:
         # Default to the 2025 Q1 file if no argument provided
-        process_results_2025("data/leog_2025_dhi_me_results_q1.pdf", 24)
+        process_results_2025("data/leog_2025_dhi_me_results_q1.pdf", 24, overwrite)
@@ -0,0 +1,227 @@
+# Filename: standings.py
+# Description: This file contains the series standings engine. Each race session's `points` column is added to a per-rider, per-event score table for its season. The table is kept in data/.season/standings.json together with every applied session's contribution. When a session is added, re-extracted or removed, only that session's points are applied or taken back, so an update costs time in proportion to the session rather than the season. Totals, ties, dropped results and standings over time are derived from the score table.
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from catalog import SEASON_DIR, catalog
+from rider_identity import display_name, resolve
+
+STANDINGS_FILE = "standings.json"
+# Bump when the stored layout changes so the standings are rebuilt from scratch
+STATE_VERSION = 2
+# Worst event results left out of each rider's total (0 counts every event)
+DROP_WORST = 0
+UNDATED_SEASON = "undated"
+
+
+def season_of(year):
+    return UNDATED_SEASON if pd.isna(year) else str(int(year))
+
+
+def file_digest(path):
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def session_points(path, event, data_dir="data", store_dir=SEASON_DIR):
+    """Points and display name of every rider who scored in a race session.
+
+    Riders are keyed by the Rider_Id rider_identity.resolve gives the names
+    printed at `event`, the same key the season index and profiles use.
+    """
+    df = pd.read_csv(path)
+    points = pd.to_numeric(df["points"], errors="coerce")
+    rider = resolve(df["name"], event, data_dir, store_dir)
+    scored = pd.DataFrame(
+        {"rider": rider, "name": display_name(df["name"]), "points": points}
+    )
+    scored = scored[scored["points"] > 0]
+    return {
+        "points": scored.groupby("rider")["points"].sum().to_dict(),
+        "names": dict(zip(scored["rider"], scored["name"])),
+    }
+
+
+def empty_state():
+    return {"version": STATE_VERSION, "sessions": {}, "scores": {}, "names": {}}
+
+
+def state_path(store_dir=SEASON_DIR):
+    return os.path.join(store_dir, STANDINGS_FILE)
+
+
+def load_state(store_dir=SEASON_DIR):
+    path = state_path(store_dir)
+    if not os.path.exists(path):
+        return empty_state()
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    return state if state.get("version") == STATE_VERSION else empty_state()
+
+
+def save_state(state, store_dir=SEASON_DIR):
+    os.makedirs(store_dir, exist_ok=True)
+    path = state_path(store_dir)
+    # Write then rename so a reader never opens a half-written file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temp_path, path)
+
+
+def apply_session(state, record, sign):
+    """Add (sign=1) or take back (sign=-1) one session's points."""
+    season = state["scores"].setdefault(record["season"], {})
+    for rider, points in record["points"].items():
+        events = season.setdefault(rider, {})
+        events[record["event"]] = round(events.get(record["event"], 0) + sign * points, 3)
+        if events[record["event"]] == 0:
+            del events[record["event"]]
+        if not events:
+            del season[rider]
+    if sign > 0:
+        state["names"].update(record["names"])
+
+
+def update_standings(data_dir="data", store_dir=SEASON_DIR):
+    """Bring the stored standings up to date with data/ and return (state, changed paths).
+
+    Sessions are compared by modification time and size. Only new, changed
+    or removed files are read.
+    """
+    state = load_state(store_dir)
+    races = catalog(data_dir)
+    races = races[races["session"] != "tt"]
+    current = dict(zip(races["path"], races.to_dict("records")))
+
+    changed = []
+    for path, record in list(state["sessions"].items()):
+        if path not in current or file_digest(path) != record["digest"]:
+            apply_session(state, record, -1)
+            del state["sessions"][path]
+            changed.append(path)
+    for path, entry in current.items():
+        if path in state["sessions"]:
+            continue
+        record = {
+            "digest": file_digest(path),
+            "season": season_of(entry["year"]),
+            "event": entry["event"],
+            **session_points(path, entry["event"], data_dir, store_dir),
+        }
+        apply_session(state, record, 1)
+        state["sessions"][path] = record
+        changed.append(path)
+
+    if changed:
+        save_state(state, store_dir)
+    return state, list(dict.fromkeys(changed))
+
+
+def season_events(state, season, data_dir="data"):
+    """Events of a season in race order (the catalog's EVENT_CALENDAR)."""
+    events = {
+        record["event"]
+        for record in state["sessions"].values()
+        if record["season"] == season
+    }
+    return [event for event in dict.fromkeys(catalog(data_dir)["event"]) if event in events]
+
+
+def score_matrix(state, season, events):
+    """(riders x events) points, zero where a rider did not score."""
+    scores = state["scores"].get(season, {})
+    matrix = pd.DataFrame.from_dict(scores, orient="index", dtype=float)
+    return matrix.reindex(columns=events).fillna(0.0)
+
+
+def counted_points(matrix, drop_worst=DROP_WORST):
+    """Total per rider after leaving out the `drop_worst` lowest event scores."""
+    values = np.sort(matrix.to_numpy(), axis=1)
+    drop = min(drop_worst, values.shape[1] - 1) if values.shape[1] else 0
+    return pd.Series(values[:, drop:].sum(axis=1), index=matrix.index)
+
+
+def rank_standings(matrix, points):
+    """Ranks by points; ties go to the better score at the latest event, then the one before.
+
+    Riders still level after every event share a rank.
+    """
+    order = pd.concat([points.rename("Points"), matrix.iloc[:, ::-1]], axis=1)
+    order = order.sort_values(list(order.columns), ascending=False)
+    level = order.duplicated(keep="first")
+    rank = pd.Series(np.arange(1, len(order) + 1), index=order.index)
+    return rank.where(~level).ffill().astype(int).reindex(order.index)
+
+
+def standings_table(state, season, drop_worst=DROP_WORST, data_dir="data"):
+    """Current standings of a season with each event's points."""
+    events = season_events(state, season, data_dir)
+    matrix = score_matrix(state, season, events)
+    points = counted_points(matrix, drop_worst)
+    rank = rank_standings(matrix, points)
+    table = matrix.loc[rank.index].copy()
+    table.insert(0, "Rank", rank)
+    table.insert(1, "Name", table.index.map(state["names"]))
+    table.insert(2, "Points", points.loc[rank.index])
+    table.insert(3, "Gap", table["Points"].iloc[0] - table["Points"] if len(table) else [])
+    return table.rename_axis("Rider_Id").reset_index()
+
+
+def standings_history(state, season, drop_worst=DROP_WORST, data_dir="data"):
+    """Points and rank of every rider after each event, as (events x riders) frames."""
+    events = season_events(state, season, data_dir)
+    matrix = score_matrix(state, season, events)
+    points, ranks = {}, {}
+    for i, event in enumerate(events, 1):
+        after = matrix.iloc[:, :i]
+        points[event] = counted_points(after, drop_worst)
+        ranks[event] = rank_standings(after, points[event])
+    return pd.DataFrame(points).T, pd.DataFrame(ranks).T
+
+
+def projection(table, rider_id, remaining_events, max_event_points):
+    """What a rider needs from the remaining events to catch each rider ahead."""
+    rider = table.set_index("Rider_Id").loc[rider_id]
+    ahead = table[table["Points"] > rider["Points"]]
+    available = remaining_events * max_event_points
+    needed = ahead["Points"] - rider["Points"]
+    return pd.DataFrame(
+        {
+            "Rank": ahead["Rank"],
+            "Name": ahead["Name"],
+            "Points_Behind": needed,
+            # Still reachable if the rider ahead scores nothing from here on
+            "Reachable": needed < available,
+            "Per_Event_Margin": (needed / remaining_events).round(1)
+            if remaining_events
+            else np.inf,
+        }
+    ).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Update the series standings from the points columns in data/."
+    )
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--season", help="Season to print (a year, or 'undated')")
+    parser.add_argument("--drop-worst", type=int, default=DROP_WORST)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    state, changed = update_standings(args.data_dir)
+    print(f"{len(changed)} sessions applied or taken back")
+    for season in [args.season] if args.season else sorted(state["scores"]):
+        table = standings_table(state, season, args.drop_worst, args.data_dir)
+        print(f"---- {season} ----")
+        print(table.drop(columns="Rider_Id").head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
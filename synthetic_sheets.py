@@ -0,0 +1,519 @@
+# Filename: synthetic_sheets.py
+# Description: This file contains a generator for synthetic ChronoRace-style timing sheets, used to exercise the extractors and the apps on fields far larger than the real corpus. It writes a qualifying or timed training PDF with PyMuPDF and a ground-truth CSV next to it. The text lines come out in the same order as the real sheets (bold cells printed four times, team on its own line, DNF/DNS rows without a rank). Rider count, runs, splits, team mix and DNF/DNS rates are all configurable.
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import fitz
+import numpy as np
+import pandas as pd
+
+from page_cache import load_pages
+from run_fingerprint import format_gap, format_milliseconds
+from split_pdf_extraction_2025 import build_results_2025, parse_rider_pages_2025
+from tt_schema import timed_training_frame
+from tt_split_pdf_extraction import build_timed_training_frame, parse_timed_training_data_final
+
+TRUTH_SUFFIX = ".truth.csv"
+
+SURNAMES = [
+    "BRUNI", "GOLDSTONE", "BROSNAN", "WILLIAMS", "PIERRON", "KOLB", "ILES",
+    "KERR", "HART", "MINNAAR", "SHAW", "DAVIS", "GALE", "FERGUSON", "MEIER-SMITH",
+    "VERGIER", "HOFFMAN", "BRANDL", "FEARON", "GWIN", "HATTON", "PETERSON",
+]
+FIRST_NAMES = [
+    "Loic", "Jackson", "Troy", "Jordan", "Amaury", "Andreas", "Finn", "Bernard",
+    "Danny", "Greg", "Luca", "Oliver", "Sam", "Angus", "Luke", "Loris", "Max",
+]
+COUNTRIES = ["AUS", "AUT", "CAN", "FRA", "GBR", "GER", "ITA", "NZL", "RSA", "SUI", "USA"]
+TEAMS = [
+    "SANTA CRUZ SYNDICATE",
+    "CANYON CLLCTV FACTORY TEAM",
+    "SPECIALIZED GRAVITY",
+    "TREK FACTORY RACING DH",
+    "GIANT FACTORY OFF-ROAD TEAM - DH",
+    "COMMENCAL SCHWALBE BY LES ORRES",
+]
+QUALIFYING_POINTS = [50, 40, 30, 25, 22, 20, 18, 16, 14, 12, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+
+FONT_SIZE = 6
+LINE_HEIGHT = 7
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+TABLE_TOP = 150
+# Cells closer than a few points on one baseline are extracted as one line
+NAME_X = 45
+RUN_WIDTH = 80
+
+
+def generate_field(rng, riders, team_rate):
+    """One row per rider with the fields printed in the rider columns."""
+    names = []
+    seen = set()
+    for surname, first, u23 in zip(
+        rng.choice(SURNAMES, riders),
+        rng.choice(FIRST_NAMES, riders),
+        rng.random(riders) < 0.4,
+    ):
+        # Suffix repeated names so every printed name is unique, as on real sheets
+        name = f"{surname} {first}"
+        suffix = 2
+        while name in seen:
+            name = f"{surname}-{suffix} {first}"
+            suffix += 1
+        seen.add(name)
+        names.append(f"{name} *" if u23 else name)
+    return pd.DataFrame(
+        {
+            "rider_number": rng.permutation(riders) + 1,
+            "name": names,
+            "team": np.where(
+                rng.random(riders) < team_rate, rng.choice(TEAMS, riders), "N/A"
+            ),
+            "uci_id": (10000000000 + rng.choice(10**9, riders, replace=False)).astype(str),
+            "country": rng.choice(COUNTRIES, riders),
+            "birth_year": rng.integers(1985, 2007, riders).astype(str),
+            # Relative pace; 1.0 is the fastest rider's ability
+            "pace": 1 + np.abs(rng.normal(0, 0.04, riders)),
+        }
+    )
+
+
+def sector_milliseconds(rng, field, sector_count, runs=1):
+    """(riders x runs x sectors) sector times in milliseconds."""
+    baseline = rng.uniform(30000, 60000, sector_count)
+    noise = 1 + rng.normal(0, 0.01, (len(field), runs, sector_count))
+    return np.round(baseline * field["pace"].to_numpy()[:, None, None] * noise)
+
+
+def rank_min(values, ascending=True):
+    return pd.Series(values).rank(method="min", ascending=ascending)
+
+
+def qualifying_records(rng, field, split_count, dnf_rate, dns_rate):
+    """Parsed-record dicts in sheet order: finishers by time, then DNF, then DNS."""
+    riders = len(field)
+    sectors = sector_milliseconds(rng, field, split_count + 1)[:, 0, :]
+    splits = np.cumsum(sectors, axis=1)
+    status = np.where(
+        rng.random(riders) < dns_rate,
+        "DNS",
+        np.where(rng.random(riders) < dnf_rate, "DNF", ""),
+    )
+    # A DNF rider crosses a random number of timing points before stopping
+    reached = np.where(
+        status == "DNF",
+        rng.integers(0, split_count + 1, riders),
+        np.where(status == "DNS", 0, split_count + 1),
+    )
+    splits[np.arange(split_count + 1)[None, :] >= reached[:, None]] = np.nan
+    speed = np.round(rng.uniform(50, 65, riders), 3)
+    speed[status == "DNS"] = np.nan
+
+    speed_rank = rank_min(speed, ascending=False)
+    split_ranks = np.column_stack([rank_min(splits[:, i]) for i in range(split_count)])
+    final = splits[:, -1]
+    order = np.lexsort((final, status == "DNS", status == "DNF"))
+    leader = np.nanmin(final)
+
+    records = []
+    for position, row in enumerate(order):
+        rider = field.iloc[row]
+        finished = status[row] == ""
+        records.append(
+            {
+                "rank": str(position + 1) if finished else "",
+                "protected": "",
+                "rider_number": str(rider["rider_number"]),
+                "name": rider["name"],
+                "team": rider["team"],
+                "uci_id": rider["uci_id"],
+                "country": rider["country"],
+                "birth_year": rider["birth_year"],
+                "speed_trap": f"{speed[row]:.3f}" if not np.isnan(speed[row]) else "",
+                "speed_trap_rank": (
+                    str(int(speed_rank[row])) if not np.isnan(speed[row]) else ""
+                ),
+                "split_times": [
+                    format_milliseconds(int(value)) if not np.isnan(value) else "-"
+                    for value in splits[row, :split_count]
+                ],
+                "split_time_ranks": [
+                    str(int(rank)) if not np.isnan(rank) else "N/A"
+                    for rank in split_ranks[row]
+                ],
+                "final_time": (
+                    format_milliseconds(int(final[row])) if finished else status[row]
+                ),
+                "gap": format_gap(final[row] - leader) if finished else "",
+                "points": (
+                    str(QUALIFYING_POINTS[position])
+                    if finished and position < len(QUALIFYING_POINTS)
+                    else "-"
+                ),
+            }
+        )
+    return records
+
+
+def timed_training_runs(rng, field, split_count, runs, dnf_rate, stop_rate):
+    """(riders x runs x timing points) split matrix in milliseconds and run speeds.
+
+    Riders do between half of `runs` and all of them. Timed training runs are
+    often interrupted, so `stop_rate` of the runs lose 5 s to 10 min in one
+    sector; `dnf_rate` of them end before the finish. NaN marks a timing point
+    that was not reached or a run that was not done.
+    """
+    riders = len(field)
+    sectors = sector_milliseconds(rng, field, split_count, runs)
+    stops = rng.random((riders, runs)) < stop_rate
+    stop_sector = rng.integers(0, split_count, (riders, runs))
+    rider_index, run_index = np.nonzero(stops)
+    sectors[rider_index, run_index, stop_sector[stops]] += np.round(
+        rng.uniform(5000, 600000, len(rider_index))
+    )
+    splits = np.cumsum(sectors, axis=2)
+
+    reached = np.where(
+        rng.random((riders, runs)) < dnf_rate,
+        rng.integers(1, split_count, (riders, runs)),
+        split_count,
+    )
+    done = np.arange(runs)[None, :] < rng.integers(max(1, runs // 2), runs + 1, riders)[:, None]
+    reached = np.where(done, reached, 0)
+    splits[np.arange(split_count)[None, None, :] >= reached[:, :, None]] = np.nan
+    speed = np.round(rng.uniform(50, 65, (riders, runs)), 3)
+    speed[reached < split_count] = np.nan
+    return splits, speed
+
+
+class SheetWriter:
+    """Writes text cells page by page; each cell becomes one extracted text line."""
+
+    def __init__(self, path, title, category, column_labels, page_count, width=PAGE_WIDTH):
+        self.path = path
+        self.title = title
+        self.category = category
+        self.column_labels = column_labels
+        self.page_count = page_count
+        self.width = width
+        self.doc = fitz.open()
+        self.font = fitz.Font("helv")
+        self.page = None
+        self.writer = None
+
+    def new_page(self):
+        """Write the current page and start the next one with its header."""
+        self.flush()
+        self.page = self.doc.new_page(width=self.width, height=PAGE_HEIGHT)
+        self.writer = fitz.TextWriter(self.page.rect)
+        self.write_header(self.writer, self.doc.page_count, self.page_count)
+        return self.writer
+
+    def flush(self):
+        if self.writer is not None:
+            self.writer.write_text(self.page)
+            self.writer = None
+
+    def cell(self, writer, x, y, text, bold=False):
+        # Bold cells are printed four times with a small offset, like ChronoRace
+        for offset in (0, 0.15, 0.3, 0.45) if bold else (0,):
+            writer.append((x + offset, y), text, font=self.font, fontsize=FONT_SIZE)
+
+    def write_header(self, writer, number, page_count):
+        """Header lines in the order the real sheets extract them."""
+        lines = [
+            ("FRI 20 JUN 2025", True),
+            (self.title, True),
+            ("Start Time: 13:00", False),
+            (self.category, False),
+            ("Individual Results", True),
+            ("Report created FRI 20 JUN 2025 11:54", False),
+            ("Timing and results provided by ChronoRace", False),
+            (f"Page {number}/{page_count}", False),
+        ]
+        for line, (text, bold) in enumerate(lines):
+            self.cell(writer, 20, 30 + line * (LINE_HEIGHT + 2), text, bold)
+        label_width = (self.width - 40) / len(self.column_labels)
+        for index, label in enumerate(self.column_labels):
+            self.cell(writer, 20 + index * label_width, TABLE_TOP - 15, label)
+
+    def save(self):
+        self.flush()
+        self.doc.save(self.path, garbage=3, deflate=True)
+        self.doc.close()
+
+
+def render_qualifying(records, split_count, path, category="Men Elite"):
+    row_height = 3 * LINE_HEIGHT
+    rows_per_page = (PAGE_HEIGHT - TABLE_TOP - 40) // row_height
+    labels = [
+        " / ".join(f"I{i}" for i in range(start + 1, min(start + 2, split_count) + 1))
+        for start in range(0, split_count, 2)
+    ]
+    sheet = SheetWriter(
+        path,
+        "DOWNHILL QUALIFYING ROUND 1",
+        category,
+        ["Rank  Nr Name / UCI MTB Team", "UCI ID", "NAT YOB", "Speed"]
+        + labels
+        + ["Time Points"],
+        page_count=-(-len(records) // rows_per_page),
+    )
+    for index, record in enumerate(records):
+        if index % rows_per_page == 0:
+            writer = sheet.new_page()
+        y = TABLE_TOP + (index % rows_per_page) * row_height
+        if record["rank"]:
+            sheet.cell(writer, 20, y, f"{record['rank']}.")
+        # The name is printed in four layers, only the first with the number
+        sheet.cell(writer, NAME_X, y, f"{record['rider_number']} {record['name']}")
+        for offset in (0.15, 0.3, 0.45):
+            sheet.cell(writer, NAME_X + offset, y, record["name"])
+        if record["team"] != "N/A":
+            sheet.cell(writer, NAME_X, y + LINE_HEIGHT, record["team"])
+        sheet.cell(writer, 190, y, record["uci_id"])
+        sheet.cell(writer, 235, y, record["country"])
+        sheet.cell(writer, 235, y + LINE_HEIGHT, record["birth_year"])
+        if record["speed_trap"]:
+            sheet.cell(writer, 260, y, f"{record['speed_trap']} ({record['speed_trap_rank']})")
+        for i, (split, rank) in enumerate(
+            zip(record["split_times"], record["split_time_ranks"])
+        ):
+            text = f"{split} ({rank})" if split != "-" else "-"
+            sheet.cell(writer, 310 + 55 * (i // 2), y + LINE_HEIGHT * (i % 2), text)
+        x = 310 + 55 * ((split_count + 1) // 2)
+        sheet.cell(writer, x, y, record["final_time"], bold=True)
+        if record["gap"]:
+            sheet.cell(writer, x, y + LINE_HEIGHT, record["gap"])
+        sheet.cell(writer, x + 45, y, record["points"])
+    sheet.save()
+
+
+def render_timed_training(field, splits, speed, path, category="Men Elite"):
+    riders, runs, split_count = splits.shape
+    finals = splits[:, :, -1]
+    best = np.fmin.reduce(finals, axis=1)
+    order = np.lexsort((best, np.isnan(best)))
+    leader = np.nanmin(best)
+
+    width = max(PAGE_WIDTH, 200 + RUN_WIDTH * (runs + 1))
+    row_height = (split_count + 2) * LINE_HEIGHT
+    rows_per_page = (PAGE_HEIGHT - TABLE_TOP - 40) // row_height
+    sheet = SheetWriter(
+        path,
+        "DOWNHILL TIMED TRAINING",
+        category,
+        [f"RUN {run + 1}" for run in range(runs)]
+        + ["Best", "Rank", "Nr Name / UCI MTB Team"]
+        + ["Splits", "Time"] * runs
+        + ["Time"],
+        page_count=-(-riders // rows_per_page),
+        width=width,
+    )
+    for index, row in enumerate(order):
+        if index % rows_per_page == 0:
+            writer = sheet.new_page()
+        y = TABLE_TOP + (index % rows_per_page) * row_height
+        rider = field.iloc[row]
+        name = f"{rider['name']} ({rider['country']})"
+        if not np.isnan(best[row]):
+            sheet.cell(writer, 20, y, f"{index + 1}.")
+        sheet.cell(writer, NAME_X, y, f"{rider['rider_number']} {name}")
+        for offset in (0.15, 0.3, 0.45):
+            sheet.cell(writer, NAME_X + offset, y, name)
+        if rider["team"] != "N/A":
+            sheet.cell(writer, NAME_X, y + LINE_HEIGHT, rider["team"])
+        for run in range(runs):
+            x = 190 + RUN_WIDTH * run
+            times = splits[row, run]
+            if np.isnan(times).all():
+                for line in range(4):
+                    sheet.cell(writer, x, y + LINE_HEIGHT * line, "-")
+                continue
+            for point, value in enumerate(times[:-1]):
+                text = format_milliseconds(int(value)) if not np.isnan(value) else "-"
+                sheet.cell(writer, x, y + LINE_HEIGHT * point, text)
+            if np.isnan(times[-1]):
+                sheet.cell(writer, x + 40, y, "-")
+                continue
+            sheet.cell(writer, x + 40, y, format_milliseconds(int(times[-1])), bold=True)
+            sheet.cell(writer, x + 40, y + LINE_HEIGHT, f"{speed[row, run]:.3f}kmh")
+        if not np.isnan(best[row]):
+            x = 190 + RUN_WIDTH * runs
+            sheet.cell(writer, x, y, format_milliseconds(int(best[row])), bold=True)
+            sheet.cell(writer, x, y + LINE_HEIGHT, format_gap(best[row] - leader))
+    sheet.save()
+    return order
+
+
+def timed_training_truth(field, splits, speed, order):
+    """Canonical timed training frame of every run that reached a timing point."""
+    riders, runs, split_count = splits.shape
+    rows = [
+        (row, run)
+        for row in order
+        for run in range(runs)
+        if not np.isnan(splits[row, run]).all()
+    ]
+    run_details = pd.DataFrame(
+        {
+            "Number": [field["rider_number"].iloc[row] for row, _ in rows],
+            "Name": [
+                f"{field['name'].iloc[row]} ({field['country'].iloc[row]})"
+                for row, _ in rows
+            ],
+            "Run": [run + 1 for _, run in rows],
+            "Speed": [speed[row, run] for row, run in rows],
+        }
+    )
+    milliseconds = np.array([splits[row, run] for row, run in rows]).reshape(-1, split_count)
+    return timed_training_frame(run_details, milliseconds)
+
+
+def generate_session(
+    kind,
+    output_dir,
+    riders=90,
+    runs=5,
+    split_count=4,
+    team_rate=0.8,
+    dnf_rate=0.03,
+    dns_rate=0.03,
+    stop_rate=0.6,
+    category="Men Elite",
+    seed=0,
+    venue="synth",
+):
+    """Write a synthetic sheet and its ground truth; returns both paths.
+
+    `split_count` is the number of intermediates for qualifying and the
+    number of timing points (finish included) for timed training, matching
+    how the extractors count them.
+    """
+    rng = np.random.default_rng(seed)
+    field = generate_field(rng, riders, team_rate)
+    session = "tt" if kind == "tt" else "q1"
+    prefix = os.path.join(output_dir, f"{venue}_2025_dhi_me_results_{session}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    if kind == "tt":
+        splits, speed = timed_training_runs(rng, field, split_count, runs, dnf_rate, stop_rate)
+        order = render_timed_training(field, splits, speed, f"{prefix}.pdf", category)
+        truth = timed_training_truth(field, splits, speed, order)
+    else:
+        records = qualifying_records(rng, field, split_count, dnf_rate, dns_rate)
+        render_qualifying(records, split_count, f"{prefix}.pdf", category)
+        truth = build_results_2025([record for record in records if record["rank"]])
+
+    truth.to_csv(f"{prefix}{TRUTH_SUFFIX}", index=False)
+    return f"{prefix}.pdf", f"{prefix}{TRUTH_SUFFIX}"
+
+
+def extract(kind, pdf_path):
+    """Run the matching extractor on a sheet without its progress prints."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        pages = load_pages(pdf_path)
+        if kind == "tt":
+            lines = [line for page in pages for line in page]
+            return build_timed_training_frame(parse_timed_training_data_final(lines))
+        return build_results_2025(parse_rider_pages_2025(pages)[0])
+
+
+def compare_to_truth(extracted, truth_path):
+    """Rows and cells where the extractor disagrees with the ground truth.
+
+    Rows are matched on the rider number (and run for timed training), and
+    values are compared as they are written to CSV.
+    """
+    truth = pd.read_csv(truth_path, dtype=str, keep_default_na=False)
+    buffer = io.StringIO()
+    extracted.to_csv(buffer, index=False)
+    buffer.seek(0)
+    extracted = pd.read_csv(buffer, dtype=str, keep_default_na=False)
+
+    key = ["Number", "Run"] if "Run" in truth.columns else ["rider_number"]
+    joined = truth.merge(
+        extracted, on=key, how="outer", suffixes=("_truth", "_extracted"), indicator=True
+    )
+    both = joined[joined["_merge"] == "both"]
+    columns = [
+        col for col in truth.columns if col not in key and col in extracted.columns
+    ]
+    differs = pd.DataFrame(
+        {
+            col: both[f"{col}_truth"] != both[f"{col}_extracted"]
+            for col in columns
+        }
+    )
+    return {
+        "truth_rows": len(truth),
+        "extracted_rows": len(extracted),
+        "missing_rows": int((joined["_merge"] == "left_only").sum()),
+        "extra_rows": int((joined["_merge"] == "right_only").sum()),
+        "mismatched_rows": int(differs.any(axis=1).sum()),
+        "mismatched_columns": {
+            col: int(count) for col, count in differs.sum().items() if count
+        },
+        "missing_columns": [col for col in truth.columns if col not in extracted.columns],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write synthetic timing sheets with ground truth for scale testing."
+    )
+    parser.add_argument("kind", choices=["qualifying", "tt"])
+    parser.add_argument("--output-dir", default="synthetic")
+    parser.add_argument("--riders", type=int, default=90)
+    parser.add_argument("--runs", type=int, default=5, help="Timed training runs per rider")
+    parser.add_argument(
+        "--splits",
+        type=int,
+        default=None,
+        help="Intermediates (qualifying, default 4) or timing points (tt, default 5)",
+    )
+    parser.add_argument("--team-rate", type=float, default=0.8)
+    parser.add_argument("--dnf-rate", type=float, default=0.03)
+    parser.add_argument("--dns-rate", type=float, default=0.03)
+    parser.add_argument("--stop-rate", type=float, default=0.6, help="Timed training runs with a stop")
+    parser.add_argument("--category", default="Men Elite")
+    parser.add_argument("--venue", default="synth", help="Venue code used in the file names")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--check", action="store_true", help="Extract the sheet and compare it with the ground truth"
+    )
+    args = parser.parse_args()
+
+    split_count = args.splits or (5 if args.kind == "tt" else 4)
+    start = time.perf_counter()
+    pdf_path, truth_path = generate_session(
+        args.kind,
+        args.output_dir,
+        riders=args.riders,
+        runs=args.runs,
+        split_count=split_count,
+        team_rate=args.team_rate,
+        dnf_rate=args.dnf_rate,
+        dns_rate=args.dns_rate,
+        stop_rate=args.stop_rate,
+        category=args.category,
+        seed=args.seed,
+        venue=args.venue,
+    )
+    print(f"Wrote {pdf_path} and {truth_path} in {time.perf_counter() - start:.2f}s")
+
+    if args.check:
+        start = time.perf_counter()
+        extracted = extract(args.kind, pdf_path)
+        elapsed = time.perf_counter() - start
+        print(f"Extracted {len(extracted)} rows in {elapsed:.2f}s")
+        for key, value in compare_to_truth(extracted, truth_path).items():
+            print(f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
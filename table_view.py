@@ -0,0 +1,118 @@
+# Filename: table_view.py
+# Description: This file contains the cached data loading and paginated table helpers used by timed_training.py and event_results.py to keep large result tables from being sent to the browser in full.
+
+import os
+
+import pandas as pd
+import streamlit as st
+
+# Tables with more rows than this are shown one page at a time
+PAGINATE_ABOVE_ROWS = int(os.environ.get("DH_PAGINATE_ABOVE_ROWS", 200))
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+@st.cache_data(show_spinner=False)
+def load_csv(file_path):
+    """Read a results CSV once per file and reuse it across reruns."""
+    return pd.read_csv(file_path)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def table_window(
+    _df,
+    source_key,
+    columns,
+    sort_by=None,
+    ascending=True,
+    search_column=None,
+    search_text="",
+    page=1,
+    page_size=PAGE_SIZES[0],
+):
+    """Return one page of a table plus the number of rows matching the filter.
+
+    `_df` is not hashed; `source_key` must identify its contents (file path and
+    view name), so every window of the same table shares one cache namespace.
+    """
+    view = _df
+    if search_column and search_text:
+        mask = (
+            view[search_column]
+            .astype(str)
+            .str.contains(search_text, case=False, na=False, regex=False)
+        )
+        view = view[mask]
+    if sort_by:
+        view = view.sort_values(by=sort_by, ascending=ascending, na_position="last")
+
+    total_rows = len(view)
+    start = (page - 1) * page_size
+    return view.iloc[start : start + page_size][list(columns)], total_rows
+
+
+def show_table(
+    df,
+    key,
+    source_key,
+    hide_index=True,
+    search_column=None,
+    threshold=PAGINATE_ABOVE_ROWS,
+):
+    """Render a table, switching to server-side pagination for large frames."""
+    if len(df) <= threshold:
+        st.dataframe(df, hide_index=hide_index)
+        return
+
+    all_columns = list(df.columns)
+    # Show every column again when a file with a different layout is selected
+    if st.session_state.get(f"{key}_column_options") != all_columns:
+        st.session_state[f"{key}_column_options"] = all_columns
+        st.session_state[f"{key}_columns"] = all_columns
+    with st.expander("Table options", expanded=False):
+        columns = st.multiselect("Columns", all_columns, key=f"{key}_columns")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            sort_by = st.selectbox(
+                "Sort by", ["(none)"] + all_columns, key=f"{key}_sort_by"
+            )
+        with col2:
+            ascending = st.toggle("Ascending", value=True, key=f"{key}_ascending")
+        with col3:
+            page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_size")
+        search_text = ""
+        if search_column is not None:
+            search_text = st.text_input(
+                f"Filter by {search_column}", key=f"{key}_search"
+            )
+
+    columns = columns or all_columns
+    sort_by = None if sort_by == "(none)" else sort_by
+    page = st.session_state.get(f"{key}_page", 1)
+    window, total_rows = table_window(
+        df,
+        f"{source_key}:{key}",
+        tuple(columns),
+        sort_by,
+        ascending,
+        search_column,
+        search_text,
+        page,
+        page_size,
+    )
+
+    page_count = max(1, -(-total_rows // page_size))
+    if page > page_count:
+        # The filter shrank the table under the current page; start over
+        st.session_state[f"{key}_page"] = 1
+        st.rerun()
+
+    st.dataframe(window, hide_index=hide_index)
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.number_input("Page", min_value=1, max_value=page_count, key=f"{key}_page")
+    with col2:
+        first_row = (page - 1) * page_size + 1 if total_rows else 0
+        last_row = min(page * page_size, total_rows)
+        st.caption(
+            f"Rows {first_row}-{last_row} of {total_rows} (page {page} of {page_count})"
+        )
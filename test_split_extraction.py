@@ -1,6 +1,6 @@
 import pandas as pd
 import re
-import fitz  # PyMuPDF
+from page_cache import load_pages
 
 filename = "data/leog_2025_dhi_me_results_tt.pdf"
 
@@ -82,13 +82,8 @@ def parse_timed_training_data_final(lines):
     return df
 
 
-# Open the PDF and read its content
-doc = fitz.open(filename)
-
-all_text = []
-for page in doc:
-    text = page.get_text("text")
-    all_text.extend(text.split("\n"))
+# Read the PDF's text through the page cache
+all_text = [line for lines in load_pages(filename) for line in lines]
 
 # Parse the data directly from PDF text
 df_timed_training_final = parse_timed_training_data_final(all_text)
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from head_to_head import session_pairs
+
+
+def test_session_pairs_with_dnf():
+    # Rank is float as soon as one rider has no rank (season_index coerces DNF to NaN)
+    rows = pd.DataFrame(
+        {
+            "Rider_Key": ["c", "a", "b"],
+            "Rank": [2.0, 1.0, np.nan],
+            "Time_Seconds": [101.5, 100.0, np.nan],
+            "Sector_1_Seconds": [49.0, 50.0, 51.0],
+            "Sector_2_Seconds": [52.5, 50.0, np.nan],
+        }
+    )
+    pairs = session_pairs(rows).set_index(["Rider_A", "Rider_B"])
+
+    assert list(pairs.index) == [("a", "b"), ("a", "c"), ("b", "c")]
+    # The rider with a rank beats the DNF
+    assert pairs.loc[("a", "b"), "A_Wins"] and not pairs.loc[("a", "b"), "B_Wins"]
+    assert pairs.loc[("b", "c"), "B_Wins"] and not pairs.loc[("b", "c"), "A_Wins"]
+    assert pairs.loc[("a", "c"), "Gap"] == -1.5
+    assert np.isnan(pairs.loc[("a", "b"), "Gap"])
+    # One sector each between a and c; the DNF's missing sector counts for no one
+    assert pairs.loc[("a", "c"), ["A_Sectors", "B_Sectors"]].tolist() == [1, 1]
+    assert pairs.loc[("a", "b"), ["A_Sectors", "B_Sectors"]].tolist() == [1, 0]
+
+
+def test_session_pairs_does_not_modify_rows():
+    rows = pd.DataFrame(
+        {"Rider_Key": ["a", "b"], "Rank": [np.nan, 1.0], "Time_Seconds": [np.nan, 90.0]}
+    )
+    session_pairs(rows)
+    assert rows["Rank"].isna().tolist() == [True, False]
@@ -0,0 +1,22 @@
+import asyncio
+
+from ingest_pipeline import IngestPipeline
+
+
+def test_existing_csv_is_not_overwritten(tmp_path):
+    csv_path = tmp_path / "biel_dhi_me_results_f.csv"
+    csv_path.write_text("rank,name\n1,KEEP ME\n")
+    # Skipped at discovery, so the PDF is never opened
+    pipeline = IngestPipeline(
+        [str(tmp_path / "biel_dhi_me_results_f.pdf")],
+        output_dir=str(tmp_path),
+        executor="thread",
+        workers=1,
+    )
+
+    outputs = asyncio.run(pipeline.run())
+
+    assert outputs == []
+    assert len(pipeline.skipped) == 1
+    assert "--overwrite" in pipeline.skipped[0][1]
+    assert csv_path.read_text() == "rank,name\n1,KEEP ME\n"
@@ -0,0 +1,30 @@
+import numpy as np
+
+from live_timing import LiveTiming, virtual_ranks
+
+
+def test_virtual_ranks_and_gaps_with_missing_times():
+    # Start order; the third starter never reaches the finish
+    times = np.array([[50.0, 100.0], [48.0, 101.0], [47.0, np.nan], [50.0, 99.0]])
+    ranks, gaps = virtual_ranks(times, [0, 1, 2, 3])
+
+    # The last starter ties the first at split 1 and sorts after them
+    assert ranks[:, 0].tolist() == [1, 1, 1, 4]
+    assert ranks[:, 1].tolist()[:2] == [1, 2] and np.isnan(ranks[2, 1]) and ranks[3, 1] == 1
+    assert gaps[:, 0].tolist() == [0.0, -2.0, -1.0, 3.0]
+    assert gaps[1, 1] == 1.0 and np.isnan(gaps[2, 1]) and gaps[3, 1] == -1.0
+
+
+def test_seek_backwards_matches_stepping_forward():
+    times = np.array([[50.0, 100.0], [48.0, 101.0], [47.0, np.nan], [50.0, 99.0]])
+    replay = LiveTiming(["A", "B", "C", "D"], times, ["Split 1", "Finish"], [3, 2, 1, 0])
+    replay.seek(4)
+    assert list(replay.leaderboard()["Name"]) == ["D", "A", "B"]
+    assert replay.did_not_finish() == ["C"]
+
+    replay.seek(2)
+    rider, crossings = replay.rider_pass()
+    assert rider == 2
+    assert crossings["Virtual_Rank"].iloc[0] == 1 and np.isnan(crossings["Time"].iloc[1])
+    assert list(replay.leaderboard()["Name"]) == ["D"]
+    assert replay.step()[0] == 1
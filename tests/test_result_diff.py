@@ -0,0 +1,34 @@
+import pandas as pd
+
+from result_diff import diff_sessions
+
+
+def test_diff_sessions_with_mixed_rider_number_dtypes():
+    # The provisional sheet has a text entry, so its rider numbers are str
+    before = pd.DataFrame(
+        {
+            "rider_number": ["1", "2", "NORTON"],
+            "name": ["A", "B", "N"],
+            "rank": [1, 2, 3],
+            "split_1": ["30.000", "31.000", "32.000"],
+            "final_time": ["1:00.000", "1:01.000", "1:02.000"],
+        }
+    )
+    after = pd.DataFrame(
+        {
+            "rider_number": [1, 2, 3],
+            "name": ["A", "B", "C"],
+            "rank": [2, 1, 3],
+            "split_1": ["30.000", "31.000", "33.000"],
+            "final_time": ["1:02.000", "1:01.000", "1:03.000"],
+        }
+    )
+    changes = diff_sessions(before, after)
+
+    assert set(zip(changes["rider"], changes["change"])) == {
+        ("1", "penalty"),
+        ("1", "rank_shift"),
+        ("2", "rank_shift"),
+        ("3", "added"),
+        ("NORTON", "removed"),
+    }
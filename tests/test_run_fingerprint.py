@@ -0,0 +1,41 @@
+import pandas as pd
+
+from run_fingerprint import RunFingerprinter, dedup_runs, fingerprint, normalize_splits
+
+RUN = ["0:30.000", "1:00.000", "2:00.000", "2:00.000", "2:00.000"]
+
+
+def test_repeated_final_time_is_dropped_from_the_splits():
+    assert normalize_splits(RUN) == (30000, 60000, 120000)
+    assert normalize_splits(["DNS"]) == ()
+
+
+def test_best_column_artifact_is_dropped():
+    fingerprinter = RunFingerprinter()
+    assert fingerprinter.accept("7", RUN, "p1", run=1) == ["0:30.000", "1:00.000", "2:00.000"]
+    # A lone time equal to an accepted final time is the Best column
+    assert fingerprinter.accept("7", ["2:00.000"], "p1", run=2) is None
+    # Another rider with the same time is not affected
+    assert fingerprinter.accept("8", ["2:00.000"], "p1", run=1) == ["2:00.000"]
+    assert fingerprinter.dropped_report()["reason"].tolist() == ["best_column"]
+
+
+def test_duplicate_runs_within_and_across_sources():
+    fingerprinter = RunFingerprinter()
+    assert fingerprinter.accept("7", RUN, "p1", run=1) is not None
+    assert fingerprinter.accept("7", RUN, "p1", run=2) is None
+    assert fingerprinter.accept("7", RUN, "p2", run=1) is None
+
+    report = fingerprinter.dropped_report()
+    assert report["reason"].tolist() == ["duplicate_run", "duplicate_source"]
+    assert report["run"].tolist() == [2, 1]
+    assert set(report["fingerprint"]) == {fingerprint((30000, 60000, 120000))}
+
+
+def test_dedup_runs_keeps_the_first_copy():
+    first = pd.DataFrame({"Number": ["7", "8"], "Run_Fingerprint": ["a", "b"], "Run": [1, 1]})
+    reissued = pd.DataFrame({"Number": ["7", "7"], "Run_Fingerprint": ["a", "c"], "Run": [1, 2]})
+    merged, dropped = dedup_runs([first, reissued])
+
+    assert list(zip(merged["Number"], merged["Run_Fingerprint"])) == [("7", "a"), ("8", "b"), ("7", "c")]
+    assert len(dropped) == 1
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from running_rank import positions_frame, running_ranks
+
+
+def test_running_ranks_leave_missing_times_unranked():
+    times = np.array(
+        [
+            [30.0, 61.0, 95.0],
+            [29.0, np.nan, 96.0],
+            [31.0, 60.0, np.nan],
+            [np.nan, np.nan, np.nan],
+        ]
+    )
+    ranks = running_ranks(times)
+
+    assert ranks[:, 0].tolist()[:3] == [2, 1, 3]
+    # Riders with a time take the first positions, whatever the NaNs around them
+    assert ranks[0, 1] == 2 and ranks[2, 1] == 1
+    assert ranks[0, 2] == 1 and ranks[1, 2] == 2
+    assert np.isnan(ranks[1, 1]) and np.isnan(ranks[2, 2]) and np.isnan(ranks[3]).all()
+
+
+def test_positions_frame_of_a_race_with_a_missing_split():
+    df = pd.DataFrame(
+        {
+            "name": ["A", "B", "C"],
+            "rider_number": [1, 2, 3],
+            "split_1": ["0:30.000", "N/A", "0:29.000"],
+            "final_time": ["1:40.000", "1:41.000", "1:42.000"],
+        }
+    )
+    positions = positions_frame(df).set_index("Name")
+
+    assert list(positions.index) == ["A", "B", "C"]
+    assert positions.loc["A", "Position_Split_1"] == 2
+    assert positions.loc["C", "Sector_2_Gained"] == -2
+    assert np.isnan(positions.loc["B", "Sector_2_Gained"])
+    assert positions.loc["A", "Total_Gained"] == 1
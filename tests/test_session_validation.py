@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from session_validation import validate_session
+from tt_schema import timed_training_frame
+
+
+def race_frame():
+    # Rider 3's split is after their finish, so the row fails non_increasing_splits
+    return pd.DataFrame(
+        {
+            "rank": [1, 2, 3, 4],
+            "rider_number": [1, 2, 3, 4],
+            "name": ["A", "B", "C", "D"],
+            "speed_trap": [60.0, 61.0, 62.0, 63.0],
+            "speed_trap_rank": [4, 3, 2, 1],
+            "final_time": ["1:40.000", "1:41.000", "1:42.000", "1:43.000"],
+            "gap": ["+0.000", "+1.000", "+2.000", "+3.000"],
+            "split_1": ["0:50.000", "0:50.500", "1:50.000", "0:49.000"],
+            "split_1_rank": [2, 3, 4, 1],
+            "sector_1": ["00:50.000000", "00:50.500000", "01:50.000000", "00:49.000000"],
+            "sector_2": ["00:50.000000", "00:50.500000", "00:52.000000", "00:54.000000"],
+            "sector_1_rank": [2, 3, 4, 1],
+            "sector_2_rank": [1, 2, 3, 4],
+        }
+    )
+
+
+def test_failing_race_row_is_quarantined_and_the_parsed_ranks_kept():
+    valid, quarantine, report = validate_session(race_frame())
+
+    assert list(quarantine["name"]) == ["C"]
+    assert "non_increasing_splits" in quarantine["failed_checks"].iloc[0].split(";")
+    assert report["quarantined"] == 1 and report["passed"] == 3
+    assert list(valid["name"]) == ["A", "B", "D"]
+    # The official ranks and gaps stay as printed on the sheet
+    assert list(valid["rank"]) == [1, 2, 4]
+    assert list(valid["speed_trap_rank"]) == [4, 3, 1]
+    assert list(valid["split_1_rank"]) == [2, 3, 1]
+    assert list(valid["gap"]) == ["+0.000", "+1.000", "+3.000"]
+    # Validating the written rows again still checks the parsed ranks
+    assert validate_session(valid)[2]["quarantined"] == 0
+    swapped = valid.assign(rank=[2, 1, 4])
+    assert validate_session(swapped)[2]["checks"]["rank_order"] == 1
+
+
+def test_out_of_range_speed_is_blanked_not_quarantined():
+    df = race_frame().drop(index=2).reset_index(drop=True)
+    df["speed_trap"] = [60.0, 140.0, 63.0]
+
+    valid, quarantine, report = validate_session(df)
+
+    assert quarantine.empty
+    assert report["speeds_blanked"] == 1
+    assert "speed_range" not in report["checks"]
+    assert np.isnan(valid["speed_trap"].iloc[1])
+    assert list(valid["speed_trap_rank"]) == [4, 3, 1]
+    assert list(valid["rank"]) == [1, 2, 4]
+
+
+def test_timed_training_quarantine_keeps_ranks():
+    runs = pd.DataFrame(
+        {
+            "Number": [7, 7, 8],
+            "Name": ["A", "A", "B"],
+            "Run": [1, 2, 1],
+            "Speed": [55.0, 250.0, 56.0],
+        }
+    )
+    # Run 2 of rider 7 goes backwards at the finish and is the "fastest"
+    milliseconds = np.array(
+        [[30000.0, 61000.0], [29000.0, 28000.0], [31000.0, 62000.0]]
+    )
+    df = timed_training_frame(runs, milliseconds)
+
+    valid, quarantine, report = validate_session(df)
+
+    assert list(quarantine["Run"]) == [2]
+    assert report["speeds_blanked"] == 0
+    assert list(valid["Overall_Rank"]) == [2, 3]
+    assert list(valid["Split_1_Rank"]) == [2, 3]
+
+
+def test_rejected_rows_join_the_quarantine():
+    df = race_frame().drop(index=2).reset_index(drop=True)
+    rejected = pd.DataFrame({"rank": [np.nan], "rider_number": ["9"], "name": ["DNF RIDER"]})
+
+    valid, quarantine, report = validate_session(df, rejected)
+
+    assert len(valid) == 3
+    assert list(quarantine["name"]) == ["DNF RIDER"]
+    assert list(quarantine["failed_checks"]) == ["row_classifier"]
+    assert report["checks"]["row_classifier"] == 1
+    assert (report["rows"], report["passed"], report["quarantined"]) == (4, 3, 1)
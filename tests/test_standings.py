@@ -0,0 +1,66 @@
+import copy
+
+import pandas as pd
+
+from rider_identity import load_identities
+from standings import (
+    UNDATED_SEASON,
+    apply_session,
+    empty_state,
+    rank_standings,
+    season_events,
+    session_points,
+)
+
+
+def record(event, points, season=UNDATED_SEASON):
+    return {
+        "season": season,
+        "event": event,
+        "points": points,
+        "names": {rider: rider.upper() for rider in points},
+    }
+
+
+def test_apply_then_take_back_restores_the_scores():
+    state = empty_state()
+    apply_session(state, record("fwil", {"a": 50, "b": 40}), 1)
+    before = copy.deepcopy(state["scores"])
+
+    qualifying = record("biel", {"a": 10, "c": 7.5})
+    final = record("biel", {"a": 200, "b": 0.1})
+    apply_session(state, qualifying, 1)
+    apply_session(state, final, 1)
+    assert state["scores"][UNDATED_SEASON]["a"]["biel"] == 210
+    apply_session(state, qualifying, -1)
+    apply_session(state, final, -1)
+
+    # Riders and events left with nothing are removed, not kept at zero
+    assert state["scores"] == before
+
+
+def test_season_events_follow_the_calendar():
+    state = empty_state()
+    for path, event in [("m", "mtsa"), ("f", "fwil"), ("b", "biel")]:
+        state["sessions"][path] = record(event, {})
+
+    assert season_events(state, UNDATED_SEASON) == ["fwil", "biel", "mtsa"]
+
+
+def test_ties_go_to_the_latest_event():
+    matrix = pd.DataFrame(
+        {"fwil": [100.0, 50.0, 50.0], "biel": [50.0, 100.0, 100.0]},
+        index=["a", "b", "c"],
+    )
+    rank = rank_standings(matrix, matrix.sum(axis=1))
+
+    assert list(rank.index) == ["b", "c", "a"]
+    assert list(rank) == [1, 1, 3]
+
+
+def test_session_points_are_keyed_by_rider_id(tmp_path):
+    scored = session_points("data/biel_dhi_me_results_f.csv", "biel", "data", tmp_path)
+    riders, _ = load_identities("data", tmp_path)
+
+    assert set(scored["points"]) <= set(riders["Rider_Id"])
+    assert set(scored["names"]) == set(scored["points"])
@@ -0,0 +1,15 @@
+from synthetic_sheets import compare_to_truth, extract, generate_session
+
+
+def test_qualifying_sheet_round_trip(tmp_path):
+    pdf_path, truth_path = generate_session(
+        "qualifying", str(tmp_path), riders=60, dnf_rate=0.05, dns_rate=0.05, seed=3
+    )
+
+    result = compare_to_truth(extract("qualifying", pdf_path), truth_path)
+
+    assert result["truth_rows"] > 0
+    assert result["missing_rows"] == 0
+    assert result["extra_rows"] == 0
+    assert result["mismatched_rows"] == 0
+    assert result["missing_columns"] == []
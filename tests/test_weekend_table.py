@@ -0,0 +1,24 @@
+import pandas as pd
+
+from weekend_table import sort_weekend, weekend_stages
+
+
+def test_q2_shares_the_qualifying_stage():
+    assert weekend_stages(["tt", "q1", "q2"]) == [["tt"], ["q1", "q2"]]
+    assert weekend_stages(["tt", "qr", "semi", "f"]) == [["tt"], ["qr"], ["semi"], ["f"]]
+
+
+def test_direct_qualifiers_sort_ahead_of_second_chance_riders():
+    table = pd.DataFrame(
+        {
+            "Name": ["out", "second chance", "winner", "tt only", "direct"],
+            "Last_Round": ["Q1", "Q2", "Q1", "TT", "Q1"],
+            "TT_Rank": [5.0, 1.0, 2.0, 3.0, 4.0],
+            "Q1_Rank": [40.0, 25.0, 1.0, None, 20.0],
+            "Q2_Rank": [None, 1.0, None, None, None],
+        }
+    )
+
+    ordered = sort_weekend(table, weekend_stages(["tt", "q1", "q2"]))
+
+    assert list(ordered["Name"]) == ["winner", "direct", "second chance", "out", "tt only"]
@@ -1,25 +1,43 @@
 # Filename: timed_training.py
 # Description: This file contains the show_timed_training function that displays the timed training data for the Downhill Mountain Bike World Cup events. It is imported in app.py.
 
+import os
+
 import streamlit as st
-import pandas as pd
+from catalog import session_options
 from plot_helper import plot_results
-from columns import preferred_columns, timedelta_columns
-from utils import convert_to_seconds, seconds_to_human_readable, clean_column_name
+from figures import forecast_figure
+from outliers import clean_field, outlier_table
+from qualifying_forecast import QUALIFIERS, SIMULATIONS, load_forecast, qualifying_path, validate
+from columns import timed_training_columns
+from tt_analysis import (
+    best_runs,
+    comparison_index,
+    hypothetical_best_runs,
+    times_to_timedelta,
+)
+from tt_schema import SCHEMA_VERSION, is_canonical, split_count
+from utils import seconds_to_human_readable, clean_column_name
+from sections import (
+    show_change_log,
+    show_positions,
+    show_head_to_head,
+    show_quarantine,
+    show_rank_sensitivity,
+)
+from table_view import load_csv, show_table
+
+
+@st.cache_data(show_spinner=False)
+def load_clean_field(file_path):
+    """Outlier flags and the cleaned session, computed once per file."""
+    df = load_csv(file_path)
+    return clean_field(df), outlier_table(df)
 
 
 def show_timed_training():
 
-    file_mapping = {
-        "2025 Leogang Time Training": "data/leog_2025_dhi_me_results_tt.csv",
-        "2025 Val di Sole Time Training": "data/vdso_2025_dhi_me_results_tt.csv",
-        "Fort William Time Training": "data/fwil_dhi_me_results_tt.csv",
-        "Leogang Time Training": "data/leog_dhi_me_results_tt.csv",
-        "Biel Time Training": "data/biel_dhi_me_results_tt.csv",
-        "Val di Sole Time Training": "data/vdso_dhi_me_results_tt.csv",
-        "Les Gets Time Training": "data/gets_dhi_me_results_tt.csv",
-        "Mont-Sainte-Anne Time Training": "data/mtsa_dhi_me_results_tt.csv",
-    }
+    file_mapping = session_options(timed_training=True)
 
     st.title("Downhill Mountain Bike World Cup Time Training Results")
     file_choice = st.selectbox(
@@ -27,7 +45,35 @@ def show_timed_training():
         list(file_mapping.keys()),
         key="timed_training_file_select_unique",
     )
-    df = pd.read_csv(file_mapping[file_choice])
+    file_path = file_mapping[file_choice]
+    df = load_csv(file_path)
+    if not is_canonical(df):
+        st.error(
+            f"{file_path} is not in timed training schema {SCHEMA_VERSION}. "
+            "Run `python tt_schema.py` to migrate it."
+        )
+        return
+    preferred_columns = timed_training_columns(split_count(df))
+
+    show_change_log(file_path)
+    show_quarantine(file_path)
+
+    flagged = load_clean_field(file_path)[1]
+    clean = st.toggle(
+        "Clean field (exclude stopped or crashed sectors)",
+        key="timed_training_clean_field_toggle",
+    )
+    # Cached table windows are keyed by source, so the two modes must not share one
+    source_key = f"{file_path}:{'clean' if clean else 'raw'}"
+    if clean:
+        df = load_clean_field(file_path)[0]
+        st.info(
+            f"{len(flagged)} sectors in {flagged[['Number', 'Run']].drop_duplicates().shape[0]} runs "
+            "are far from the field's typical time and are left out of the times, "
+            "ranks, averages and perfect runs below. Runs with a flagged sector have no final time."
+        )
+    with st.expander(f"Flagged sectors ({len(flagged)})"):
+        st.dataframe(flagged, use_container_width=True, hide_index=True)
 
     # Calculate and display information about total runs
     total_runs = len(df)
@@ -44,52 +90,34 @@ def show_timed_training():
     """
     )
 
-    # Handle different column naming conventions
-    # Check if we have Clean_Split_X_Rank columns (Val di Sole format) or Split_X_Rank columns
-    has_clean_splits = any(
-        col.startswith("Clean_Split_") and col.endswith("_Rank") for col in df.columns
-    )
-
-    if has_clean_splits:
-        # Create a mapping for Val di Sole format
-        column_mapping = {
-            "Clean_Split_1_Rank": "Split_1_Rank",
-            "Clean_Split_2_Rank": "Split_2_Rank",
-            "Clean_Split_3_Rank": "Split_3_Rank",
-            "Clean_Split_4_Rank": "Split_4_Rank",
-            "Clean_Split_5_Rank": "Split_5_Rank",
-        }
-        # Rename columns to match expected format
-        df = df.rename(columns=column_mapping)
-
-    #  Modify DataFrame using .loc to avoid SettingWithCopyWarning
-    simple_df = df[
-        ["Number", "Name", "Run", "Speed", "Speed_Rank", "Orig_Split_5_Time"]
-    ].copy()  # Use .copy() to work on a copy of the DataFrame
-    simple_df["Orig_Split_5_Time"] = simple_df["Orig_Split_5_Time"].apply(
-        convert_to_seconds
+    simple_df = (
+        df[["Number", "Name", "Run", "Speed", "Speed_Rank", "Final_Time_Seconds"]]
+        .dropna(subset=["Final_Time_Seconds"])
+        .sort_values(by="Final_Time_Seconds", ascending=True)
+        .reset_index(drop=True)
     )
-    simple_df = simple_df.dropna(subset=["Orig_Split_5_Time"])
-    simple_df = simple_df.sort_values(
-        by="Orig_Split_5_Time", ascending=True
-    ).reset_index(drop=True)
-    simple_df["Orig_Split_5_Time"] = simple_df["Orig_Split_5_Time"].apply(
+    simple_df["Final_Time_Seconds"] = simple_df["Final_Time_Seconds"].apply(
         seconds_to_human_readable
     )
-    simple_df["Rank"] = simple_df.index + 1
-    simple_df = simple_df[
-        ["Rank", "Number", "Name", "Run", "Speed", "Speed_Rank", "Orig_Split_5_Time"]
-    ]
+    simple_df.insert(0, "Rank", simple_df.index + 1)
 
-    st.dataframe(
-        simple_df.rename(columns={"Orig_Split_5_Time": "Final Time"}), hide_index=True
+    show_table(
+        simple_df.rename(columns={"Final_Time_Seconds": "Final Time"}),
+        key="timed_training_all_runs_table",
+        source_key=source_key,
+        search_column="Name",
     )
     st.write("Splits and Sector Ranks")
 
-    # Filter preferred_columns to only include columns that exist in the DataFrame
-    available_columns = [col for col in preferred_columns if col in df.columns]
-    splits_df = df[available_columns].rename(columns=clean_column_name)
-    st.dataframe(splits_df, hide_index=True)
+    splits_df = df[preferred_columns].rename(columns=clean_column_name)
+    show_table(
+        splits_df,
+        key="timed_training_splits_table",
+        source_key=source_key,
+        search_column="Name",
+    )
+
+    show_positions(file_path, "timed_training", clean)
 
     col1, col2 = st.columns(2)
     with col1:
@@ -118,51 +146,19 @@ def show_timed_training():
             key="timed_training_second_rider_select_unique",
         )
 
-    df["Orig_Split_5_Time"] = df["Orig_Split_5_Time"].apply(convert_to_seconds)
-    df["Best_Run"] = df.groupby("Name")["Orig_Split_5_Time"].transform("min")
-    df_best_runs = (
-        df[df["Orig_Split_5_Time"] == df["Best_Run"]]
-        .sort_values(by="Best_Run")
-        .reset_index(drop=True)
-    )
-    df_best_runs["Rank"] = df_best_runs.index + 1
-    df_best_runs = df_best_runs[["Rank"] + df_best_runs.columns[:-1].tolist()]
-
-    new_columns = ["Rank"] + preferred_columns
-    missing_cols = set(new_columns) - set(df_best_runs.columns)
-    for col in missing_cols:
-        df_best_runs[col] = pd.NA
+    df_best_runs = best_runs(df)
     st.write("Best Runs DataFrame")
-    st.dataframe(
-        df_best_runs[new_columns].rename(columns=clean_column_name), hide_index=True
+    show_table(
+        df_best_runs[["Rank"] + preferred_columns].rename(columns=clean_column_name),
+        key="timed_training_best_runs_table",
+        source_key=source_key,
+        search_column="Name",
     )
 
-    # Ensure all split and sector time columns are timedelta before plotting
-    time_columns = [
-        "Orig_Split_1_Time",
-        "Orig_Split_2_Time",
-        "Orig_Split_3_Time",
-        "Orig_Split_4_Time",
-        "Orig_Split_5_Time",
-        "Sector_1_Time",
-        "Sector_2_Time",
-        "Sector_3_Time",
-        "Sector_4_Time",
-        "Sector_5_Time",
-    ]
-    for column in time_columns:
-        if column in df_best_runs.columns:
-            df_best_runs[column] = pd.to_timedelta(
-                df_best_runs[column], errors="coerce"
-            )
-
-    if len(df_best_runs) < 30:
-        index_location = len(df_best_runs) - 1
-    else:
-        index_location = 29
+    index_location = comparison_index(df_best_runs)
 
     plot_results(
-        df_best_runs,
+        times_to_timedelta(df_best_runs),
         selected_rider,
         second_rider,
         n,
@@ -170,112 +166,22 @@ def show_timed_training():
         index_location,
         "best_runs",
     )
+    show_head_to_head(file_path, selected_rider, second_rider)
 
-    best_sectors = (
-        df.groupby("Name")
-        .agg(
-            {
-                "Sector_1_Time": "min",
-                "Sector_2_Time": "min",
-                "Sector_3_Time": "min",
-                "Sector_4_Time": "min",
-                "Sector_5_Time": "min",
-                "Speed": "max",
-            }
-        )
-        .reset_index()
-    )
-
-    best_runs_data = []
-    for _, row in best_sectors.iterrows():
-        best_run = {
-            "Number": df[df["Name"] == row["Name"]]["Number"].iloc[0],
-            "Name": row["Name"],
-            "Run": 4,
-            "Sector_1_Time": row["Sector_1_Time"],
-            "Sector_2_Time": row["Sector_2_Time"],
-            "Sector_3_Time": row["Sector_3_Time"],
-            "Sector_4_Time": row["Sector_4_Time"],
-            "Sector_5_Time": row["Sector_5_Time"],
-            "Speed": row["Speed"],
-        }
-        best_run["Orig_Split_1_Time"] = best_run["Sector_1_Time"]
-        best_run["Orig_Split_2_Time"] = (
-            best_run["Sector_1_Time"] + best_run["Sector_2_Time"]
-        )
-        best_run["Orig_Split_3_Time"] = (
-            best_run["Orig_Split_2_Time"] + best_run["Sector_3_Time"]
-        )
-        best_run["Orig_Split_4_Time"] = (
-            best_run["Orig_Split_3_Time"] + best_run["Sector_4_Time"]
-        )
-        best_run["Orig_Split_5_Time"] = (
-            best_run["Orig_Split_4_Time"] + best_run["Sector_5_Time"]
-        )
-        best_runs_data.append(best_run)
-
-    df_hypothetical_best = pd.DataFrame(best_runs_data)
-
-    for i in range(1, 5):
-        df_hypothetical_best[f"Cumulative_from_Sector_{i}_Time"] = df_hypothetical_best[
-            [f"Sector_{j}_Time" for j in range(i, 6)]
-        ].sum(axis=1)
-
-    for i in range(1, 6):
-        df_hypothetical_best[f"Split_{i}_Rank"] = df_hypothetical_best[
-            f"Orig_Split_{i}_Time"
-        ].rank(method="min")
-        df_hypothetical_best[f"Sector_{i}_Rank"] = df_hypothetical_best[
-            f"Sector_{i}_Time"
-        ].rank(method="min")
-
-    for i in range(1, 5):
-        df_hypothetical_best[f"Cumulative_from_Sector_{i}_Rank"] = df_hypothetical_best[
-            f"Cumulative_from_Sector_{i}_Time"
-        ].rank(method="min")
-
-    df_hypothetical_best["Speed_Rank"] = df_hypothetical_best["Speed"].rank(
-        method="min", ascending=False
-    )
-
-    missing_cols = set(preferred_columns) - set(df_hypothetical_best.columns)
-    for col in missing_cols:
-        df_hypothetical_best[col] = pd.NA
-
-    df_hypothetical_best["Perfect_Run_Rank"] = df_hypothetical_best["Split_5_Rank"]
-    df_hypothetical_best = df_hypothetical_best.sort_values(by="Orig_Split_5_Time")
-
-    columns_order = ["Perfect_Run_Rank", "Number", "Name", "Speed", "Speed_Rank"] + [
-        col
-        for col in preferred_columns
-        if col not in ["Number", "Name", "Speed", "Speed_Rank", "Perfect_Run_Rank"]
-    ]
-    df_hypothetical_best = df_hypothetical_best[columns_order]
-
-    time_columns = [
-        col
-        for col in df_hypothetical_best.columns
-        if "Time" in col or "Split" in col or "Sector" in col
-    ]
-    for col in time_columns:
-        df_hypothetical_best[col] = df_hypothetical_best[col].apply(
-            seconds_to_human_readable
-        )
+    show_rank_sensitivity(file_path, selected_rider, n, "timed_training", clean)
 
-    # Ensure all split and sector time columns are timedelta before plotting hypothetical best
-    for column in time_columns:
-        if column in df_hypothetical_best.columns:
-            df_hypothetical_best[column] = pd.to_timedelta(
-                df_hypothetical_best[column], errors="coerce"
-            )
+    df_hypothetical_best = hypothetical_best_runs(df)
 
     st.title("Hypothetical Perfect Runs Analysis")
     st.write(
         "The following analysis is based on the best sector times for each rider out of their three runs to compile a single best hypothetical run."
     )
     st.write("Hypothetical Perfect Runs DataFrame")
-    st.dataframe(
-        df_hypothetical_best.rename(columns=clean_column_name), hide_index=True
+    show_table(
+        df_hypothetical_best.rename(columns=clean_column_name),
+        key="timed_training_perfect_runs_table",
+        source_key=source_key,
+        search_column="Name",
     )
 
     plot_results(
@@ -288,5 +194,62 @@ def show_timed_training():
         "hypothetical_best",
     )
 
+    show_qualifying_forecast(file_path)
+
+
+def show_qualifying_forecast(file_path):
+    st.title("Qualifying Forecast")
+    if not st.toggle(
+        "Predict qualifying from these runs", key="timed_training_forecast_toggle"
+    ):
+        return
+    st.write(
+        f"Each rider's sector times are modelled from their clean timed training runs, "
+        f"shrunk towards the field for riders with few runs, and {SIMULATIONS:,} "
+        "qualifying sessions are simulated. Sectors most riders stopped in are left "
+        "out, so the modelled time only covers the sectors ridden at pace."
+    )
+    qualifiers = st.number_input(
+        "Riders through to the next round",
+        min_value=1,
+        value=QUALIFIERS,
+        key="timed_training_forecast_qualifiers_input",
+    )
+    with st.spinner("Simulating qualifying..."):
+        forecast = load_forecast(file_path, qualifiers=qualifiers)
+    show_table(
+        forecast,
+        key="timed_training_forecast_table",
+        source_key=f"{file_path}:forecast:{qualifiers}",
+        search_column="Name",
+    )
+    st.plotly_chart(forecast_figure(forecast.head(20)), use_container_width=True)
+
+    race_path = qualifying_path(file_path)
+    if race_path is None:
+        st.info("No qualifying results for this event yet to check the forecast against.")
+        return
+    summary, outcomes = validate(forecast, file_path, race_path, qualifiers)
+    st.write(f"#### Forecast vs {os.path.basename(race_path)}")
+    col1, col2, col3 = st.columns(3)
+    col1.metric(
+        "Qualifiers picked",
+        f"{summary['Qualifiers_Picked']} of {summary['Qualifiers']}",
+    )
+    col2.metric("Rank correlation", summary["Rank_Correlation"])
+    col3.metric("Brier score (qualify)", summary["Brier_Qualify"])
+    st.caption(
+        f"{summary['Riders']} riders were in both sessions. Brier scores are the mean "
+        "squared error of a probability (0 is perfect); podium "
+        f"{summary['Brier_Podium']}, win {summary['Brier_Win']}."
+    )
+    with st.expander("Forecast and result per rider", expanded=False):
+        show_table(
+            outcomes,
+            key="timed_training_forecast_outcomes_table",
+            source_key=f"{file_path}:forecast_outcomes:{qualifiers}",
+            search_column="Name",
+        )
+
 
 show_timed_training()
@@ -0,0 +1,106 @@
+# Filename: tt_analysis.py
+# Description: This file contains the timed training calculations (best runs and hypothetical perfect runs) shared by timed_training.py and build_reports.py. Nothing in here depends on Streamlit.
+
+import numpy as np
+import pandas as pd
+from columns import timed_training_columns
+from tt_schema import split_count
+from utils import convert_to_seconds
+
+
+def tt_time_columns(df):
+    """Split and sector time columns of a canonical timed training frame."""
+    points = range(1, split_count(df) + 1)
+    return (
+        [f"Orig_Split_{i}_Time" for i in points],
+        [f"Sector_{i}_Time" for i in points],
+    )
+
+
+def column_to_seconds(series):
+    """Seconds for a column holding either floats or "M:SS.fff" strings."""
+    seconds = pd.to_numeric(series, errors="coerce")
+    text = series[seconds.isna() & series.notna()].astype(str)
+    return seconds.fillna(text.map(convert_to_seconds)).astype(float)
+
+
+def times_to_timedelta(df, columns=None):
+    """Convert split, sector and cumulative columns to timedeltas for plotting."""
+    df = df.copy()
+    if columns is None:
+        columns = [col for col in df.columns if col.endswith("_Time")]
+    for column in columns:
+        if column in df.columns:
+            df[column] = pd.to_timedelta(column_to_seconds(df[column]), unit="s")
+    return df
+
+
+def comparison_index(df):
+    """Row of the rider the field is compared against (30th place or last)."""
+    return min(len(df), 30) - 1
+
+
+def best_runs(df):
+    """Each rider's fastest run, ranked."""
+    df_best_runs = (
+        df[df["Final_Time_Seconds"] == df["Best"]]
+        .drop_duplicates(subset="Number")
+        .sort_values(by="Final_Time_Seconds")
+        .reset_index(drop=True)
+    )
+    df_best_runs.insert(0, "Rank", df_best_runs.index + 1)
+    df_best_runs["Best_Run"] = df_best_runs["Final_Time_Seconds"]
+    return df_best_runs
+
+
+def hypothetical_best_runs(df):
+    """Combine each rider's best sectors into a single hypothetical perfect run."""
+    split_columns, sector_columns = tt_time_columns(df)
+    count = len(sector_columns)
+    best_sectors = (
+        df.groupby("Name")
+        .agg({"Number": "first", **{col: "min" for col in sector_columns}, "Speed": "max"})
+        .reset_index()
+    )
+
+    sectors = best_sectors[sector_columns].to_numpy(dtype=float)
+    splits = np.cumsum(sectors, axis=1)
+    df_hypothetical_best = best_sectors[["Number", "Name", "Speed"]].copy()
+    for i in range(count):
+        df_hypothetical_best[split_columns[i]] = splits[:, i]
+        df_hypothetical_best[sector_columns[i]] = sectors[:, i]
+    for i in range(count - 1):
+        df_hypothetical_best[f"Cumulative_from_Split_{i + 1}_Time"] = (
+            splits[:, -1] - splits[:, i]
+        )
+
+    ranked_columns = [
+        col for col in timed_training_columns(count) if col.endswith("_Rank")
+    ]
+    for rank_column in ranked_columns:
+        if rank_column == "Speed_Rank":
+            df_hypothetical_best[rank_column] = df_hypothetical_best["Speed"].rank(
+                method="min", ascending=False
+            )
+            continue
+        time_column = rank_column.replace("_Rank", "_Time")
+        if rank_column.startswith("Split_"):
+            time_column = "Orig_" + time_column
+        df_hypothetical_best[rank_column] = df_hypothetical_best[time_column].rank(
+            method="min"
+        )
+
+    df_hypothetical_best["Perfect_Run_Rank"] = df_hypothetical_best[
+        f"Split_{count}_Rank"
+    ]
+    df_hypothetical_best = df_hypothetical_best.sort_values(by=split_columns[-1])
+
+    leading_columns = ["Perfect_Run_Rank", "Number", "Name", "Speed", "Speed_Rank"]
+    columns_order = leading_columns + [
+        col
+        for col in timed_training_columns(count)
+        if col not in leading_columns and col != "Run"
+    ]
+
+    # Split and sector columns are timedeltas so the frame can be plotted directly
+    return times_to_timedelta(df_hypothetical_best[columns_order])
@@ -0,0 +1,196 @@
+# Filename: tt_schema.py
+# Description: This file contains the canonical timed training schema and the one-shot migration that rewrites older timed training CSVs into it. Every column is derived from each run's split times, so files written by any version of the extractor end up with the same columns and can be concatenated directly.
+
+import argparse
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from run_fingerprint import fingerprint, format_milliseconds
+from utils import find_sessions, time_column_to_ms
+
+SCHEMA_VERSION = 1
+SCHEMA_VERSION_COLUMN = "Schema_Version"
+
+RUN_COLUMNS = [
+    SCHEMA_VERSION_COLUMN,
+    "Number",
+    "Name",
+    "Run",
+    "Run_Fingerprint",
+    "Speed",
+    "Speed_Rank",
+    "Final_Time_Seconds",
+    "Overall_Rank",
+    "Best",
+]
+
+
+def canonical_columns(split_count):
+    """Column order for a session with `split_count` timing points (the last is the finish)."""
+    timing_points = range(1, split_count + 1)
+    cumulative_points = range(1, split_count)
+    return (
+        RUN_COLUMNS
+        + [f"Orig_Split_{i}_Time" for i in timing_points]
+        + [f"Clean_Split_{i}_Time" for i in timing_points]
+        + [f"Split_{i}_Rank" for i in timing_points]
+        + [f"Sector_{i}_Time" for i in timing_points]
+        + [f"Sector_{i}_Rank" for i in timing_points]
+        + [f"Cumulative_from_Split_{i}_Time" for i in cumulative_points]
+        + [f"Cumulative_from_Split_{i}_Rank" for i in cumulative_points]
+    )
+
+
+def split_count(df):
+    """Number of timing points in a canonical frame."""
+    return sum(1 for col in df.columns if col.startswith("Orig_Split_"))
+
+
+def is_canonical(df):
+    return (
+        SCHEMA_VERSION_COLUMN in df.columns
+        and (df[SCHEMA_VERSION_COLUMN] == SCHEMA_VERSION).all()
+    )
+
+
+def _trim_trailing(splits):
+    splits = list(splits)
+    while len(splits) > 1 and splits[-1] <= splits[-2]:
+        splits.pop()
+    return splits
+
+
+def split_matrix(split_lists, count=None):
+    """(runs x timing points) float matrix of milliseconds, NaN where missing.
+
+    Trailing values that are not later than the split before them (the final
+    time printed again, or a "Best" column value) are dropped first. `count`
+    defaults to the most common run length. Shorter runs (no finish time) are
+    left-aligned; longer runs keep their last `count` splits, since extra
+    leading values come from an aborted attempt printed on the same row.
+    """
+    split_lists = [_trim_trailing(splits) for splits in split_lists]
+    lengths = Counter(len(splits) for splits in split_lists if len(splits))
+    if count is None:
+        count = lengths.most_common(1)[0][0] if lengths else 0
+    matrix = np.full((len(split_lists), count), np.nan)
+    for row, splits in enumerate(split_lists):
+        splits = list(splits)[-count:] if count else []
+        matrix[row, : len(splits)] = splits
+    return matrix
+
+
+def _rank(values, ascending=True):
+    return pd.Series(values).rank(method="min", ascending=ascending).astype("Int64")
+
+
+def timed_training_frame(runs, milliseconds):
+    """Canonical frame from run details and their split matrix.
+
+    `runs` needs Number, Name, Run and Speed columns, one row per run in the
+    same order as the rows of `milliseconds`. Ranks are taken across all runs
+    of the session; missing times stay missing rather than ranking last.
+    """
+    runs = runs.reset_index(drop=True)
+    count = milliseconds.shape[1]
+    sectors = np.diff(milliseconds, axis=1, prepend=0.0)
+    final = milliseconds[:, -1] if count else np.full(len(runs), np.nan)
+
+    df = pd.DataFrame(
+        {
+            SCHEMA_VERSION_COLUMN: SCHEMA_VERSION,
+            "Number": runs["Number"],
+            "Name": runs["Name"],
+            "Run": runs["Run"],
+            "Run_Fingerprint": [
+                fingerprint(row[~np.isnan(row)].astype(np.int64))
+                if not np.isnan(row).all()
+                else None
+                for row in milliseconds
+            ],
+            # A speed of 0 is how the sheets show a missing speed trap reading
+            "Speed": pd.to_numeric(runs["Speed"], errors="coerce").replace(0, np.nan),
+            "Final_Time_Seconds": final / 1000,
+        }
+    )
+    df["Speed_Rank"] = _rank(df["Speed"], ascending=False)
+    df["Overall_Rank"] = _rank(df["Final_Time_Seconds"])
+    df["Best"] = df.groupby("Number")["Final_Time_Seconds"].transform("min")
+
+    for i in range(count):
+        df[f"Orig_Split_{i + 1}_Time"] = [
+            format_milliseconds(int(value)) if not np.isnan(value) else None
+            for value in milliseconds[:, i]
+        ]
+        df[f"Clean_Split_{i + 1}_Time"] = milliseconds[:, i] / 1000
+        df[f"Split_{i + 1}_Rank"] = _rank(milliseconds[:, i])
+        df[f"Sector_{i + 1}_Time"] = sectors[:, i] / 1000
+        df[f"Sector_{i + 1}_Rank"] = _rank(sectors[:, i])
+    for i in range(count - 1):
+        remaining = (final - milliseconds[:, i]) / 1000
+        df[f"Cumulative_from_Split_{i + 1}_Time"] = remaining
+        df[f"Cumulative_from_Split_{i + 1}_Rank"] = _rank(remaining)
+
+    return df[canonical_columns(count)]
+
+
+def legacy_split_lists(df):
+    """Each row's split times in milliseconds, read from its Orig_Split_N_Time columns."""
+    columns = sorted(
+        (col for col in df.columns if col.startswith("Orig_Split_")),
+        key=lambda col: int(col.split("_")[2]),
+    )
+    milliseconds = np.column_stack(
+        [time_column_to_ms(df[col]).to_numpy(dtype=float) for col in columns]
+    )
+    return [row[~np.isnan(row)] for row in milliseconds]
+
+
+def to_canonical(df):
+    """Rewrite a timed training frame of any earlier layout into the canonical schema."""
+    if is_canonical(df):
+        return df
+    split_lists = legacy_split_lists(df)
+    return timed_training_frame(
+        df[["Number", "Name", "Run", "Speed"]], split_matrix(split_lists)
+    )
+
+
+def migrate_file(path, dry_run=False):
+    """Migrate one CSV in place; returns a one-line summary."""
+    df = pd.read_csv(path)
+    if is_canonical(df):
+        return f"{path}: already schema {SCHEMA_VERSION}"
+    canonical = to_canonical(df)
+    if not dry_run:
+        canonical.to_csv(path, index=False)
+    return (
+        f"{path}: {len(df.columns)} -> {len(canonical.columns)} columns, "
+        f"{split_count(canonical)} timing points, {len(canonical)} runs"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rewrite timed training CSVs into the canonical schema."
+    )
+    parser.add_argument(
+        "paths", nargs="*", help="CSV files (default: every timed training CSV in --data-dir)"
+    )
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    paths = args.paths or [
+        path
+        for path in find_sessions(args.data_dir)
+        if path.endswith("_tt.csv")
+    ]
+    for path in paths:
+        print(migrate_file(path, dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,24 @@
+import os
 import pandas as pd
 import re
-import fitz  # PyMuPDF
+import sys
 import numpy as np
+from page_cache import load_pages
+from run_fingerprint import RunFingerprinter, normalize_splits
+from session_validation import format_report, write_validated
+from tt_schema import split_matrix, timed_training_frame
 
 filename = "data/vdso_2025_dhi_me_results_tt.pdf"
 
 
-def parse_timed_training_data_final(lines):
+def parse_timed_training_data_final(lines, fingerprinter=None, source=""):
+    """Parse riders and their runs from the text lines of a timed training sheet.
+
+    Pass the same `fingerprinter` for several sheets of one session to drop
+    runs repeated between them; `source` names the sheet in its report.
+    """
+    if fingerprinter is None:
+        fingerprinter = RunFingerprinter()
     data = []
     current_rider = None
     i = 0
@@ -81,33 +93,21 @@ def parse_timed_training_data_final(lines):
 
                 # Only store run data if we found valid splits
                 if splits:
-                    # Check if this is a 'Best' column artifact: all splits are identical and match a previous final time
-                    is_best_column = False
-                    if len(splits) > 1 and len(set(splits)) == 1:
-                        for prev_run in range(1, run_num):
-                            prev_final = current_rider["Runs"][prev_run]["final_time"]
-                            if prev_final and prev_final == splits[0]:
-                                is_best_column = True
-                                break
-                    if is_best_column:
-                        print(f"  Skipping 'Best' column artifact for run {run_num}")
-                        i = j
-                        continue
-                    # ... existing duplicate detection logic ...
-                    is_duplicate = False
-                    for prev_run in range(1, run_num):
-                        if current_rider["Runs"][prev_run]["splits"] == splits:
-                            is_duplicate = True
-                            break
-                    if not is_duplicate:
-                        current_rider["Runs"][run_num]["splits"] = splits
-                        current_rider["Runs"][run_num]["final_time"] = splits[-1]
+                    # 'Best' column artifacts and repeated runs are dropped by fingerprint
+                    clean_splits = fingerprinter.accept(
+                        current_rider["Number"], splits, source, run_num
+                    )
+                    if clean_splits is not None:
+                        current_rider["Runs"][run_num]["splits"] = clean_splits
+                        current_rider["Runs"][run_num]["final_time"] = clean_splits[-1]
                         current_rider["Runs"][run_num]["valid"] = True
                         print(
-                            f"  Run {run_num}: {len(splits)} splits, final time: {splits[-1]}"
+                            f"  Run {run_num}: {len(clean_splits)} splits, final time: {clean_splits[-1]}"
                         )
                     else:
-                        print(f"  Skipping duplicate run {run_num}")
+                        print(
+                            f"  Skipping {fingerprinter.dropped[-1]['reason']} for run {run_num}"
+                        )
                 i = j
                 continue
 
@@ -145,33 +145,21 @@ def parse_timed_training_data_final(lines):
 
                 # Only store run data if we found valid splits and they're not duplicates
                 if splits:
-                    # Check if this is a 'Best' column artifact: all splits are identical and match a previous final time
-                    is_best_column = False
-                    if len(splits) > 1 and len(set(splits)) == 1:
-                        for prev_run in range(1, run_num):
-                            prev_final = current_rider["Runs"][prev_run]["final_time"]
-                            if prev_final and prev_final == splits[0]:
-                                is_best_column = True
-                                break
-                    if is_best_column:
-                        print(f"  Skipping 'Best' column artifact for run {run_num}")
-                        i = j
-                        continue
-                    # ... existing duplicate detection logic ...
-                    is_duplicate = False
-                    for prev_run in range(1, run_num):
-                        if current_rider["Runs"][prev_run]["splits"] == splits:
-                            is_duplicate = True
-                            break
-                    if not is_duplicate:
-                        current_rider["Runs"][run_num]["splits"] = splits
-                        current_rider["Runs"][run_num]["final_time"] = splits[-1]
+                    # 'Best' column artifacts and repeated runs are dropped by fingerprint
+                    clean_splits = fingerprinter.accept(
+                        current_rider["Number"], splits, source, run_num
+                    )
+                    if clean_splits is not None:
+                        current_rider["Runs"][run_num]["splits"] = clean_splits
+                        current_rider["Runs"][run_num]["final_time"] = clean_splits[-1]
                         current_rider["Runs"][run_num]["valid"] = True
                         print(
-                            f"  Run {run_num}: {len(splits)} splits, final time: {splits[-1]}"
+                            f"  Run {run_num}: {len(clean_splits)} splits, final time: {clean_splits[-1]}"
                         )
                     else:
-                        print(f"  Skipping duplicate run {run_num}")
+                        print(
+                            f"  Skipping {fingerprinter.dropped[-1]['reason']} for run {run_num}"
+                        )
 
                 i = j
                 continue
@@ -186,156 +174,89 @@ def parse_timed_training_data_final(lines):
     return data
 
 
-# Helper functions
-def convert_time_to_seconds(split_time):
-    if pd.isna(split_time):
-        return None
-    if ":" in split_time:
-        minutes, seconds = map(float, split_time.split(":"))
-        return minutes * 60 + seconds
-    return float(split_time)
-
-
-def calculate_sector_times(splits):
-    sectors = []
-    previous_split_time = 0
-    for split in splits:
-        # Convert split time to seconds
-        split_time = convert_time_to_seconds(split)
-        if split_time is not None:
-            sector_time = split_time - previous_split_time
-            sectors.append(sector_time)
-            previous_split_time = split_time
-        else:
-            sectors.append(None)
-    return sectors
-
-
-# Main processing
-print("=== Starting PDF Processing ===")
-doc = fitz.open(filename)
-
-# Process all pages, not just the first one
-all_lines = []
-for page_num in range(len(doc)):
-    page = doc[page_num]
-    text = page.get_text("text")  # Correct PyMuPDF API call
-    lines = text.split("\n")
-    print(f"Processing page {page_num + 1}: {len(lines)} lines")
-    all_lines.extend(lines)
-
-print(f"Total lines across all pages: {len(all_lines)}")
-
-# Parse the data from all pages
-rider_data = parse_timed_training_data_final(all_lines)
-
-# Convert to DataFrame format
-df_data = []
-for rider in rider_data:
-    for run_num in range(1, 6):
-        run_data = rider["Runs"][run_num]
-
-        if not run_data["valid"]:
-            continue
+def read_pdf_lines(source):
+    """Text lines of all pages concatenated, given a filename or the PDF bytes."""
+    # Process all pages, not just the first one
+    all_lines = []
+    for page_num, lines in enumerate(load_pages(source)):
+        print(f"Processing page {page_num + 1}: {len(lines)} lines")
+        all_lines.extend(lines)
+
+    print(f"Total lines across all pages: {len(all_lines)}")
+    return all_lines
+
+
+def build_timed_training_frame(rider_data):
+    """Turn parsed riders and runs into the canonical timed training DataFrame."""
+    runs = []
+    split_lists = []
+    for rider in rider_data:
+        for run_num in range(1, 6):
+            run_data = rider["Runs"][run_num]
 
-        # Calculate sector times
-        sector_times = calculate_sector_times(run_data["splits"])
-
-        # Convert splits to seconds
-        split_seconds = [convert_time_to_seconds(split) for split in run_data["splits"]]
-        final_time_seconds = convert_time_to_seconds(run_data["final_time"])
-
-        row = {
-            "Number": rider["Number"],
-            "Name": rider["Name"],
-            "Run": run_num,
-            "Splits": run_data["splits"],
-            "Time": run_data["final_time"],
-            "Speed": run_data["speed"] or 0.0,
-            "Final_Time_Seconds": final_time_seconds,
-        }
-
-        # Add split times
-        for i, split in enumerate(run_data["splits"], 1):
-            row[f"Orig_Split_{i}_Time"] = split
-            row[f"Clean_Split_{i}_Time"] = convert_time_to_seconds(split)
-
-        # Add sector times
-        for i, sector_time in enumerate(sector_times, 1):
-            row[f"Sector_{i}_Time"] = sector_time
-
-        df_data.append(row)
-
-df_timed_training_final = pd.DataFrame(df_data)
-
-# Calculate ranks and additional metrics
-print("\n=== Calculating Ranks and Metrics ===")
-
-# Calculate ranks for each metric
-metrics_to_rank = []
-for i in range(1, 6):
-    metrics_to_rank.extend([f"Clean_Split_{i}_Time", f"Sector_{i}_Time"])
-
-for metric in metrics_to_rank:
-    if metric in df_timed_training_final.columns:
-        rank_col = metric.replace("_Time", "_Rank")
-        df_timed_training_final[rank_col] = df_timed_training_final[metric].rank(
-            method="min", na_option="bottom"
-        )
-
-# Speed rank
-df_timed_training_final["Speed_Rank"] = df_timed_training_final["Speed"].rank(
-    method="min", ascending=False, na_option="bottom"
-)
-
-# Calculate cumulative times
-for i in range(1, 5):
-    cumulative_col = f"Cumulative_from_Split_{i}_Time"
-    df_timed_training_final[cumulative_col] = df_timed_training_final.apply(
-        lambda row: sum(row[f"Clean_Split_{j}_Time"] or 0 for j in range(i + 1, 6)),
-        axis=1,
+            if not run_data["valid"]:
+                continue
+
+            runs.append(
+                {
+                    "Number": rider["Number"],
+                    "Name": rider["Name"],
+                    "Run": run_num,
+                    "Speed": run_data["speed"],
+                }
+            )
+            split_lists.append(normalize_splits(run_data["splits"]))
+
+    # Ranks, sectors and cumulative times are all derived in tt_schema
+    df_timed_training_final = timed_training_frame(
+        pd.DataFrame(runs, columns=["Number", "Name", "Run", "Speed"]),
+        split_matrix(split_lists),
     )
 
-    cumulative_rank_col = f"Cumulative_from_Split_{i}_Rank"
-    df_timed_training_final[cumulative_rank_col] = df_timed_training_final[
-        cumulative_col
-    ].rank(method="min", na_option="bottom")
-
-# Overall rank based on final time
-df_timed_training_final["Overall_Rank"] = df_timed_training_final[
-    "Final_Time_Seconds"
-].rank(method="min", na_option="bottom")
-
-# Total time (same as final time)
-df_timed_training_final["Total_Time"] = df_timed_training_final["Final_Time_Seconds"]
-
-print(f"Created DataFrame with {len(df_timed_training_final)} rows")
-print(f"Columns: {list(df_timed_training_final.columns)}")
-
-# After DataFrame creation, add a 'Best' column for each rider
-if not df_timed_training_final.empty:
-    best_times = (
-        df_timed_training_final[df_timed_training_final["Time"].notna()]
-        .groupby("Number")["Final_Time_Seconds"]
-        .min()
-        .reset_index()
+    print(f"Created DataFrame with {len(df_timed_training_final)} rows")
+    print(f"Columns: {list(df_timed_training_final.columns)}")
+    return df_timed_training_final
+
+
+def process_timed_training(filename, overwrite=False):
+    """Extract a timed training PDF and save it as a CSV next to it.
+
+    An existing CSV is left alone unless `overwrite` is set.
+    """
+    output_filename = filename.replace(".pdf", ".csv")
+    if os.path.exists(output_filename) and not overwrite:
+        print(f"{output_filename} exists, pass --overwrite to replace it")
+        return None
+
+    print("=== Starting PDF Processing ===")
+
+    # Parse the data from all pages
+    fingerprinter = RunFingerprinter()
+    rider_data = parse_timed_training_data_final(
+        read_pdf_lines(filename), fingerprinter, filename
     )
-    best_times = best_times.rename(columns={"Final_Time_Seconds": "Best"})
-    df_timed_training_final = df_timed_training_final.merge(
-        best_times, on="Number", how="left"
+    df_timed_training_final = build_timed_training_frame(rider_data)
+
+    dropped = fingerprinter.dropped_report()
+    print(f"\n=== Dropped {len(dropped)} runs ===")
+    if not dropped.empty:
+        print(dropped[["rider", "run", "reason", "splits"]].to_string(index=False))
+
+    # Save to CSV
+    report = write_validated(df_timed_training_final, output_filename)
+    print(f"Saved to {output_filename}")
+    print(format_report(report))
+
+    # Show some sample data
+    print("\n=== Sample Data ===")
+    print(
+        df_timed_training_final[
+            ["Number", "Name", "Run", "Final_Time_Seconds", "Speed", "Overall_Rank"]
+        ].head(10)
     )
+    return df_timed_training_final
 
-# Save to CSV
-output_filename = filename.replace(".pdf", ".csv")
-df_timed_training_final.to_csv(output_filename, index=False)
-print(f"Saved to {output_filename}")
-
-# Show some sample data
-print("\n=== Sample Data ===")
-print(
-    df_timed_training_final[
-        ["Number", "Name", "Run", "Time", "Speed", "Overall_Rank"]
-    ].head(10)
-)
 
-doc.close()
+if __name__ == "__main__":
+    paths = [arg for arg in sys.argv[1:] if arg != "--overwrite"]
+    process_timed_training(paths[0] if paths else filename, "--overwrite" in sys.argv)
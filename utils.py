@@ -1,7 +1,15 @@
 # Filename: utils.py
 # Description: This file contains utility functions that are used in both timed_training.py and event_results.py.
 
+import os
+import re
+
 import pandas as pd
+from columns import event_time_columns
+
+SESSION_FILE_PATTERN = re.compile(
+    r"^(?P<venue>[a-z]+)_(?:(?P<year>\d{4})_)?(?P<discipline>[a-z]+)_(?P<category>[a-z]+)_results_(?P<session>tt|q1|q2|qr|semi|f)\.(?P<extension>csv|pdf)$"
+)
 
 
 def seconds_to_human_readable(seconds):
@@ -32,3 +40,36 @@ def convert_to_seconds(time_str):
         return float(time_str)
     except ValueError:
         return None
+
+
+def event_times_to_timedelta(df):
+    """Return a copy of an event results frame with split and sector columns as timedeltas."""
+    df = df.copy()
+    split_columns, sector_columns = event_time_columns(df)
+    for column in split_columns + sector_columns:
+        df[column] = pd.to_timedelta("00:" + df[column], errors="coerce")
+    return df
+
+
+def find_sessions(data_dir, extension="csv"):
+    """Files in `data_dir` that follow the results naming convention."""
+    matches = (
+        (file_name, SESSION_FILE_PATTERN.match(file_name))
+        for file_name in os.listdir(data_dir)
+    )
+    return sorted(
+        os.path.join(data_dir, file_name)
+        for file_name, match in matches
+        if match and match["extension"] == extension
+    )
+
+
+def time_column_to_ms(series):
+    """Vectorized milliseconds for a column of "M:SS.fff" strings or float seconds.
+
+    Anything that is not a time (DNF, "N/A", blanks) becomes NaN.
+    """
+    numeric = pd.to_numeric(series, errors="coerce")
+    parts = series.astype(str).str.extract(r"^\s*(\d+):(\d+(?:\.\d+)?)\s*$")
+    from_text = parts[0].astype(float) * 60000 + parts[1].astype(float) * 1000
+    return numeric.mul(1000).fillna(from_text).round()
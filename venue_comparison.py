@@ -0,0 +1,125 @@
+# Filename: venue_comparison.py
+# Description: This file contains the year-over-year comparison of two sessions at the same venue (for example Leogang Qualifications against Leogang 2025 Q1). It reads both sessions from the season index and works out how each sector's field distribution moved. It also joins the riders present in both on their resolved rider key to get each rider's sector and final time deltas. Nothing in here depends on Streamlit.
+
+import pandas as pd
+
+from catalog import catalog
+from rider_identity import display_name
+from season_index import ensure_index
+
+# Sessions that play the same part in a weekend, used to pair them by default
+STAGES = {
+    "tt": "Time Training",
+    "qr": "Qualifications",
+    "q1": "Qualifications",
+    "q2": "Qualifications",
+    "semi": "Semi-Finals",
+    "f": "Finals",
+}
+QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+def venue_sessions(data_dir="data"):
+    """Sessions of every venue raced in more than one season, oldest season first."""
+    df = catalog(data_dir)
+    df = df[df.groupby("venue")["event"].transform("nunique") > 1]
+    df = df.sort_values("year", na_position="first", kind="stable")
+    return {
+        venue_name: sessions[["event", "session", "label"]].reset_index(drop=True)
+        for venue_name, sessions in df.groupby("venue_name", sort=True)
+    }
+
+
+def time_columns(df):
+    """Sector columns that hold times, in track order, then the final time."""
+    sectors = sorted(
+        (
+            col
+            for col in df.columns
+            if col.startswith("Sector_") and col.endswith("_Seconds") and df[col].notna().any()
+        ),
+        key=lambda col: int(col.split("_")[1]),
+    )
+    return sectors + ["Time_Seconds"]
+
+
+def session_times(event, session, data_dir="data"):
+    """Index rows of one session."""
+    df = pd.read_parquet(
+        ensure_index(data_dir),
+        filters=[("Event", "==", event), ("Session", "==", session)],
+    )
+    return df.sort_values("Rank").reset_index(drop=True)
+
+
+def field_distribution(df, columns):
+    """Quantiles and rider count of each time column (rows) for one session."""
+    stats = df[columns].quantile(QUANTILES).T
+    stats.columns = [f"P{int(q * 100)}" for q in QUANTILES]
+    stats["Riders"] = df[columns].notna().sum()
+    return stats
+
+
+def display_label(column):
+    return "Final" if column == "Time_Seconds" else column.replace("_Seconds", "").replace("_", " ")
+
+
+def compare_sessions(before, after):
+    """Field shift per sector and per-rider deltas between two sessions.
+
+    Sector deltas are only meaningful when both sessions were timed at the
+    same number of points; otherwise only the final time is compared.
+    """
+    columns_before, columns_after = time_columns(before), time_columns(after)
+    aligned = columns_before == columns_after
+    columns = columns_before if aligned else ["Time_Seconds"]
+
+    stats_before = field_distribution(before, columns)
+    stats_after = field_distribution(after, columns)
+    field = pd.DataFrame(
+        {
+            "Median_Before": stats_before["P50"],
+            "Median_After": stats_after["P50"],
+            "Median_Shift": stats_after["P50"] - stats_before["P50"],
+            "Median_Shift_Pct": (stats_after["P50"] / stats_before["P50"] - 1) * 100,
+            "IQR_Before": stats_before["P75"] - stats_before["P25"],
+            "IQR_After": stats_after["P75"] - stats_after["P25"],
+            "Riders_Before": stats_before["Riders"],
+            "Riders_After": stats_after["Riders"],
+        }
+    ).round(3)
+    field.index = field.index.map(display_label)
+
+    keep = ["Rider_Key", "Name", "Rank"] + columns
+    both = before[keep].merge(
+        after[keep], on="Rider_Key", how="inner", suffixes=("_Before", "_After")
+    )
+    riders = pd.DataFrame(
+        {
+            "Rider_Key": both["Rider_Key"],
+            "Name": display_name(both["Name_After"]),
+            "Rank_Before": both["Rank_Before"],
+            "Rank_After": both["Rank_After"],
+        }
+    )
+    deltas = (
+        both[[f"{col}_After" for col in columns]].to_numpy()
+        - both[[f"{col}_Before" for col in columns]].to_numpy()
+    )
+    for i, col in enumerate(columns):
+        riders[f"{display_label(col)} Delta"] = deltas[:, i].round(3)
+    # The field's own shift, so a rider's delta can be read against the track change
+    for i, col in enumerate(columns):
+        riders[f"{display_label(col)} vs Field"] = (
+            deltas[:, i] - field.loc[display_label(col), "Median_Shift"]
+        ).round(3)
+    riders = riders.sort_values("Rank_After").reset_index(drop=True)
+
+    return {
+        "aligned": aligned,
+        "sector_counts": (len(columns_before) - 1, len(columns_after) - 1),
+        "field": field,
+        "riders": riders,
+        "before": before[["Name"] + columns],
+        "after": after[["Name"] + columns],
+    }
@@ -0,0 +1,189 @@
+# Filename: weekend_table.py
+# Description: This file contains the event weekend assembler. It merges every round of one event (timed training best run, qualifying, semi-final, final) into one wide table with a row per resolved rider: each round's rank, final time, gap and sectors, and the time and rank change from one round to the next. Rounds are joined on the rider key from the season index. Q2 is a second-chance round for riders Q1 did not put straight through, so it shares Q1's stage of the weekend. Each event's table is stored as one Parquet file next to the index and rebuilt when the results change.
+
+import argparse
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from catalog import SEASON_DIR, SESSION_NAMES, catalog, source_version
+from rider_identity import load_identities
+from season_index import ensure_index
+
+# Bump when the table layout changes so stored weekends are rebuilt
+WEEKEND_VERSION = 2
+ROUND_COLUMNS = {
+    "Rank": "Rank",
+    "Time_Seconds": "Time",
+    "Gap_Seconds": "Gap",
+}
+# Second-chance rounds and the round they follow. Q1's top QUALIFY_DIRECT
+# skip Q2, so a Q1 rank without a Q2 rank means through, not out
+SECOND_CHANCE = {"q2": "q1"}
+QUALIFY_DIRECT = 20
+
+
+def round_prefix(session):
+    return session.upper()
+
+
+def event_rounds(event, data_dir="data"):
+    """Index rows of every session of `event`, by session code in weekend order."""
+    df = pd.read_parquet(ensure_index(data_dir), filters=[("Event", "==", event)])
+    sessions = [code for code in SESSION_NAMES if code in set(df["Session"])]
+    return {
+        session: df[df["Session"] == session].dropna(axis=1, how="all")
+        for session in sessions
+    }
+
+
+def weekend_stages(sessions):
+    """Sessions grouped into the stages of the weekend, a second-chance round with its first round."""
+    stages = []
+    for session in sessions:
+        if SECOND_CHANCE.get(session) in (stages[-1] if stages else []):
+            stages[-1].append(session)
+        else:
+            stages.append([session])
+    return stages
+
+
+def stage_label(stage):
+    return "/".join(round_prefix(session) for session in stage)
+
+
+def round_columns(rows, session):
+    """One round's columns, renamed with the session prefix and keyed by rider."""
+    prefix = round_prefix(session)
+    sectors = sorted(
+        (col for col in rows.columns if col.startswith("Sector_") and col.endswith("_Seconds")),
+        key=lambda col: int(col.split("_")[1]),
+    )
+    renamed = {col: f"{prefix}_{name}" for col, name in ROUND_COLUMNS.items()}
+    renamed.update(
+        {col: f"{prefix}_{col.replace('_Seconds', '')}" for col in sectors}
+    )
+    return (
+        rows[["Rider_Key"] + list(renamed)]
+        .rename(columns=renamed)
+        .drop_duplicates("Rider_Key")
+        .set_index("Rider_Key")
+    )
+
+
+def assemble_weekend(event, data_dir="data"):
+    """Wide per-rider table of every round of `event`."""
+    rounds = event_rounds(event, data_dir)
+    riders, _ = load_identities(data_dir)
+    table = None
+    for session, rows in rounds.items():
+        columns = round_columns(rows, session)
+        table = columns if table is None else table.join(columns, how="outer")
+
+    sessions = list(rounds)
+    stages = weekend_stages(sessions)
+    for earlier, later in zip(stages, stages[1:]):
+        # From the last round each rider rode in the earlier stage to the
+        # first round of the later one
+        prefixes = [round_prefix(session) for session in earlier[::-1]]
+        time = table[[f"{prefix}_Time" for prefix in prefixes]].bfill(axis=1).iloc[:, 0]
+        rank = table[[f"{prefix}_Rank" for prefix in prefixes]].bfill(axis=1).iloc[:, 0]
+        a, b = stage_label(earlier), round_prefix(later[0])
+        table[f"{a}_to_{b}_Time_Delta"] = (table[f"{b}_Time"] - time).round(3)
+        table[f"{a}_to_{b}_Rank_Delta"] = rank - table[f"{b}_Rank"]
+    for stage in stages:
+        # The same riders rode both, but against a different field, so
+        # only the times compare
+        for first, second in zip(stage, stage[1:]):
+            a, b = round_prefix(first), round_prefix(second)
+            table[f"{a}_to_{b}_Time_Delta"] = (table[f"{b}_Time"] - table[f"{a}_Time"]).round(3)
+
+    numbers = (
+        pd.concat([rows[["Rider_Key", "Number"]] for rows in rounds.values()])
+        .dropna()
+        .drop_duplicates("Rider_Key", keep="last")
+        .set_index("Rider_Key")["Number"]
+    )
+    table.insert(0, "Number", numbers)
+    ranks = table[[f"{round_prefix(session)}_Rank" for session in sessions]]
+    table.insert(0, "Last_Round", ranks.notna().iloc[:, ::-1].idxmax(axis=1).str[:-5])
+    names = riders.set_index("Rider_Id")[["Name", "Country"]]
+    table = names.join(table, how="inner").rename_axis("Rider_Key").reset_index()
+
+    return sort_weekend(table, stages)
+
+
+def sort_weekend(table, stages):
+    """Furthest stage reached first, then the rank in the last round ridden.
+
+    Within a stage with a second-chance round, riders who went straight
+    through come first, then the second-chance round, then riders who were
+    in neither (out in the first round, or did not start the second).
+    """
+    stage_of = {round_prefix(s): i for i, stage in enumerate(stages) for s in stage}
+    last_rank = pd.Series(
+        [table.at[i, f"{round_}_Rank"] for i, round_ in table["Last_Round"].items()],
+        index=table.index,
+    )
+    tier = pd.Series(0, index=table.index)
+    for second, first in SECOND_CHANCE.items():
+        if f"{round_prefix(second)}_Rank" not in table.columns:
+            continue
+        in_first = table["Last_Round"] == round_prefix(first)
+        direct = table[f"{round_prefix(first)}_Rank"] <= QUALIFY_DIRECT
+        tier[in_first & ~direct] = 2
+        tier[table["Last_Round"] == round_prefix(second)] = 1
+    table = table.assign(
+        _stage=-table["Last_Round"].map(stage_of), _tier=tier, _rank=last_rank
+    )
+    return (
+        table.sort_values(["_stage", "_tier", "_rank"])
+        .drop(columns=["_stage", "_tier", "_rank"])
+        .reset_index(drop=True)
+    )
+
+
+def weekend_path(event, store_dir=SEASON_DIR):
+    return os.path.join(store_dir, f"weekend_{event}.parquet")
+
+
+def load_weekend(event, data_dir="data", store_dir=SEASON_DIR):
+    """The stored weekend table of `event`, rebuilt if the results changed."""
+    path = weekend_path(event, store_dir)
+    version = source_version(catalog(data_dir), WEEKEND_VERSION)
+    if os.path.exists(path):
+        metadata = pq.read_schema(path).metadata or {}
+        if metadata.get(b"source_version", b"").decode() == version:
+            return pd.read_parquet(path)
+
+    table = assemble_weekend(event, data_dir)
+    arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+    arrow_table = arrow_table.replace_schema_metadata(
+        {**arrow_table.schema.metadata, b"source_version": version.encode()}
+    )
+    os.makedirs(store_dir, exist_ok=True)
+    # Write then rename so a reader never opens a half-written file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(arrow_table, temp_path)
+    os.replace(temp_path, path)
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge every round of an event into one per-rider table."
+    )
+    parser.add_argument("events", nargs="*", help="Events such as leog or vdso_2025 (default: all)")
+    parser.add_argument("--data-dir", default="data")
+    args = parser.parse_args()
+
+    events = args.events or list(dict.fromkeys(catalog(args.data_dir)["event"]))
+    for event in events:
+        table = load_weekend(event, args.data_dir)
+        print(f"{weekend_path(event)}: {len(table)} riders, {len(table.columns)} columns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Filename: year_over_year.py
+# Description: This file contains the show_year_over_year function that compares two seasons at the same venue: how each sector's field times moved, and each returning rider's sector and final time deltas. It is imported in app.py.
+
+import os
+
+import streamlit as st
+
+from figures import rider_delta_figure, sector_distribution_figure
+from season_index import ensure_index
+from venue_comparison import STAGES, compare_sessions, display_label, session_times, venue_sessions
+
+
+@st.cache_data(show_spinner=False)
+def load_comparison(event_before, session_before, event_after, session_after, index_version):
+    """Comparison of two sessions, cached per pair until the season index changes."""
+    return compare_sessions(
+        session_times(event_before, session_before),
+        session_times(event_after, session_after),
+    )
+
+
+def show_year_over_year():
+    st.title("Downhill Mountain Bike World Cup Year over Year")
+
+    venues = venue_sessions()
+    if not venues:
+        st.warning("No venue has results from more than one season in data/.")
+        return
+    venue = st.selectbox("Select a venue:", list(venues), key="year_over_year_venue_select")
+    sessions = venues[venue]
+    labels = dict(zip(sessions["label"], zip(sessions["event"], sessions["session"])))
+
+    events = list(dict.fromkeys(sessions["event"]))
+    col1, col2 = st.columns(2)
+    with col1:
+        before = st.selectbox(
+            "Earlier session",
+            [label for label, (event, _) in labels.items() if event == events[0]],
+            key="year_over_year_before_select",
+            # Re-pair the later session with the same stage of the weekend
+            on_change=lambda: st.session_state.pop("year_over_year_after_select", None),
+        )
+    stage = STAGES[labels[before][1]]
+    later = [label for label, (event, _) in labels.items() if event == events[-1]]
+    default = next(
+        (i for i, label in enumerate(later) if STAGES[labels[label][1]] == stage), 0
+    )
+    with col2:
+        after = st.selectbox(
+            "Later session", later, index=default, key="year_over_year_after_select"
+        )
+
+    index_version = os.stat(ensure_index()).st_mtime_ns
+    comparison = load_comparison(*labels[before], *labels[after], index_version)
+
+    if not comparison["aligned"]:
+        st.warning(
+            f"{before} has {comparison['sector_counts'][0]} sectors and {after} has "
+            f"{comparison['sector_counts'][1]}, so the timing points moved. Only final "
+            "times are compared."
+        )
+
+    st.write("Field median by sector (seconds)")
+    st.dataframe(comparison["field"], use_container_width=True)
+
+    columns = [col for col in comparison["before"].columns if col != "Name"]
+    renamed = {col: display_label(col) for col in columns}
+    st.plotly_chart(
+        sector_distribution_figure(
+            comparison["before"][columns].rename(columns=renamed),
+            comparison["after"][columns].rename(columns=renamed),
+            before,
+            after,
+        ),
+        use_container_width=True,
+    )
+
+    riders = comparison["riders"]
+    st.write(f"Riders in both sessions: {len(riders)}")
+    if riders.empty:
+        return
+    st.dataframe(riders.drop(columns="Rider_Key"), use_container_width=True, hide_index=True)
+
+    delta_columns = [col for col in riders.columns if col.endswith(" Delta")]
+    column = st.selectbox(
+        "Delta to chart",
+        delta_columns,
+        index=len(delta_columns) - 1,
+        key="year_over_year_delta_select",
+    )
+    relative = st.toggle(
+        "Relative to the field's median shift", key="year_over_year_relative_toggle"
+    )
+    if relative:
+        column = column.replace(" Delta", " vs Field")
+    st.plotly_chart(
+        rider_delta_figure(riders, column, f"{column}: {after} vs {before}"),
+        use_container_width=True,
+    )
+
+
+if __name__ == "__main__":
+    show_year_over_year()